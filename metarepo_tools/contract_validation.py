@@ -0,0 +1,517 @@
+"""Validate contract examples and fixtures in a single process.
+
+AJV in ``scripts/validate-contracts.sh`` starts one Node process per example,
+and every one of them registers every schema again. This engine loads
+each schema under ``contracts/`` once into a single ``referencing`` registry and
+compiles one ``jsonschema`` validator per schema ``$id`` (or per file URI for a
+schema without one), which every example and fixture bound to that schema
+reuses. Large fixture sets are spread over a process pool whose workers build
+the registry once each.
+
+Fixtures are streamed line by line, so memory stays bounded by the longest
+record. Every invalid record is reported with its line number and byte offset
+(up to ``MAX_REPORTED_FAILURES`` per file), and a fixture of ``--split-bytes``
+or more is cut at line boundaries into one byte range per worker.
+
+``validate-contracts.sh`` resolves and caches fixtures itself and passes the
+uncached ones as ``--fixture DATA SCHEMA`` pairs; ``--passed`` lists the ones
+that passed so the script can record them.
+
+Schemas are resolved by :mod:`metarepo_tools.schema_resolution`. Output follows
+the shell script: the same ``::group::`` headers, ``valid``/``invalid`` lines
+and ambiguity errors. An ambiguous match stops the run with exit code 2; invalid
+data is reported for every file and yields exit code 1.
+"""
+
+from __future__ import annotations
+
+import argparse
+from concurrent.futures import ProcessPoolExecutor
+from dataclasses import dataclass
+import json
+import os
+from pathlib import Path
+import sys
+from typing import Any, Iterable, Sequence
+
+from metarepo_tools.schema_resolution import Resolution, SchemaNameIndex, resolve_all
+
+try:  # pragma: no cover - optional dependency
+    from jsonschema import Draft202012Validator
+    from jsonschema.exceptions import best_match
+    from referencing import Registry
+    from referencing.exceptions import Unresolvable, Unretrievable
+    from referencing.jsonschema import DRAFT202012
+
+    # A schema that loads but cannot be applied: a $ref that resolves nowhere.
+    SCHEMA_APPLY_ERRORS: tuple[type[Exception], ...] = (Unresolvable, Unretrievable)
+except ModuleNotFoundError:  # pragma: no cover - fallback path
+    Draft202012Validator = None  # type: ignore[assignment,misc]
+    SCHEMA_APPLY_ERRORS = ()
+
+__all__ = [
+    "ChunkReport",
+    "ContractValidationError",
+    "LineFailure",
+    "Outcome",
+    "SchemaRegistry",
+    "fixture_outcome",
+    "line_chunks",
+    "main",
+    "validate_fixture_pairs",
+    "validate_tree",
+]
+
+POOL_THRESHOLD = 8
+SPLIT_BYTES = 64 * 1024 * 1024
+MAX_REPORTED_FAILURES = 20
+
+
+class ContractValidationError(Exception):
+    """The schemas cannot be loaded into one registry."""
+
+
+@dataclass(frozen=True)
+class Outcome:
+    """Result of validating one data file: its stdout and stderr lines."""
+
+    path: str
+    valid: bool
+    out: tuple[str, ...] = ()
+    err: tuple[str, ...] = ()
+
+
+@dataclass(frozen=True)
+class LineFailure:
+    """One invalid JSONL record, located by line number and byte offset."""
+
+    line: int
+    offset: int
+    kind: str
+    details: tuple[str, ...]
+
+
+@dataclass(frozen=True)
+class ChunkReport:
+    """Result of scanning the lines of one byte range of a fixture."""
+
+    lines: int
+    records: int
+    failures: int
+    reported: tuple[LineFailure, ...]
+    error: str | None = None
+    schema_error: str | None = None
+
+
+def _failed(data_path: str, *lines: str) -> Outcome:
+    return Outcome(data_path, False, err=lines)
+
+
+def _pointer(parts: Iterable[Any]) -> str:
+    return "".join(
+        "/" + str(part).replace("~", "~0").replace("/", "~1") for part in parts
+    )
+
+
+def _unappliable(data_path: str, detail: str) -> Outcome:
+    return _failed(data_path, f"error: unable to apply schema to data: {data_path}", detail)
+
+
+def _error_lines(location: str, errors: Iterable[Any]) -> tuple[str, ...]:
+    return tuple(f"{location}{_pointer(error.absolute_path)} {error.message}" for error in errors)
+
+
+class SchemaRegistry:
+    """Every contract schema, registered once, with validators compiled on demand."""
+
+    def __init__(self, root: Path, schema_paths: Sequence[str]) -> None:
+        if Draft202012Validator is None:
+            raise ContractValidationError(
+                "jsonschema is required to validate contracts in-process (uv sync --group dev)"
+            )
+        self.root = root
+        self._keys: dict[str, str] = {}
+        self._validators: dict[str, Any] = {}
+        owners: dict[str, str] = {}
+        resources = []
+        for relative in schema_paths:
+            try:
+                contents = json.loads((root / relative).read_text(encoding="utf-8"))
+            except (OSError, UnicodeDecodeError, ValueError) as exc:
+                raise ContractValidationError(f"unable to load schema {relative}: {exc}") from exc
+            resource = DRAFT202012.create_resource(contents)
+            uri = (root / relative).resolve().as_uri()
+            resources.append((uri, resource))
+            identifier = resource.id()
+            if identifier:
+                identifier = identifier.rstrip("#")
+                if identifier in owners:
+                    raise ContractValidationError(
+                        f"duplicate $id {identifier}: {owners[identifier]} and {relative}"
+                    )
+                owners[identifier] = relative
+                resources.append((identifier, resource))
+            self._keys[relative] = identifier or uri
+        self._registry = Registry().with_resources(resources).crawl()
+
+    def validator(self, schema_path: str) -> Any:
+        """Return the cached validator for ``schema_path``, compiling it once per ``$id``."""
+
+        key = self._keys[schema_path]
+        validator = self._validators.get(key)
+        if validator is None:
+            validator = Draft202012Validator(
+                {"$ref": key},
+                registry=self._registry,
+                format_checker=Draft202012Validator.FORMAT_CHECKER,
+            )
+            self._validators[key] = validator
+        return validator
+
+    def validate_example(self, data_path: str, schema_path: str) -> Outcome:
+        try:
+            data = json.loads((self.root / data_path).read_text(encoding="utf-8"))
+        except (OSError, UnicodeDecodeError, ValueError, RecursionError) as exc:
+            return _failed(data_path, f"error: invalid JSON in data: {data_path}", str(exc))
+        try:
+            error = best_match(self.validator(schema_path).iter_errors(data))
+        except (*SCHEMA_APPLY_ERRORS, RecursionError) as exc:
+            return _unappliable(data_path, f"{schema_path}: {exc}")
+        if error is not None:
+            return _failed(data_path, f"{data_path} invalid", *_error_lines(data_path, [error]))
+        return Outcome(data_path, True, out=(f"{data_path} valid",))
+
+    def scan_fixture(
+        self, data_path: str, schema_path: str, start: int = 0, end: int | None = None
+    ) -> ChunkReport:
+        """Validate the JSONL lines that start in ``[start, end)``, one line at a time.
+
+        ``start`` must be a line boundary. Only the current line is held in
+        memory; line numbers in the report count from ``start``.
+        """
+
+        validator = self.validator(schema_path)
+        lines = records = failures = 0
+        reported: list[LineFailure] = []
+        offset = start
+        try:
+            with open(self.root / data_path, "rb") as handle:
+                handle.seek(start)
+                for raw_line in handle:
+                    if end is not None and offset >= end:
+                        break
+                    lines += 1
+                    line_offset = offset
+                    offset += len(raw_line)
+                    raw = raw_line.strip()
+                    if not raw:
+                        continue
+                    records += 1
+                    failure = _check_record(validator, raw, lines, line_offset)
+                    if failure is not None:
+                        failures += 1
+                        if len(reported) < MAX_REPORTED_FAILURES:
+                            reported.append(failure)
+        except OSError as exc:
+            return ChunkReport(lines, records, failures, tuple(reported), error=str(exc))
+        except SCHEMA_APPLY_ERRORS as exc:
+            return ChunkReport(
+                lines, records, failures, tuple(reported), schema_error=f"{schema_path}: {exc}"
+            )
+        return ChunkReport(lines, records, failures, tuple(reported))
+
+    def validate_fixture(self, data_path: str, schema_path: str) -> Outcome:
+        return fixture_outcome(data_path, [self.scan_fixture(data_path, schema_path)])
+
+
+def _check_record(validator: Any, raw: bytes, line: int, offset: int) -> LineFailure | None:
+    try:
+        data = json.loads(raw)
+    except (ValueError, RecursionError) as exc:
+        return LineFailure(line, offset, "json", (str(exc),))
+    try:
+        errors = sorted(
+            validator.iter_errors(data),
+            key=lambda error: (_pointer(error.absolute_path), error.message),
+        )
+    except RecursionError as exc:
+        return LineFailure(line, offset, "schema", (f" {exc}",))
+    if not errors:
+        return None
+    return LineFailure(
+        line,
+        offset,
+        "schema",
+        tuple(f"{_pointer(error.absolute_path)} {error.message}" for error in errors),
+    )
+
+
+def fixture_outcome(data_path: str, reports: Sequence[ChunkReport]) -> Outcome:
+    """Combine the reports of consecutive chunks of one fixture into its outcome."""
+
+    err: list[str] = []
+    records = failures = shown = base = 0
+    for report in reports:
+        if report.error is not None:
+            return _failed(data_path, f"error: unable to read data: {data_path}", report.error)
+        if report.schema_error is not None:
+            return _unappliable(data_path, report.schema_error)
+        records += report.records
+        failures += report.failures
+        for failure in report.reported:
+            if shown == MAX_REPORTED_FAILURES:
+                break
+            shown += 1
+            location = f"{data_path}:{base + failure.line}"
+            if failure.kind == "json":
+                err.append(f"error: invalid JSON in data: {location} (byte {failure.offset})")
+                err.extend(failure.details)
+            else:
+                err.append(f"{location} invalid (byte {failure.offset})")
+                err.extend(f"{location}{detail}" for detail in failure.details)
+        base += report.lines
+    if failures:
+        if failures > shown:
+            err.append(f"{data_path}: {failures - shown} further invalid records not shown")
+        return _failed(data_path, *err)
+    if records == 0:
+        return _failed(data_path, f"error: no JSON records found in data: {data_path}")
+    return Outcome(data_path, True, out=(f"{data_path} valid ({records} JSONL records)",))
+
+
+def line_chunks(
+    path: Path, parts: int, split_bytes: int = SPLIT_BYTES
+) -> list[tuple[int, int | None]]:
+    """Split ``path`` into at most ``parts`` byte ranges that start on line boundaries.
+
+    Files smaller than ``split_bytes`` stay in one range. So does a file that
+    cannot be read; scanning that range then reports the error.
+    """
+
+    try:
+        size = path.stat().st_size
+        if parts <= 1 or size < split_bytes:
+            return [(0, None)]
+        bounds = [0]
+        with open(path, "rb") as handle:
+            for index in range(1, parts):
+                handle.seek(max(size * index // parts - 1, bounds[-1]))
+                handle.readline()
+                position = handle.tell()
+                if position >= size:
+                    break
+                if position > bounds[-1]:
+                    bounds.append(position)
+    except OSError:
+        return [(0, None)]
+    return list(zip(bounds, [*bounds[1:], None]))
+
+
+_worker_registry: SchemaRegistry | None = None
+
+
+def _init_worker(root: str, schema_paths: Sequence[str]) -> None:
+    global _worker_registry
+    _worker_registry = SchemaRegistry(Path(root), schema_paths)
+
+
+def _scan_in_worker(job: tuple[str, str, int, int | None]) -> ChunkReport:
+    assert _worker_registry is not None
+    return _worker_registry.scan_fixture(*job)
+
+
+def _emit(outcome: Outcome, header: str) -> None:
+    print(header, flush=True)
+    for line in outcome.out:
+        print(line, flush=True)
+    for line in outcome.err:
+        print(line, file=sys.stderr, flush=True)
+    print("::endgroup::", flush=True)
+
+
+def _ambiguous(resolution: Resolution) -> int:
+    print(f"::error::Ambiguous schema match for {resolution.path}. Found multiple candidates:")
+    for candidate in resolution.candidates:
+        print(f"  - {candidate}")
+    return 2
+
+
+def _validate_fixtures(
+    root: Path,
+    registry: SchemaRegistry,
+    registered: Sequence[str],
+    pairs: Sequence[tuple[str, str]],
+    jobs: int | None,
+    split_bytes: int,
+) -> dict[str, Outcome]:
+    """Scan every ``(fixture, schema)`` pair, in chunks over a pool when worthwhile."""
+
+    workers = jobs if jobs is not None else os.cpu_count() or 1
+    chunks = [
+        (fixture, schema, start, end)
+        for fixture, schema in pairs
+        for start, end in line_chunks(root / fixture, workers, split_bytes)
+    ]
+    split = len(chunks) > len(pairs)
+    if workers > 1 and (split or len(pairs) >= POOL_THRESHOLD):
+        with ProcessPoolExecutor(
+            max_workers=workers, initializer=_init_worker, initargs=(str(root), registered)
+        ) as pool:
+            reports = list(pool.map(_scan_in_worker, chunks))
+    else:
+        reports = [registry.scan_fixture(*chunk) for chunk in chunks]
+    by_fixture: dict[str, list[ChunkReport]] = {}
+    for chunk, report in zip(chunks, reports):
+        by_fixture.setdefault(chunk[0], []).append(report)
+    return {fixture: fixture_outcome(fixture, by_fixture[fixture]) for fixture, _ in pairs}
+
+
+def _registered_schemas(index: SchemaNameIndex) -> list[str]:
+    return [path for path in index.schemas if not path.startswith("contracts/examples/")]
+
+
+def validate_fixture_pairs(
+    root: Path,
+    pairs: Sequence[tuple[str, str]],
+    *,
+    jobs: int | None = None,
+    split_bytes: int = SPLIT_BYTES,
+    passed: list[str] | None = None,
+) -> int:
+    """Validate fixtures already resolved to their schemas; return the exit code.
+
+    ``validate-contracts.sh`` resolves and caches fixtures itself and hands the
+    uncached ones here. The path of every fixture that passed is appended to
+    ``passed``.
+    """
+
+    registered = _registered_schemas(SchemaNameIndex.scan(root))
+    registry = SchemaRegistry(root, registered)
+    results = _validate_fixtures(root, registry, registered, pairs, jobs, split_bytes)
+    failed = False
+    for fixture, _schema in pairs:
+        outcome = results[fixture]
+        failed |= not outcome.valid
+        if outcome.valid and passed is not None:
+            passed.append(fixture)
+        _emit(outcome, f"::group::Validate {fixture}")
+    return 1 if failed else 0
+
+
+def validate_tree(root: Path, *, jobs: int | None = None, split_bytes: int = SPLIT_BYTES) -> int:
+    """Validate every example and fixture below ``root``; return the exit code."""
+
+    index = SchemaNameIndex.scan(root)
+    resolutions = resolve_all(root, index)
+    registered = _registered_schemas(index)
+    registry = SchemaRegistry(root, registered)
+    failed = False
+
+    examples = [resolution for resolution in resolutions if resolution.kind == "example"]
+    if not examples:
+        print("::notice::No examples found under contracts/examples/")
+    for example in examples:
+        if example.status == "ambiguous":
+            return _ambiguous(example)
+        header = f"::group::Validate Example {example.path}"
+        if example.schema is None:
+            print(header)
+            print(
+                f"::notice::No matching schema found for {example.path} "
+                f"(searched contracts/**/{example.name}.schema.json)"
+            )
+            print("::endgroup::")
+            continue
+        outcome = registry.validate_example(example.path, example.schema)
+        failed |= not outcome.valid
+        _emit(outcome, header)
+
+    fixtures = [resolution for resolution in resolutions if resolution.kind == "fixture"]
+    if not fixtures:
+        print("No fixtures found under fixtures/")
+        return 1 if failed else 0
+    for fixture in fixtures:
+        if fixture.status == "ambiguous":
+            return _ambiguous(fixture)
+    results = _validate_fixtures(
+        root,
+        registry,
+        registered,
+        [(fixture.path, fixture.schema) for fixture in fixtures if fixture.schema is not None],
+        jobs,
+        split_bytes,
+    )
+
+    for fixture in fixtures:
+        header = f"::group::Validate {fixture.path}"
+        if fixture.schema is None:
+            print(header)
+            print(
+                f"::notice::No matching schema for {fixture.path} "
+                f"(searched contracts/**/{fixture.name}.schema.json)"
+            )
+            print("::endgroup::")
+            continue
+        outcome = results[fixture.path]
+        failed |= not outcome.valid
+        _emit(outcome, header)
+    return 1 if failed else 0
+
+
+def parse_args(argv: Sequence[str] | None = None) -> argparse.Namespace:
+    parser = argparse.ArgumentParser(description="Validate contract examples and fixtures")
+    parser.add_argument(
+        "--root",
+        type=Path,
+        default=Path("."),
+        help="Repository root holding contracts/ and fixtures/",
+    )
+    parser.add_argument(
+        "--jobs",
+        type=int,
+        help=f"Worker processes for {POOL_THRESHOLD} or more fixtures (default: CPU count)",
+    )
+    parser.add_argument(
+        "--split-bytes",
+        type=int,
+        default=SPLIT_BYTES,
+        help="Split fixtures of at least this size at line boundaries across workers",
+    )
+    parser.add_argument(
+        "--fixture",
+        nargs=2,
+        action="append",
+        metavar=("DATA", "SCHEMA"),
+        help="Validate only these resolved fixtures (repeatable); examples are skipped",
+    )
+    parser.add_argument(
+        "--passed",
+        type=Path,
+        help="With --fixture, write the path of every fixture that passed, one per line",
+    )
+    return parser.parse_args(argv)
+
+
+def main(argv: Sequence[str] | None = None) -> int:
+    args = parse_args(argv)
+    try:
+        if args.fixture:
+            passed: list[str] = []
+            code = validate_fixture_pairs(
+                args.root,
+                [(data, schema) for data, schema in args.fixture],
+                jobs=args.jobs,
+                split_bytes=args.split_bytes,
+                passed=passed,
+            )
+            if args.passed is not None:
+                args.passed.write_text("".join(f"{path}\n" for path in passed), encoding="utf-8")
+            return code
+        return validate_tree(args.root, jobs=args.jobs, split_bytes=args.split_bytes)
+    except ContractValidationError as exc:
+        print(f"::error::{exc}")
+        return 2
+
+
+if __name__ == "__main__":
+    raise SystemExit(main())
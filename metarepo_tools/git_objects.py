@@ -0,0 +1,473 @@
+"""Read Git objects straight from a repository's object database.
+
+A dependency-free reader for the two on-disk object layouts Git writes by
+default: zlib-compressed loose objects and packfiles addressed through version-2
+``.idx`` files, including offset and reference deltas. It reads literal objects
+only; replacement refs, grafts and lazy fetching are never consulted. Every
+returned object is checked against its SHA-1 object name.
+
+Repositories whose layout this reader does not understand (SHA-256 object
+format, alternates, partial clones, include directives in the repository
+config, version-1 pack indexes) raise :class:`UnsupportedRepository` when the
+store is opened, so callers can fall back to ``git cat-file``.
+"""
+
+from __future__ import annotations
+
+from bisect import bisect_left
+from collections import OrderedDict
+import hashlib
+import mmap
+import os
+from pathlib import Path
+import re
+import struct
+import zlib
+
+__all__ = [
+    "CorruptObject",
+    "ObjectNotFound",
+    "ObjectStore",
+    "ObjectStoreError",
+    "UnsupportedRepository",
+    "open_object_store",
+]
+
+_OBJECT_ID = re.compile(r"^[0-9a-f]{40}$")
+_PACK_TYPES = {1: "commit", 2: "tree", 3: "blob", 4: "tag"}
+_OFS_DELTA = 6
+_REF_DELTA = 7
+_IDX_MAGIC = b"\377tOc"
+_INFLATE_CHUNK = 64 * 1024
+_DELTA_BASE_CACHE_BYTES = 32 * 1024 * 1024
+_CONFIG_SECTION = re.compile(r'^\s*\[\s*([A-Za-z0-9.-]+)(?:\s+"[^"]*")?\s*\]')
+_CONFIG_ENTRY = re.compile(r"^\s*([A-Za-z][A-Za-z0-9-]*)\s*(?:=\s*(.*?))?\s*$")
+
+
+class ObjectStoreError(Exception):
+    """Base class for every object store failure."""
+
+
+class UnsupportedRepository(ObjectStoreError):
+    """The repository layout needs a feature this reader does not implement."""
+
+
+class ObjectNotFound(ObjectStoreError, LookupError):
+    """No loose object or pack entry carries the requested object name."""
+
+
+class CorruptObject(ObjectStoreError, ValueError):
+    """Stored bytes do not inflate, resolve or hash to the requested object."""
+
+
+def open_object_store(root: Path) -> ObjectStore:
+    """Open the object database of the work tree or bare repository at ``root``."""
+
+    git_dir = _git_dir(Path(root))
+    common_dir = git_dir
+    commondir_file = git_dir / "commondir"
+    if commondir_file.is_file():
+        common_dir = (git_dir / commondir_file.read_text(encoding="utf-8").strip()).resolve()
+    _check_config(common_dir / "config")
+    objects_dir = common_dir / "objects"
+    if not objects_dir.is_dir():
+        raise UnsupportedRepository(f"no object directory at {objects_dir}")
+    for name in ("alternates", "http-alternates"):
+        alternates = objects_dir / "info" / name
+        if alternates.is_file() and alternates.read_bytes().strip():
+            raise UnsupportedRepository(f"object alternates are not supported: {alternates}")
+    return ObjectStore(objects_dir)
+
+
+def _git_dir(root: Path) -> Path:
+    dot_git = root / ".git"
+    if dot_git.is_dir():
+        return dot_git.resolve()
+    if dot_git.is_file():
+        content = dot_git.read_text(encoding="utf-8").strip()
+        if not content.startswith("gitdir:"):
+            raise UnsupportedRepository(f"unrecognised .git file at {dot_git}")
+        target = Path(content[len("gitdir:") :].strip())
+        return (root / target).resolve() if not target.is_absolute() else target.resolve()
+    if (root / "objects").is_dir() and (root / "HEAD").is_file():
+        return root.resolve()
+    raise UnsupportedRepository(f"no Git directory at {root}")
+
+
+def _check_config(path: Path) -> None:
+    """Reject repository configs that change how objects are named or found."""
+
+    try:
+        lines = path.read_text(encoding="utf-8").splitlines()
+    except FileNotFoundError:
+        return
+    except (OSError, UnicodeDecodeError) as exc:
+        raise UnsupportedRepository(f"cannot read repository config {path}: {exc}") from exc
+    section = ""
+    for line in lines:
+        stripped = line.split("#", 1)[0].split(";", 1)[0]
+        match = _CONFIG_SECTION.match(stripped)
+        if match:
+            section = match.group(1).lower()
+            if section in {"include", "includeif"}:
+                raise UnsupportedRepository("repository config uses include directives")
+            stripped = stripped[match.end() :]
+        entry = _CONFIG_ENTRY.match(stripped)
+        if not entry or section != "extensions":
+            continue
+        key = entry.group(1).lower()
+        value = (entry.group(2) or "").strip().strip('"').lower()
+        if key == "objectformat" and value != "sha1":
+            raise UnsupportedRepository(f"object format {value!r} is not supported")
+        if key == "partialclone":
+            raise UnsupportedRepository("partial clones may fetch objects lazily")
+
+
+class _PackIndex:
+    """Lookups in one version-2 ``.idx`` file and reads from its packfile."""
+
+    def __init__(self, idx_path: Path) -> None:
+        self.idx_path = idx_path
+        self.pack_path = idx_path.with_suffix(".pack")
+        with idx_path.open("rb") as handle:
+            self._idx = mmap.mmap(handle.fileno(), 0, access=mmap.ACCESS_READ)
+        try:
+            if self._idx[:4] != _IDX_MAGIC or struct.unpack(">I", self._idx[4:8])[0] != 2:
+                raise UnsupportedRepository(f"only version-2 pack indexes are supported: {idx_path}")
+            self._fanout = struct.unpack(">256I", self._idx[8 : 8 + 1024])
+            self.count = self._fanout[255]
+            self._names = 8 + 1024
+            self._offsets = self._names + self.count * 24
+            self._large = self._offsets + self.count * 4
+            if len(self._idx) < self._large + 40:
+                raise CorruptObject(f"truncated pack index: {idx_path}")
+            with self.pack_path.open("rb") as handle:
+                self._pack = mmap.mmap(handle.fileno(), 0, access=mmap.ACCESS_READ)
+        except BaseException:
+            self._idx.close()
+            raise
+        if self._pack[:4] != b"PACK" or struct.unpack(">I", self._pack[4:8])[0] not in (2, 3):
+            self.close()
+            raise UnsupportedRepository(f"unrecognised packfile header: {self.pack_path}")
+
+    def close(self) -> None:
+        self._idx.close()
+        pack = getattr(self, "_pack", None)
+        if pack is not None:
+            pack.close()
+
+    def offset(self, raw_id: bytes) -> int | None:
+        first = raw_id[0]
+        low = self._fanout[first - 1] if first else 0
+        high = self._fanout[first]
+        names = _NameTable(self._idx, self._names)
+        position = bisect_left(names, raw_id, low, high)
+        if position == high or names[position] != raw_id:
+            return None
+        start = self._offsets + position * 4
+        (value,) = struct.unpack(">I", self._idx[start : start + 4])
+        if value & 0x80000000:
+            start = self._large + (value & 0x7FFFFFFF) * 8
+            if start + 8 > len(self._idx) - 40:
+                raise CorruptObject(f"large offset outside the pack index {self.idx_path}")
+            (value,) = struct.unpack(">Q", self._idx[start : start + 8])
+        return value
+
+    def header(self, offset: int) -> tuple[int, int, int, int | bytes | None]:
+        """Return ``(type, size, data_offset, base)`` for the entry at ``offset``.
+
+        ``base`` is the base entry's pack offset for an offset delta, the base
+        object's raw id for a reference delta, and ``None`` otherwise.
+        """
+
+        pack = self._pack
+        end = len(pack) - 20
+        if offset < 12 or offset >= end:
+            raise CorruptObject(f"pack offset {offset} is out of range in {self.pack_path}")
+
+        def byte_at(position: int) -> int:
+            if position >= end:
+                raise CorruptObject(f"truncated pack entry header at {offset} in {self.pack_path}")
+            return pack[position]
+
+        byte = byte_at(offset)
+        kind = (byte >> 4) & 0x7
+        size = byte & 0x0F
+        shift = 4
+        position = offset + 1
+        while byte & 0x80:
+            byte = byte_at(position)
+            size |= (byte & 0x7F) << shift
+            shift += 7
+            position += 1
+        base: int | bytes | None = None
+        if kind == _OFS_DELTA:
+            byte = byte_at(position)
+            distance = byte & 0x7F
+            position += 1
+            while byte & 0x80:
+                byte = byte_at(position)
+                distance = ((distance + 1) << 7) | (byte & 0x7F)
+                position += 1
+            if distance <= 0 or distance > offset:
+                raise CorruptObject(f"invalid delta base distance at {offset} in {self.pack_path}")
+            base = offset - distance
+        elif kind == _REF_DELTA:
+            if position + 20 > end:
+                raise CorruptObject(f"truncated pack entry header at {offset} in {self.pack_path}")
+            base = bytes(pack[position : position + 20])
+            position += 20
+        elif kind not in _PACK_TYPES:
+            raise CorruptObject(f"unknown pack entry type {kind} at {offset} in {self.pack_path}")
+        return kind, size, position, base
+
+    def inflate(self, position: int, size: int) -> bytes:
+        pack = self._pack
+        decompressor = zlib.decompressobj()
+        chunks: list[bytes] = []
+        produced = 0
+        end = len(pack) - 20
+        try:
+            while not decompressor.eof:
+                if position >= end:
+                    raise CorruptObject(f"truncated pack entry in {self.pack_path}")
+                chunk = pack[position : min(position + _INFLATE_CHUNK, end)]
+                position += len(chunk)
+                data = decompressor.decompress(chunk)
+                produced += len(data)
+                if produced > size:
+                    break
+                chunks.append(data)
+        except zlib.error as exc:
+            raise CorruptObject(f"cannot inflate pack entry in {self.pack_path}: {exc}") from exc
+        if produced != size:
+            raise CorruptObject(f"pack entry size mismatch in {self.pack_path}")
+        return b"".join(chunks)
+
+
+class _NameTable:
+    """Sequence view over the sorted 20-byte object names of a pack index."""
+
+    def __init__(self, idx: mmap.mmap, start: int) -> None:
+        self._idx = idx
+        self._start = start
+
+    def __getitem__(self, position: int) -> bytes:
+        start = self._start + position * 20
+        return self._idx[start : start + 20]
+
+
+class ObjectStore:
+    """Resolve object names against one ``objects`` directory.
+
+    Pack indexes are memory-mapped lazily and rescanned once when a name is not
+    found, so packs written by a concurrent ``git gc`` are still picked up.
+    Delta bases are kept in a small byte-bounded cache because tree and blob
+    chains inside one pack share most of their bases.
+    """
+
+    def __init__(self, objects_dir: Path) -> None:
+        self.objects_dir = Path(objects_dir)
+        self._packs: dict[Path, _PackIndex] = {}
+        self._scanned = False
+        self._bases: OrderedDict[tuple[Path, int], tuple[int, bytes]] = OrderedDict()
+        self._base_bytes = 0
+
+    def __enter__(self) -> ObjectStore:
+        return self
+
+    def __exit__(self, *exc_info: object) -> None:
+        self.close()
+
+    def close(self) -> None:
+        packs, self._packs = self._packs, {}
+        for pack in packs.values():
+            pack.close()
+        self._bases.clear()
+        self._base_bytes = 0
+        self._scanned = False
+
+    def read(self, object_id: str) -> tuple[str, bytes]:
+        """Return ``(kind, data)`` for one object, verified against its name."""
+
+        if not _OBJECT_ID.fullmatch(object_id):
+            raise ObjectNotFound(f"not a full SHA-1 object name: {object_id!r}")
+        found = self._read_loose(object_id)
+        if found is None:
+            found = self._read_packed(bytes.fromhex(object_id))
+        if found is None:
+            raise ObjectNotFound(object_id)
+        kind, data = found
+        header = f"{kind} {len(data)}\0".encode("ascii")
+        if hashlib.sha1(header + data).hexdigest() != object_id:
+            raise CorruptObject(f"object {object_id} does not hash to its name")
+        return kind, data
+
+    def _read_loose(self, object_id: str) -> tuple[str, bytes] | None:
+        path = self.objects_dir / object_id[:2] / object_id[2:]
+        try:
+            compressed = path.read_bytes()
+        except FileNotFoundError:
+            return None
+        except OSError as exc:
+            raise CorruptObject(f"cannot read loose object {object_id}: {exc}") from exc
+        try:
+            raw = zlib.decompress(compressed)
+        except zlib.error as exc:
+            raise CorruptObject(f"cannot inflate loose object {object_id}: {exc}") from exc
+        nul = raw.find(b"\0")
+        if nul < 0:
+            raise CorruptObject(f"malformed loose object header: {object_id}")
+        try:
+            kind, size = raw[:nul].decode("ascii").split(" ")
+            expected = int(size)
+        except ValueError as exc:
+            raise CorruptObject(f"malformed loose object header: {object_id}") from exc
+        data = raw[nul + 1 :]
+        if len(data) != expected or kind not in _PACK_TYPES.values():
+            raise CorruptObject(f"malformed loose object: {object_id}")
+        return kind, data
+
+    def _scan_packs(self) -> None:
+        pack_dir = self.objects_dir / "pack"
+        try:
+            names = sorted(os.listdir(pack_dir))
+        except FileNotFoundError:
+            names = []
+        for name in names:
+            path = pack_dir / name
+            if not (name.startswith("pack-") and name.endswith(".idx")) or path in self._packs:
+                continue
+            if not path.with_suffix(".pack").is_file():
+                continue
+            try:
+                self._packs[path] = _PackIndex(path)
+            except (OSError, ValueError, struct.error) as exc:
+                raise UnsupportedRepository(f"cannot map pack index {path}: {exc}") from exc
+        self._scanned = True
+
+    def _read_packed(self, raw_id: bytes) -> tuple[str, bytes] | None:
+        if not self._scanned:
+            self._scan_packs()
+        located = self._locate(raw_id)
+        if located is None:
+            self._scan_packs()
+            located = self._locate(raw_id)
+        if located is None:
+            return None
+        pack, offset = located
+        kind, data = self._unpack(pack, offset)
+        return _PACK_TYPES[kind], data
+
+    def _locate(self, raw_id: bytes) -> tuple[_PackIndex, int] | None:
+        for pack in self._packs.values():
+            offset = pack.offset(raw_id)
+            if offset is not None:
+                return pack, offset
+        return None
+
+    def _unpack(self, pack: _PackIndex, offset: int) -> tuple[int, bytes]:
+        """Resolve a delta chain iteratively, innermost base first."""
+
+        chain: list[tuple[_PackIndex, int, int, int]] = []
+        seen = set()
+        while True:
+            cached = self._bases.get((pack.pack_path, offset))
+            if cached is not None:
+                self._bases.move_to_end((pack.pack_path, offset))
+                kind, data = cached
+                break
+            if (pack.pack_path, offset) in seen:
+                raise CorruptObject(f"delta cycle at {offset} in {pack.pack_path}")
+            seen.add((pack.pack_path, offset))
+            kind, size, position, base = pack.header(offset)
+            if isinstance(base, int):
+                chain.append((pack, offset, position, size))
+                offset = base
+            elif isinstance(base, bytes):
+                chain.append((pack, offset, position, size))
+                located = self._locate(base)
+                if located is None:
+                    loose = self._read_loose(base.hex())
+                    if loose is None:
+                        raise CorruptObject(f"missing delta base {base.hex()}")
+                    kind = next(code for code, name in _PACK_TYPES.items() if name == loose[0])
+                    data = loose[1]
+                    break
+                pack, offset = located
+            else:
+                data = pack.inflate(position, size)
+                self._remember(pack, offset, kind, data)
+                break
+        for delta_pack, delta_offset, position, size in reversed(chain):
+            data = _apply_delta(data, delta_pack.inflate(position, size))
+            self._remember(delta_pack, delta_offset, kind, data)
+        return kind, data
+
+    def _remember(self, pack: _PackIndex, offset: int, kind: int, data: bytes) -> None:
+        if len(data) > _DELTA_BASE_CACHE_BYTES // 4:
+            return
+        key = (pack.pack_path, offset)
+        if key in self._bases:
+            return
+        self._bases[key] = (kind, data)
+        self._base_bytes += len(data)
+        while self._base_bytes > _DELTA_BASE_CACHE_BYTES:
+            _key, (_kind, evicted) = self._bases.popitem(last=False)
+            self._base_bytes -= len(evicted)
+
+
+def _delta_varint(delta: bytes, position: int) -> tuple[int, int]:
+    value = 0
+    shift = 0
+    while True:
+        if position >= len(delta):
+            raise CorruptObject("truncated delta header")
+        byte = delta[position]
+        position += 1
+        value |= (byte & 0x7F) << shift
+        shift += 7
+        if not byte & 0x80:
+            return value, position
+
+
+def _apply_delta(base: bytes, delta: bytes) -> bytes:
+    """Apply one Git delta: copy-from-base and insert-literal instructions."""
+
+    source_size, position = _delta_varint(delta, 0)
+    target_size, position = _delta_varint(delta, position)
+    if source_size != len(base):
+        raise CorruptObject("delta base size mismatch")
+    out = bytearray()
+    end = len(delta)
+    while position < end:
+        opcode = delta[position]
+        position += 1
+        if opcode & 0x80:
+            operands = bin(opcode & 0x7F).count("1")
+            if position + operands > end:
+                raise CorruptObject("delta copy instruction exceeds the delta")
+            offset = 0
+            for bit in range(4):
+                if opcode & (1 << bit):
+                    offset |= delta[position] << (8 * bit)
+                    position += 1
+            size = 0
+            for bit in range(3):
+                if opcode & (0x10 << bit):
+                    size |= delta[position] << (8 * bit)
+                    position += 1
+            size = size or 0x10000
+            if offset + size > len(base):
+                raise CorruptObject("delta copy exceeds its base")
+            out += base[offset : offset + size]
+        elif opcode:
+            if position + opcode > end:
+                raise CorruptObject("delta insert exceeds the delta")
+            out += delta[position : position + opcode]
+            position += opcode
+        else:
+            raise CorruptObject("reserved delta opcode 0")
+    if len(out) != target_size:
+        raise CorruptObject("delta result size mismatch")
+    return bytes(out)
@@ -0,0 +1,158 @@
+"""Resolve contract examples and fixtures to their schemas from one tree scan.
+
+An example ``contracts/examples/<dir>/<name>.example.json`` and a fixture
+``fixtures/**/<name>.jsonl`` both belong to a ``<name>.schema.json`` somewhere
+under ``contracts/``. ``scripts/validate-contracts.sh`` used to glob the whole
+contracts tree once per data file; this module scans it once into a basename
+index and answers every data file from that index, caching the directory
+narrowing per ``(name, directory)`` pair.
+
+The semantics are those of the shell script. A single candidate always wins.
+For examples, several candidates are narrowed to the schemas whose directory
+ends with the example's directory below ``contracts/examples`` (a root example
+keeps them all). A narrowing that leaves nothing keeps every candidate, and
+more than one survivor is ambiguous. Fixtures are never narrowed. The module
+uses the standard library only, so the shell script can run it with any
+``python3``.
+"""
+
+from __future__ import annotations
+
+import argparse
+from dataclasses import dataclass
+import os
+from pathlib import Path
+import sys
+from typing import Sequence
+
+__all__ = [
+    "Resolution",
+    "SchemaNameIndex",
+    "main",
+    "resolve_all",
+    "walk",
+]
+
+SCHEMA_SUFFIX = ".schema.json"
+EXAMPLE_SUFFIX = ".example.json"
+FIXTURE_SUFFIX = ".jsonl"
+EXAMPLES_DIR = "contracts/examples"
+
+
+def walk(directory: Path, suffix: str, root: Path) -> list[str]:
+    """Return matching files below ``directory`` like a bash ``**`` glob would."""
+
+    found: list[str] = []
+    for current, directories, files in os.walk(directory):
+        directories[:] = [name for name in directories if not name.startswith(".")]
+        for name in files:
+            if name.endswith(suffix) and not name.startswith("."):
+                found.append((Path(current) / name).relative_to(root).as_posix())
+    return sorted(found)
+
+
+@dataclass(frozen=True)
+class Resolution:
+    """The schema chosen for one example or fixture, or why there is none."""
+
+    kind: str
+    path: str
+    name: str
+    candidates: tuple[str, ...]
+
+    @property
+    def status(self) -> str:
+        if not self.candidates:
+            return "none"
+        return "match" if len(self.candidates) == 1 else "ambiguous"
+
+    @property
+    def schema(self) -> str | None:
+        return self.candidates[0] if len(self.candidates) == 1 else None
+
+    def render(self) -> str:
+        return "\t".join((self.kind, self.path, self.status, self.name, *self.candidates))
+
+
+class SchemaNameIndex:
+    """Every ``*.schema.json`` under ``contracts/``, indexed by schema name."""
+
+    def __init__(self, schema_paths: Sequence[str]) -> None:
+        self.schemas = tuple(sorted(set(schema_paths)))
+        self._by_name: dict[str, list[str]] = {}
+        for schema_path in self.schemas:
+            name = schema_path.rsplit("/", 1)[-1][: -len(SCHEMA_SUFFIX)]
+            self._by_name.setdefault(name, []).append(schema_path)
+        self._narrowed: dict[tuple[str, str], tuple[str, ...]] = {}
+
+    @classmethod
+    def scan(cls, root: Path) -> SchemaNameIndex:
+        return cls(walk(root / "contracts", SCHEMA_SUFFIX, root))
+
+    def candidates(self, name: str) -> tuple[str, ...]:
+        return tuple(self._by_name.get(name, ()))
+
+    def resolve_example(self, path: str) -> Resolution:
+        name = path.rsplit("/", 1)[-1][: -len(EXAMPLE_SUFFIX)]
+        directory = path.rsplit("/", 1)[0] if "/" in path else ""
+        directory = directory.removeprefix(EXAMPLES_DIR).removeprefix("/")
+        key = (name, directory)
+        narrowed = self._narrowed.get(key)
+        if narrowed is None:
+            found = self.candidates(name)
+            if len(found) > 1:
+                matched = tuple(
+                    candidate
+                    for candidate in found
+                    if candidate.rsplit("/", 1)[0].endswith(directory)
+                )
+                found = matched or found
+            narrowed = self._narrowed[key] = found
+        return Resolution("example", path, name, narrowed)
+
+    def resolve_fixture(self, path: str) -> Resolution:
+        name = path.rsplit("/", 1)[-1][: -len(FIXTURE_SUFFIX)]
+        return Resolution("fixture", path, name, self.candidates(name))
+
+
+def resolve_all(root: Path, index: SchemaNameIndex | None = None) -> list[Resolution]:
+    """Resolve every example, then every fixture, in sorted path order."""
+
+    index = index or SchemaNameIndex.scan(root)
+    return [
+        *(index.resolve_example(path) for path in walk(root / EXAMPLES_DIR, EXAMPLE_SUFFIX, root)),
+        *(index.resolve_fixture(path) for path in walk(root / "fixtures", FIXTURE_SUFFIX, root)),
+    ]
+
+
+def parse_args(argv: Sequence[str] | None = None) -> argparse.Namespace:
+    parser = argparse.ArgumentParser(
+        description="Resolve contract examples and fixtures to their schemas"
+    )
+    parser.add_argument(
+        "--root",
+        type=Path,
+        default=Path("."),
+        help="Repository root holding contracts/ and fixtures/",
+    )
+    return parser.parse_args(argv)
+
+
+def main(argv: Sequence[str] | None = None) -> int:
+    """Print one tab-separated line per data file.
+
+    Each line holds ``kind``, ``path``, ``match``/``none``/``ambiguous``, the
+    schema name and then the schema or the ambiguous candidates.
+    """
+
+    args = parse_args(argv)
+    for resolution in resolve_all(args.root):
+        if "\t" in resolution.path or "\n" in resolution.path:
+            print(f"::error::Unsupported character in data path: {resolution.path!r}")
+            return 2
+        sys.stdout.write(resolution.render() + "\n")
+    return 0
+
+
+if __name__ == "__main__":
+    raise SystemExit(main())
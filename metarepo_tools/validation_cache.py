@@ -0,0 +1,249 @@
+"""Remember which contract schemas, examples and fixtures already validated.
+
+A schema compile is keyed by the SHA-256 of every schema in its transitive
+``$ref`` closure. An example or fixture is keyed by that closure digest plus
+the SHA-256 of its own bytes. Every key also covers a salt that names the
+validator runtime (runner script, lockfile, pinned versions, and the driving
+``validate-contracts.sh`` with its per-kind runner arguments). An entry is
+recorded only after a successful validation, so an entry means "these exact
+inputs passed with this exact validator". A cache directory copied between
+machines can therefore only skip work whose inputs are byte-identical. Entries
+that do not parse or carry another key are ignored.
+
+Closure discovery over-approximates on purpose: every ``$ref`` string anywhere
+in a schema counts, nested ``$id`` values are honoured, and a reference that
+does not resolve to a schema under ``contracts/`` enters the digest as its
+URI. Relative URIs of schemas without ``$id`` are resolved against a
+checkout-independent ``file:///<path>`` so keys are stable across machines.
+
+``plan`` prints, for every schema and then for every resolved example and
+fixture, ``<key>\\t<hit|miss>\\t`` followed by the fields of
+:mod:`metarepo_tools.schema_resolution` (``compile\\t<schema>`` for
+schemas). ``record`` stores keys after they validated. Only the standard
+library is used, so ``validate-contracts.sh`` can run it with any ``python3``.
+"""
+
+from __future__ import annotations
+
+import argparse
+import hashlib
+import json
+import os
+from pathlib import Path
+import sys
+from typing import Any, Iterable, Sequence
+from urllib.parse import urldefrag, urljoin
+
+from metarepo_tools.schema_resolution import SchemaNameIndex, resolve_all
+
+__all__ = [
+    "CACHE_VERSION",
+    "ClosureIndex",
+    "ResultCache",
+    "compile_key",
+    "data_key",
+    "main",
+    "runtime_salt",
+]
+
+CACHE_VERSION = 1
+MISSING_KEY = "-"
+
+
+def _sha256(data: bytes) -> str:
+    return hashlib.sha256(data).hexdigest()
+
+
+def _identifiers_and_references(document: Any, base: str) -> tuple[list[str], list[str]]:
+    """Collect resolved ``$id`` and ``$ref`` URIs anywhere in ``document``."""
+
+    identifiers: list[str] = []
+    references: list[str] = []
+    pending: list[tuple[Any, str]] = [(document, base)]
+    while pending:
+        node, node_base = pending.pop()
+        if isinstance(node, dict):
+            identifier = node.get("$id")
+            if isinstance(identifier, str):
+                node_base = urljoin(node_base, identifier)
+                identifiers.append(urldefrag(node_base)[0])
+            reference = node.get("$ref")
+            if isinstance(reference, str):
+                references.append(urldefrag(urljoin(node_base, reference))[0])
+            pending.extend((value, node_base) for value in node.values())
+        elif isinstance(node, list):
+            pending.extend((value, node_base) for value in node)
+    return identifiers, references
+
+
+class ClosureIndex:
+    """Byte digests and ``$ref`` edges of every schema under ``contracts/``."""
+
+    def __init__(self, root: Path, schema_paths: Sequence[str]) -> None:
+        self._digests: dict[str, str] = {}
+        self._references: dict[str, tuple[str, ...]] = {}
+        self._owners: dict[str, str] = {}
+        self._closures: dict[str, str] = {}
+        for relative in schema_paths:
+            data = (root / relative).read_bytes()
+            self._digests[relative] = _sha256(data)
+            base = f"file:///{relative}"
+            self._owners.setdefault(base, relative)
+            try:
+                document = json.loads(data)
+            except ValueError:
+                self._references[relative] = ()
+                continue
+            identifiers, references = _identifiers_and_references(document, base)
+            for identifier in identifiers:
+                self._owners.setdefault(identifier, relative)
+            self._references[relative] = tuple(references)
+
+    def closure_digest(self, schema_path: str) -> str:
+        """Digest the bytes of ``schema_path`` and of everything it reaches."""
+
+        digest = self._closures.get(schema_path)
+        if digest is not None:
+            return digest
+        members: set[str] = set()
+        unresolved: set[str] = set()
+        pending = [schema_path]
+        while pending:
+            current = pending.pop()
+            if current in members:
+                continue
+            members.add(current)
+            for uri in self._references[current]:
+                owner = self._owners.get(uri) if uri else current
+                if owner is None:
+                    unresolved.add(uri)
+                elif owner not in members:
+                    pending.append(owner)
+        lines = [f"{path}\0{self._digests[path]}\n" for path in sorted(members)]
+        lines.extend(f"unresolved\0{uri}\n" for uri in sorted(unresolved))
+        digest = self._closures[schema_path] = _sha256("".join(lines).encode("utf-8"))
+        return digest
+
+
+def runtime_salt(texts: Iterable[str] = (), files: Iterable[Path] = ()) -> str:
+    """Name the validator runtime; any change to it invalidates every key."""
+
+    parts = [f"text\0{text}" for text in texts]
+    parts.extend(f"file\0{path.name}\0{_sha256(path.read_bytes())}" for path in files)
+    return _sha256(json.dumps([CACHE_VERSION, *parts]).encode("utf-8"))
+
+
+def compile_key(salt: str, closure: str) -> str:
+    return _sha256(json.dumps(["compile", salt, closure]).encode("utf-8"))
+
+
+def data_key(kind: str, salt: str, closure: str, data: bytes) -> str:
+    return _sha256(json.dumps([kind, salt, closure, _sha256(data)]).encode("utf-8"))
+
+
+class ResultCache:
+    """Successful validations, one small file per key below ``directory``."""
+
+    def __init__(self, directory: Path) -> None:
+        self.directory = directory
+
+    def _entry(self, key: str) -> Path:
+        return self.directory / f"v{CACHE_VERSION}" / key[:2] / key
+
+    def hit(self, key: str) -> bool:
+        try:
+            entry = json.loads(self._entry(key).read_bytes())
+        except (OSError, ValueError):
+            return False
+        return isinstance(entry, dict) and entry.get("key") == key
+
+    def record(self, key: str) -> None:
+        path = self._entry(key)
+        temporary = path.with_name(f".{key}.{os.getpid()}.tmp")
+        try:
+            path.parent.mkdir(parents=True, exist_ok=True)
+            temporary.write_text(json.dumps({"key": key}) + "\n", "utf-8")
+            os.replace(temporary, path)
+        except OSError:
+            try:
+                temporary.unlink()
+            except OSError:
+                pass
+            raise
+
+
+def plan(
+    root: Path, salt: str, cache: ResultCache | None
+) -> list[tuple[str, bool, tuple[str, ...]]]:
+    """Key every compile and every resolved data file and look each key up."""
+
+    index = SchemaNameIndex.scan(root)
+    registered = [path for path in index.schemas if not path.startswith("contracts/examples/")]
+    closures = ClosureIndex(root, index.schemas)
+    entries: list[tuple[str, bool, tuple[str, ...]]] = []
+    for schema_path in registered:
+        key = compile_key(salt, closures.closure_digest(schema_path))
+        entries.append((key, cache is not None and cache.hit(key), ("compile", schema_path)))
+    for resolution in resolve_all(root, index):
+        fields = tuple(resolution.render().split("\t"))
+        if resolution.schema is None:
+            entries.append((MISSING_KEY, False, fields))
+            continue
+        key = data_key(
+            resolution.kind,
+            salt,
+            closures.closure_digest(resolution.schema),
+            (root / resolution.path).read_bytes(),
+        )
+        entries.append((key, cache is not None and cache.hit(key), fields))
+    return entries
+
+
+def parse_args(argv: Sequence[str] | None = None) -> argparse.Namespace:
+    parser = argparse.ArgumentParser(description="Contract validation result cache")
+    commands = parser.add_subparsers(dest="command", required=True)
+    planner = commands.add_parser("plan", help="Key and look up every validation")
+    planner.add_argument("--root", type=Path, default=Path("."), help="Repository root")
+    planner.add_argument("--cache-dir", type=Path, help="Cache directory")
+    planner.add_argument(
+        "--no-cache", action="store_true", help="Report every validation as a miss"
+    )
+    planner.add_argument(
+        "--salt", action="append", default=[], help="Validator runtime text; repeatable"
+    )
+    planner.add_argument(
+        "--salt-file",
+        action="append",
+        type=Path,
+        default=[],
+        help="Validator runtime file whose digest enters every key; repeatable",
+    )
+    recorder = commands.add_parser("record", help="Store keys that validated")
+    recorder.add_argument("--cache-dir", type=Path, required=True, help="Cache directory")
+    recorder.add_argument("keys", nargs="*", help="Keys printed by plan")
+    return parser.parse_args(argv)
+
+
+def main(argv: Sequence[str] | None = None) -> int:
+    args = parse_args(argv)
+    if args.command == "record":
+        cache = ResultCache(args.cache_dir)
+        for key in args.keys:
+            if len(key) != 64 or any(char not in "0123456789abcdef" for char in key):
+                print(f"::error::Not a validation cache key: {key!r}")
+                return 2
+            cache.record(key)
+        return 0
+
+    cache = None if args.no_cache or args.cache_dir is None else ResultCache(args.cache_dir)
+    salt = runtime_salt(args.salt, args.salt_file)
+    for key, hit, fields in plan(args.root, salt, cache):
+        if any("\t" in field or "\n" in field for field in fields):
+            print(f"::error::Unsupported character in path: {fields!r}")
+            return 2
+        sys.stdout.write("\t".join((key, "hit" if hit else "miss", *fields)) + "\n")
+    return 0
+
+
+if __name__ == "__main__":
+    raise SystemExit(main())
@@ -1,11 +1,38 @@
 #!/usr/bin/env python3
-"""Reject duplicate keys and non-finite numbers in contract JSON files."""
+"""Reject duplicate keys and non-finite numbers in contract JSON files.
+
+With ``--lint`` the parsed schemas are also indexed in the same pass: every
+``$id`` (nested ones included), ``$anchor`` and ``$ref`` goes into one
+in-memory index. The lint then reports duplicate identifiers and local
+references that resolve to no schema, pointer or anchor; both fail the run.
+It also lists orphan schemas, which no other schema references and no example
+exercises; those are notices only. ``*.schema.json`` files below an
+``examples`` directory count as examples, not as schemas.
+
+The tree is walked once. ``--jobs N`` parses in a process pool; results are
+collected in sorted path order, so the output does not depend on ``N``.
+``--cache FILE`` remembers the SHA-256 of every file that passed, keyed also
+by the digest of this script, and skips re-parsing byte-identical files.
+Schemas are still parsed under ``--lint`` because the index needs them.
+"""
 from __future__ import annotations
 
 import argparse
+from concurrent.futures import ProcessPoolExecutor
+from dataclasses import dataclass, field
+import hashlib
 import json
+import os
 from pathlib import Path
+import sys
 from typing import Any
+from urllib.parse import unquote, urldefrag, urljoin, urlsplit
+
+SCHEMA_SUFFIX = ".schema.json"
+EXAMPLE_SUFFIX = ".example.json"
+NON_SCHEMA_KEYWORDS = frozenset({"const", "default", "enum", "examples"})
+CACHE_VERSION = 1
+POOL_THRESHOLD = 64
 
 
 def _reject_constant(value: str) -> None:
@@ -21,11 +48,22 @@ def _object_without_duplicates(pairs: list[tuple[str, Any]]) -> dict[str, Any]:
     return value
 
 
+def _walk(directory: Path, files: set[Path]) -> None:
+    pending = [directory]
+    while pending:
+        with os.scandir(pending.pop()) as entries:
+            for entry in entries:
+                if entry.is_dir(follow_symlinks=False):
+                    pending.append(Path(entry.path))
+                elif entry.name.endswith(".json") and entry.is_file():
+                    files.add(Path(entry.path))
+
+
 def _files(paths: list[Path]) -> list[Path]:
     files: set[Path] = set()
     for path in paths:
         if path.is_dir():
-            files.update(candidate for candidate in path.rglob("*.json") if candidate.is_file())
+            _walk(path, files)
         elif path.is_file():
             files.add(path)
         else:
@@ -33,31 +71,283 @@ def _files(paths: list[Path]) -> list[Path]:
     return sorted(files)
 
 
-def check(paths: list[Path]) -> list[str]:
-    errors: list[str] = []
-    for path in _files(paths):
+def _parse(data: bytes) -> Any:
+    return json.loads(
+        data.decode("utf-8"),
+        object_pairs_hook=_object_without_duplicates,
+        parse_constant=_reject_constant,
+    )
+
+
+def _verify(
+    path: Path, verified: frozenset[str], keep: bool
+) -> tuple[str | None, str | None, Any]:
+    """Return the digest of ``path``, its parse error and, if ``keep``, its document."""
+
+    try:
+        data = path.read_bytes()
+    except OSError as exc:
+        return None, f"{path}: {exc}", None
+    digest = hashlib.sha256(data).hexdigest()
+    if digest in verified and not keep:
+        return digest, None, None
+    try:
+        document = _parse(data)
+    except (UnicodeError, ValueError) as exc:
+        return digest, f"{path}: {exc}", None
+    return digest, None, document if keep else None
+
+
+_worker_verified: frozenset[str] = frozenset()
+
+
+def _init_worker(verified: frozenset[str]) -> None:
+    global _worker_verified
+    _worker_verified = verified
+
+
+def _verify_in_worker(job: tuple[Path, bool]) -> tuple[str | None, str | None, Any]:
+    return _verify(job[0], _worker_verified, job[1])
+
+
+class VerifiedCache:
+    """SHA-256 digests of files that passed the strict parse, in one JSON file.
+
+    The file also names the digest of this script, so a change to the parse
+    rules discards every entry. A missing or unreadable cache is empty.
+    """
+
+    def __init__(self, path: Path) -> None:
+        self.path = path
+        self.checker = hashlib.sha256(Path(__file__).read_bytes()).hexdigest()
+        self.verified: frozenset[str] = frozenset()
         try:
-            json.loads(
-                path.read_text(encoding="utf-8"),
-                object_pairs_hook=_object_without_duplicates,
-                parse_constant=_reject_constant,
+            stored = json.loads(path.read_bytes())
+        except (OSError, ValueError):
+            return
+        if (
+            isinstance(stored, dict)
+            and stored.get("version") == CACHE_VERSION
+            and stored.get("checker") == self.checker
+            and isinstance(stored.get("verified"), list)
+        ):
+            self.verified = frozenset(
+                digest for digest in stored["verified"] if isinstance(digest, str)
             )
-        except (OSError, UnicodeError, json.JSONDecodeError, ValueError) as exc:
-            errors.append(f"{path}: {exc}")
+
+    def store(self, verified: set[str]) -> None:
+        """Replace the entries with ``verified``, which drops files no longer seen."""
+
+        payload = {"version": CACHE_VERSION, "checker": self.checker, "verified": sorted(verified)}
+        temporary = self.path.with_name(f".{self.path.name}.{os.getpid()}.tmp")
+        try:
+            self.path.parent.mkdir(parents=True, exist_ok=True)
+            temporary.write_text(json.dumps(payload) + "\n", encoding="utf-8")
+            os.replace(temporary, self.path)
+        except OSError:
+            try:
+                temporary.unlink()
+            except OSError:
+                pass
+            raise
+
+
+def _is_schema(path: Path) -> bool:
+    return path.name.endswith(SCHEMA_SUFFIX) and "examples" not in path.parts[:-1]
+
+
+@dataclass
+class SchemaIndex:
+    """Identifiers, anchors and references of every parsed schema."""
+
+    resources: dict[str, list[tuple[Path, Any]]] = field(default_factory=dict)
+    anchors: set[tuple[str, str]] = field(default_factory=set)
+    references: list[tuple[Path, str, str]] = field(default_factory=list)
+    identifiers: list[tuple[str, Path]] = field(default_factory=list)
+    schemas: list[Path] = field(default_factory=list)
+    examples: set[str] = field(default_factory=set)
+
+    def add(self, path: Path, document: Any) -> None:
+        if not _is_schema(path):
+            if path.name.endswith(EXAMPLE_SUFFIX):
+                self.examples.add(path.name[: -len(EXAMPLE_SUFFIX)])
+            return
+        self.schemas.append(path)
+        file_uri = path.resolve().as_uri()
+        self.resources.setdefault(file_uri, []).append((path, document))
+        pending: list[tuple[Any, str, str]] = [(document, file_uri, file_uri)]
+        while pending:
+            node, base, resource = pending.pop()
+            if isinstance(node, list):
+                pending.extend((item, base, resource) for item in node)
+                continue
+            if not isinstance(node, dict):
+                continue
+            identifier = node.get("$id")
+            if isinstance(identifier, str):
+                base = resource = urldefrag(urljoin(base, identifier))[0]
+                self.resources.setdefault(resource, []).append((path, node))
+                self.identifiers.append((resource, path))
+            for keyword in ("$anchor", "$dynamicAnchor"):
+                anchor = node.get(keyword)
+                if isinstance(anchor, str):
+                    self.anchors.add((resource, anchor))
+            reference = node.get("$ref")
+            if isinstance(reference, str):
+                self.references.append((path, reference, urljoin(base, reference)))
+            pending.extend(
+                (value, base, resource)
+                for key, value in node.items()
+                if key not in NON_SCHEMA_KEYWORDS
+            )
+
+
+def _pointer_target(node: Any, pointer: str) -> bool:
+    for token in pointer.split("/")[1:]:
+        token = unquote(token).replace("~1", "/").replace("~0", "~")
+        if isinstance(node, dict) and token in node:
+            node = node[token]
+        elif isinstance(node, list) and token.isdigit() and int(token) < len(node):
+            node = node[int(token)]
+        else:
+            return False
+    return True
+
+
+def lint(index: SchemaIndex) -> tuple[list[str], list[str]]:
+    """Return the failing findings and the orphan notices of ``index``."""
+
+    errors: list[str] = []
+    owners: dict[str, set[Path]] = {}
+    for identifier, path in index.identifiers:
+        owners.setdefault(identifier, set()).add(path)
+    counts: dict[str, int] = {}
+    for identifier, _path in index.identifiers:
+        counts[identifier] = counts.get(identifier, 0) + 1
+    for identifier in sorted(counts):
+        if counts[identifier] > 1:
+            files = ", ".join(str(path) for path in sorted(owners[identifier]))
+            errors.append(f"duplicate $id {identifier} in {files}")
+
+    origins = {urlsplit(identifier)[:2] for identifier in counts}
+    referenced: set[Path] = set()
+    for path, reference, resolved in sorted(index.references):
+        document, fragment = urldefrag(resolved)
+        scheme_and_host = urlsplit(document)[:2]
+        targets = index.resources.get(document)
+        if targets is None:
+            if scheme_and_host[0] == "file" or scheme_and_host in origins:
+                errors.append(f"{path}: unresolved $ref {reference!r} ({document})")
+            continue
+        target_path, node = targets[0]
+        if not fragment or fragment.startswith("/"):
+            found = _pointer_target(node, fragment)
+        else:
+            found = (document, fragment) in index.anchors
+        if not found:
+            errors.append(f"{path}: unresolved $ref {reference!r} ({resolved})")
+        elif target_path != path:
+            referenced.add(target_path)
+
+    notices = [
+        f"{path}: orphan schema (no other schema references it and no example uses it)"
+        for path in sorted(index.schemas)
+        if path not in referenced and path.name[: -len(SCHEMA_SUFFIX)] not in index.examples
+    ]
+    return errors, notices
+
+
+def check_files(
+    files: list[Path],
+    index: SchemaIndex | None = None,
+    *,
+    jobs: int = 1,
+    cache: VerifiedCache | None = None,
+) -> list[str]:
+    """Strictly parse ``files``; add parsed schemas to ``index`` if given.
+
+    Errors come back in the order of ``files`` whatever ``jobs`` is. ``cache``
+    ends up holding exactly the files of this run that passed.
+    """
+
+    verified = cache.verified if cache is not None else frozenset()
+    work = [(path, index is not None and _is_schema(path)) for path in files]
+    if jobs > 1 and len(work) >= POOL_THRESHOLD:
+        with ProcessPoolExecutor(
+            jobs, initializer=_init_worker, initargs=(verified,)
+        ) as pool:
+            chunksize = max(1, len(work) // (jobs * 16))
+            results = list(pool.map(_verify_in_worker, work, chunksize=chunksize))
+    else:
+        results = [_verify(path, verified, keep) for path, keep in work]
+
+    errors: list[str] = []
+    passed: set[str] = set()
+    for (path, _keep), (digest, error, document) in zip(work, results):
+        if error is not None:
+            errors.append(error)
+            continue
+        passed.add(digest)
+        if index is not None:
+            index.add(path, document)
+    if cache is not None:
+        try:
+            cache.store(passed)
+        except OSError as exc:
+            print(f"warning: cannot write {cache.path}: {exc}", file=sys.stderr)
     return errors
 
 
+def check(paths: list[Path], index: SchemaIndex | None = None) -> list[str]:
+    """Strictly parse every JSON file; add parsed schemas to ``index`` if given."""
+
+    return check_files(_files(paths), index)
+
+
 def main() -> int:
-    parser = argparse.ArgumentParser(description=__doc__)
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
     parser.add_argument("paths", nargs="+", type=Path)
+    parser.add_argument(
+        "--lint",
+        action="store_true",
+        help="Also report duplicate $id values, unresolved local $refs and orphan schemas",
+    )
+    parser.add_argument(
+        "--jobs",
+        type=int,
+        default=1,
+        help="Parse in this many processes (0: one per CPU)",
+    )
+    parser.add_argument(
+        "--cache",
+        type=Path,
+        help="File remembering the SHA-256 of files that already passed",
+    )
     args = parser.parse_args()
-    errors = check(args.paths)
+    if args.jobs < 0:
+        parser.error("--jobs must not be negative")
+    jobs = args.jobs or os.cpu_count() or 1
+    index = SchemaIndex() if args.lint else None
+    cache = VerifiedCache(args.cache) if args.cache is not None else None
+    files = _files(args.paths)
+    errors = check_files(files, index, jobs=jobs, cache=cache)
     if errors:
         for error in errors:
             print(error)
         return 1
-    print(f"contract JSON strict parse: valid ({len(_files(args.paths))} files)")
-    return 0
+    print(f"contract JSON strict parse: valid ({len(files)} files)")
+    if index is None:
+        return 0
+    findings, notices = lint(index)
+    for notice in notices:
+        print(f"::notice::{notice}")
+    for finding in findings:
+        print(f"::error::{finding}")
+    print(
+        f"contract lint: {len(index.schemas)} schemas, {len(index.identifiers)} identifiers, "
+        f"{len(findings)} errors, {len(notices)} orphans"
+    )
+    return 1 if findings else 0
 
 
 if __name__ == "__main__":
@@ -12,7 +12,9 @@ function usage(message) {
   }
   console.error(
     "usage: ajv_validate.cjs <compile|validate> --modules DIR --schema FILE " +
-      "[--ref FILE ...] [--data FILE] [--strict log|true|false] [--all-errors]",
+      "[--ref FILE ...] [--data FILE] [--strict log|true|false] [--all-errors]\n" +
+      "       ajv_validate.cjs compile-all --modules DIR --schema FILE [--schema FILE ...] " +
+      "[--ref FILE ...] [--results FILE] [--strict log|true|false]",
   );
   process.exit(2);
 }
@@ -23,7 +25,7 @@ function parseArguments(argv) {
   }
 
   const mode = argv[0];
-  if (mode !== "compile" && mode !== "validate") {
+  if (mode !== "compile" && mode !== "validate" && mode !== "compile-all") {
     usage(`unsupported mode: ${mode}`);
   }
 
@@ -31,9 +33,11 @@ function parseArguments(argv) {
     mode,
     modules: "",
     schema: "",
+    schemas: [],
     data: "",
     refs: [],
-    strict: mode === "compile" ? "log" : "false",
+    results: "",
+    strict: mode === "validate" ? "false" : "log",
     allErrors: false,
   };
 
@@ -44,7 +48,7 @@ function parseArguments(argv) {
       continue;
     }
 
-    if (!["--modules", "--schema", "--data", "--ref", "--strict"].includes(argument)) {
+    if (!["--modules", "--schema", "--data", "--ref", "--results", "--strict"].includes(argument)) {
       usage(`unsupported argument: ${argument}`);
     }
     if (index + 1 >= argv.length) {
@@ -59,6 +63,7 @@ function parseArguments(argv) {
         break;
       case "--schema":
         options.schema = value;
+        options.schemas.push(value);
         break;
       case "--data":
         options.data = value;
@@ -66,6 +71,9 @@ function parseArguments(argv) {
       case "--ref":
         options.refs.push(value);
         break;
+      case "--results":
+        options.results = value;
+        break;
       case "--strict":
         if (!["log", "true", "false"].includes(value)) {
           usage("--strict must be log, true or false");
@@ -86,9 +94,15 @@ function parseArguments(argv) {
   if (mode === "validate" && !options.data) {
     usage("--data is required for validate mode");
   }
-  if (mode === "compile" && options.data) {
+  if (mode !== "validate" && options.data) {
     usage("--data is only valid in validate mode");
   }
+  if (mode !== "compile-all" && options.schemas.length > 1) {
+    usage("--schema may only be repeated in compile-all mode");
+  }
+  if (mode !== "compile-all" && options.results) {
+    usage("--results is only valid in compile-all mode");
+  }
 
   return options;
 }
@@ -252,7 +266,103 @@ function validateJsonLines(ajv, validate, dataPath) {
   return true;
 }
 
+function errorMessage(error) {
+  return error instanceof Error ? error.message : String(error);
+}
+
+// Registers every schema once in a single AJV instance and compiles each of
+// them against that shared registry, so the cost grows with the number of
+// schemas instead of with its square. A failure is recorded for its schema and
+// the remaining schemas are still compiled. A --ref is registered so that
+// references resolve, but it is neither compiled nor reported.
+function compileAll(options) {
+  const { Ajv2020, addFormats } = loadValidator(options.modules);
+  let messages = [];
+  const capture = (...parts) => {
+    messages.push(parts.map((part) => (typeof part === "string" ? part : errorMessage(part))).join(" "));
+  };
+  const ajv = new Ajv2020({
+    strict: strictValue(options.strict),
+    validateFormats: true,
+    logger: { log: capture, warn: capture, error: capture },
+  });
+  addFormats(ajv);
+
+  const schemaFiles = [...new Set(options.schemas)].sort();
+  const results = new Map(schemaFiles.map((schemaFile) => [schemaFile, { warnings: [], errors: [] }]));
+  const references = [...new Set(options.refs)].filter((reference) => !results.has(reference)).sort();
+  let referencesValid = true;
+  for (const reference of references) {
+    try {
+      ajv.addSchema(JSON.parse(fs.readFileSync(path.resolve(reference), "utf8")), schemaKey(reference));
+    } catch (error) {
+      console.error(`error: unable to register reference schema: ${reference}`);
+      console.error(errorMessage(error));
+      referencesValid = false;
+    }
+  }
+
+  const registered = [];
+  for (const schemaFile of schemaFiles) {
+    const result = results.get(schemaFile);
+    messages = result.warnings;
+    try {
+      const schema = JSON.parse(fs.readFileSync(path.resolve(schemaFile), "utf8"));
+      ajv.addSchema(schema, schemaKey(schemaFile));
+      registered.push(schemaFile);
+    } catch (error) {
+      result.errors.push(`unable to register schema: ${errorMessage(error)}`);
+    }
+  }
+
+  for (const schemaFile of registered) {
+    const result = results.get(schemaFile);
+    messages = result.warnings;
+    try {
+      if (typeof ajv.getSchema(schemaKey(schemaFile)) !== "function") {
+        result.errors.push("AJV did not expose a validator for this schema");
+      }
+    } catch (error) {
+      result.errors.push(`unable to compile schema: ${errorMessage(error)}`);
+    }
+  }
+
+  const records = [];
+  for (const schemaFile of schemaFiles) {
+    const { warnings, errors } = results.get(schemaFile);
+    const valid = errors.length === 0;
+    console.log(`::group::Schema ${schemaFile}`);
+    for (const warning of warnings) {
+      console.log(warning);
+    }
+    if (valid) {
+      console.log(`schema ${schemaFile} is valid`);
+    } else {
+      console.log(`::error::Validation failed for schema: ${schemaFile}`);
+      for (const error of errors) {
+        console.log(error);
+      }
+    }
+    console.log("::endgroup::");
+    records.push(JSON.stringify({ schema: schemaFile, valid, warnings, errors }));
+  }
+
+  if (options.results) {
+    try {
+      fs.writeFileSync(path.resolve(options.results), records.map((record) => `${record}\n`).join(""));
+    } catch (error) {
+      console.error(`error: unable to write results: ${options.results}`);
+      console.error(errorMessage(error));
+      process.exit(2);
+    }
+  }
+  return referencesValid && [...results.values()].every((result) => result.errors.length === 0);
+}
+
 const options = parseArguments(process.argv.slice(2));
+if (options.mode === "compile-all") {
+  process.exit(compileAll(options) ? 0 : 1);
+}
 const { ajv, validate } = createValidator(options);
 
 if (options.mode === "compile") {
@@ -0,0 +1,353 @@
+#!/usr/bin/env python3
+"""Upgrade a contract source cache in place from a manifest delta.
+
+``emit_source_manifest.py --delta-from`` writes the manifest of the new commit,
+a delta description and only the schema bytes that changed since the base
+commit. This consumer step needs no Metarepo checkout. Before anything is
+written it proves that the delta is self-consistent and that it applies to the
+named cache: the cache manifest must be bound to the delta's base commit, and
+its bindings minus the removed schemas plus the changed schemas must reproduce
+the new manifest exactly. The new manifest is replaced last, so an interrupted
+upgrade leaves the old manifest in place and can simply be applied again.
+"""
+from __future__ import annotations
+
+import argparse
+import hashlib
+import json
+from pathlib import Path
+import stat
+import sys
+from typing import Any, Sequence
+
+script_dir = Path(__file__).resolve().parent
+if str(script_dir) not in sys.path:
+    sys.path.insert(0, str(script_dir))
+
+from emit_source_manifest import (  # noqa: E402
+    DELTA_NAME,
+    EXPECTED_REPOSITORY,
+    HEX40,
+    MANIFEST_NAME,
+    RELATIVE_POSIX,
+    SOURCE_KINDS,
+    STORE_LINKS,
+    VERIFY_MODES,
+    ContentStore,
+    ManifestError,
+    _atomic_write,
+    _load_stat_index,
+    _manifest_target_for_write,
+    _materialize,
+    _present_cache_files,
+    _regular_cached_schema,
+    _regular_manifest_for_verify,
+    _remove_sidecars,
+    _resolve_content_dir,
+    _stat_fingerprint,
+    render_manifest,
+)
+
+DELTA_KEYS = frozenset(
+    {
+        "schema_version",
+        "repository",
+        "base_commit",
+        "commit",
+        "source_kind",
+        "source_root",
+        "manifest_sha256",
+        "changed",
+        "removed",
+    }
+)
+MANIFEST_KEYS = frozenset(
+    {"schema_version", "repository", "commit", "source_kind", "source_root", "schemas"}
+)
+HEX64_DIGITS = frozenset("0123456789abcdef")
+
+
+def _is_digest(value: Any) -> bool:
+    return isinstance(value, str) and len(value) == 64 and set(value) <= HEX64_DIGITS
+
+
+def _is_relative(value: Any) -> bool:
+    return isinstance(value, str) and RELATIVE_POSIX.fullmatch(value) is not None
+
+
+def _read_regular(path: Path, code: str, what: str) -> bytes:
+    try:
+        metadata = path.lstat()
+    except FileNotFoundError as exc:
+        raise ManifestError(code, f"no {what} at {path}") from exc
+    except OSError as exc:
+        raise ManifestError(code, f"cannot inspect {path}: {exc}") from exc
+    if stat.S_ISLNK(metadata.st_mode) or not stat.S_ISREG(metadata.st_mode):
+        raise ManifestError(code, f"{what} is not a regular non-symlink file: {path}")
+    try:
+        return path.read_bytes()
+    except OSError as exc:
+        raise ManifestError(code, f"cannot read {path}: {exc}") from exc
+
+
+def _decode(data: bytes, code: str, what: str) -> dict[str, Any]:
+    try:
+        value = json.loads(data)
+    except (UnicodeDecodeError, ValueError) as exc:
+        raise ManifestError(code, f"{what} is not valid JSON: {exc}") from exc
+    if not isinstance(value, dict):
+        raise ManifestError(code, f"{what} must be a JSON object")
+    return value
+
+
+def _check_binding(value: dict[str, Any], keys: frozenset[str], code: str, what: str) -> None:
+    """Check the fields a manifest and a delta share."""
+
+    if set(value) != keys:
+        raise ManifestError(code, f"{what} must carry exactly {', '.join(sorted(keys))}")
+    if value["schema_version"] != 1 or value["repository"] != EXPECTED_REPOSITORY:
+        raise ManifestError(code, f"{what} is not a version-1 {EXPECTED_REPOSITORY} binding")
+    if not isinstance(value["commit"], str) or not HEX40.fullmatch(value["commit"]):
+        raise ManifestError(code, f"{what} does not bind a 40-hex commit")
+    if value["source_kind"] not in SOURCE_KINDS or not _is_relative(value["source_root"]):
+        raise ManifestError(code, f"{what} has an invalid source kind or content root")
+
+
+def _load_manifest(data: bytes, code: str, what: str) -> dict[str, Any]:
+    manifest = _decode(data, code, what)
+    _check_binding(manifest, MANIFEST_KEYS, code, what)
+    schemas = manifest["schemas"]
+    if (
+        not isinstance(schemas, dict)
+        or not schemas
+        or not all(_is_relative(path) and _is_digest(digest) for path, digest in schemas.items())
+    ):
+        raise ManifestError(code, f"{what} does not bind schema paths to SHA-256 digests")
+    return manifest
+
+
+def _load_delta(data: bytes) -> dict[str, Any]:
+    delta = _decode(data, "DELTA_INVALID", "delta")
+    _check_binding(delta, DELTA_KEYS, "DELTA_INVALID", "delta")
+    changed, removed = delta["changed"], delta["removed"]
+    if (
+        not isinstance(delta["base_commit"], str)
+        or not HEX40.fullmatch(delta["base_commit"])
+        or not _is_digest(delta["manifest_sha256"])
+        or not isinstance(changed, dict)
+        or not all(_is_relative(path) and _is_digest(digest) for path, digest in changed.items())
+        or not isinstance(removed, list)
+        or not all(_is_relative(path) for path in removed)
+        or removed != sorted(set(removed))
+        or set(removed) & set(changed)
+    ):
+        raise ManifestError(
+            "DELTA_INVALID",
+            "delta must bind a base commit, the manifest digest, changed digests and "
+            "sorted unique removed paths disjoint from the changed ones",
+        )
+    return delta
+
+
+def apply_delta(
+    delta_dir: Path,
+    cache_dir: Path,
+    *,
+    check_only: bool = False,
+    verify: str = "full",
+    store: ContentStore | None = None,
+) -> tuple[bytes, str | None]:
+    """Check ``delta_dir`` against ``cache_dir`` and, unless ``check_only``, apply it.
+
+    Returns the new manifest bytes and the reconcile summary line, if written.
+    The new manifest re-attests every carried-over cache file, so their bytes
+    are hashed against the base manifest first. With ``verify="stat"`` a file
+    is trusted instead when the cache's stat sidecar, bound to the base
+    manifest, still records its fingerprint and digest, as ``--verify=stat``
+    does. Changed files are bound to ``store`` objects when one is given.
+    """
+
+    delta = _load_delta(_read_regular(delta_dir / DELTA_NAME, "DELTA_INVALID", "delta"))
+    manifest_bytes = _read_regular(delta_dir / MANIFEST_NAME, "DELTA_INVALID", "delta manifest")
+    if hashlib.sha256(manifest_bytes).hexdigest() != delta["manifest_sha256"]:
+        raise ManifestError(
+            "DELTA_INCONSISTENT", "the delta manifest does not match the digest the delta binds"
+        )
+    target = _load_manifest(manifest_bytes, "DELTA_INCONSISTENT", "delta manifest")
+    if render_manifest(target) != manifest_bytes or any(
+        target[key] != delta[key] for key in ("commit", "source_kind", "source_root")
+    ):
+        raise ManifestError(
+            "DELTA_INCONSISTENT", "the delta manifest is not the canonical manifest the delta names"
+        )
+
+    base_bytes = _read_regular(
+        _regular_manifest_for_verify(cache_dir), "MANIFEST_UNREADABLE", "manifest"
+    )
+    base = _load_manifest(base_bytes, "DELTA_BASE_MISMATCH", "cache manifest")
+    if base["commit"] != delta["base_commit"] or any(
+        base[key] != delta[key] for key in ("source_kind", "source_root")
+    ):
+        raise ManifestError(
+            "DELTA_BASE_MISMATCH",
+            f"the delta applies to {delta['base_commit']}, the cache is bound to {base['commit']}",
+        )
+    missing = sorted(set(delta["removed"]) - set(base["schemas"]))
+    if missing:
+        raise ManifestError(
+            "DELTA_BASE_MISMATCH", f"the delta removes a schema the cache does not bind: {missing[0]}"
+        )
+    expected = {
+        relative: digest
+        for relative, digest in base["schemas"].items()
+        if relative not in delta["removed"]
+    }
+    expected.update(delta["changed"])
+    if expected != target["schemas"]:
+        raise ManifestError(
+            "DELTA_INCONSISTENT",
+            "cache bindings plus the delta do not reproduce the delta manifest",
+        )
+
+    source_root = delta["source_root"]
+    delta_content = _resolve_content_dir(delta_dir, source_root, error_code="CONTENT_UNREADABLE")
+    present = _present_cache_files(delta_content) if delta_content.is_dir() else set()
+    unbound = sorted(present - set(delta["changed"]))
+    if unbound:
+        raise ManifestError(
+            "CONTENT_UNBOUND", f"the delta carries files it does not bind: {', '.join(unbound)}"
+        )
+    changed_bytes: dict[str, bytes] = {}
+    for relative, digest in sorted(delta["changed"].items()):
+        path, _metadata = _regular_cached_schema(delta_content, relative)
+        data = _read_regular(path, "CONTENT_UNREADABLE", "delta schema")
+        if hashlib.sha256(data).hexdigest() != digest:
+            raise ManifestError(
+                "CONTENT_DRIFT", f"delta schema bytes differ from their binding: {relative}"
+            )
+        changed_bytes[relative] = data
+
+    content_dir = _resolve_content_dir(cache_dir, source_root, error_code="OUT_DIR_UNWRITABLE")
+    carried = sorted(set(target["schemas"]) - set(changed_bytes))
+    index = (
+        _load_stat_index(cache_dir, source_root, base_bytes) if verify == "stat" else None
+    )
+    for relative in carried:
+        path, metadata = _regular_cached_schema(content_dir, relative)
+        if index is not None:
+            recorded = index.files.get(relative)
+            if (
+                isinstance(recorded, list)
+                and len(recorded) == 5
+                and recorded[4] == base["schemas"][relative]
+                and index.trusts(_stat_fingerprint(metadata), recorded)
+            ):
+                continue
+        data = _read_regular(path, "CONTENT_UNREADABLE", "cached schema")
+        if hashlib.sha256(data).hexdigest() != base["schemas"][relative]:
+            raise ManifestError(
+                "CONTENT_DRIFT", f"cached schema bytes differ from the manifest: {relative}"
+            )
+    if check_only:
+        return manifest_bytes, None
+
+    manifest_path = _manifest_target_for_write(cache_dir)
+    summary = _materialize(
+        content_dir,
+        changed_bytes,
+        overwrite=True,
+        keep=carried,
+        store=store,
+        digests=delta["changed"],
+    )
+    _remove_sidecars(cache_dir)
+    _atomic_write(manifest_path, manifest_bytes)
+    return manifest_bytes, summary.describe(content_dir)
+
+
+def _existing_dir(value: str, code: str) -> Path:
+    try:
+        path = Path(value).expanduser().resolve(strict=True)
+    except (FileNotFoundError, OSError) as exc:
+        raise ManifestError(code, f"directory is unavailable: {value}") from exc
+    if not path.is_dir():
+        raise ManifestError(code, f"not a directory: {path}")
+    return path
+
+
+def _parser() -> argparse.ArgumentParser:
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument(
+        "--delta",
+        required=True,
+        help="Directory written by emit_source_manifest.py --delta-from.",
+    )
+    parser.add_argument(
+        "--cache",
+        required=True,
+        help="Directory that holds the cache manifest and content root to upgrade.",
+    )
+    parser.add_argument(
+        "--check",
+        action="store_true",
+        help="Prove that the delta applies to the cache without writing anything.",
+    )
+    parser.add_argument(
+        "--verify",
+        choices=VERIFY_MODES,
+        default="full",
+        help=(
+            "How carried-over cache files are proven before the new manifest attests them: "
+            "full hashes every file (default); stat trusts files the cache's stat sidecar "
+            "still fingerprints."
+        ),
+    )
+    parser.add_argument(
+        "--full",
+        dest="verify",
+        action="store_const",
+        const="full",
+        help="Alias for --verify full.",
+    )
+    parser.add_argument(
+        "--store",
+        metavar="DIR",
+        help="Bind changed files to this content-addressed store, as emit_source_manifest.py does.",
+    )
+    parser.add_argument(
+        "--store-link",
+        choices=STORE_LINKS,
+        default="hardlink",
+        help="How changed files bind store objects. Default: hardlink.",
+    )
+    return parser
+
+
+def run(argv: Sequence[str] | None = None) -> int:
+    args = _parser().parse_args(argv)
+    delta_dir = _existing_dir(args.delta, "DELTA_INVALID")
+    cache_dir = _existing_dir(args.cache, "OUT_DIR_MISSING")
+    if delta_dir == cache_dir:
+        raise ManifestError("OUT_DIR_INVALID", "the delta cannot be applied to itself")
+    store = None
+    if args.store is not None and not args.check:
+        store = ContentStore(Path(args.store).expanduser(), args.store_link)
+    manifest_bytes, summary = apply_delta(
+        delta_dir, cache_dir, check_only=args.check, verify=args.verify, store=store
+    )
+    if summary is not None:
+        print(summary, file=sys.stderr)
+    sys.stdout.write(manifest_bytes.decode("utf-8"))
+    return 0
+
+
+def main(argv: Sequence[str] | None = None) -> int:
+    try:
+        return run(argv)
+    except ManifestError as exc:
+        print(str(exc), file=sys.stderr)
+        return 2
+
+
+if __name__ == "__main__":
+    raise SystemExit(main())
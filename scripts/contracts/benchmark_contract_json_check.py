@@ -0,0 +1,120 @@
+#!/usr/bin/env python3
+"""Benchmark the strict contract JSON parse on a large synthetic tree.
+
+Writes ``--files`` JSON files (default 50 000) into a temporary directory,
+spread over nested directories like a contracts mirror or a state dump, with
+every ``--invalid``-th file replaced by one with a duplicate key. It then times the former
+serial pass that walked the tree twice, the single-walk serial pass, the
+process pool, and a warm ``--cache`` run. Every mode must report the same
+errors in the same order.
+"""
+from __future__ import annotations
+
+import argparse
+import importlib.util
+import json
+import os
+from pathlib import Path
+import sys
+import tempfile
+import time
+from typing import Callable
+
+SCRIPT = Path(__file__).resolve().parents[1] / "check-contract-json.py"
+
+
+def load_checker():
+    spec = importlib.util.spec_from_file_location("check_contract_json", SCRIPT)
+    module = importlib.util.module_from_spec(spec)
+    sys.modules[spec.name] = module
+    spec.loader.exec_module(module)
+    return module
+
+
+def build_tree(root: Path, count: int, invalid: int) -> None:
+    for number in range(count):
+        directory = root / f"repo{number % 40:02d}" / f"part{number % 25:02d}"
+        directory.mkdir(parents=True, exist_ok=True)
+        if number % 10 == 0:
+            name = f"item{number}.schema.json"
+            payload = json.dumps(
+                {
+                    "$id": f"https://metarepo.invalid/bench/{number}.schema.json",
+                    "type": "object",
+                    "properties": {f"f{field}": {"type": "string"} for field in range(12)},
+                }
+            )
+        else:
+            name = f"item{number}.json"
+            payload = json.dumps(
+                {"id": number, "tags": [f"t{tag}" for tag in range(8)], "ok": True}
+            )
+        if invalid and number % invalid == 0:
+            payload = '{"id": 0, "id": 1}'
+        (directory / name).write_text(payload + "\n", encoding="utf-8")
+
+
+def legacy_check(checker, paths: list[Path]) -> tuple[list[str], int]:
+    """The serial pass used before: parse, then walk the tree again to count."""
+
+    errors: list[str] = []
+    for path in checker._files(paths):
+        try:
+            json.loads(
+                path.read_text(encoding="utf-8"),
+                object_pairs_hook=checker._object_without_duplicates,
+                parse_constant=checker._reject_constant,
+            )
+        except (OSError, UnicodeError, ValueError) as exc:
+            errors.append(f"{path}: {exc}")
+    return errors, len(checker._files(paths))
+
+
+def timed(label: str, function: Callable[[], list[str]]) -> tuple[float, list[str]]:
+    start = time.perf_counter()
+    errors = function()
+    elapsed = time.perf_counter() - start
+    print(f"{label:<32} {elapsed:8.3f} s")
+    return elapsed, errors
+
+
+def main() -> int:
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--files", type=int, default=50_000, help="Synthetic files to write.")
+    parser.add_argument(
+        "--invalid", type=int, default=5_000, help="Every Nth file is invalid; 0: none."
+    )
+    parser.add_argument(
+        "--jobs", type=int, default=os.cpu_count() or 1, help="Processes of the pool run."
+    )
+    args = parser.parse_args()
+
+    checker = load_checker()
+    with tempfile.TemporaryDirectory(prefix="contract-json-bench-") as temporary:
+        root = Path(temporary) / "tree"
+        build_tree(root, args.files, args.invalid)
+        cache = checker.VerifiedCache(Path(temporary) / "verified.json")
+        paths = [root]
+
+        legacy, expected = timed(
+            "serial, two walks (legacy)", lambda: legacy_check(checker, paths)[0]
+        )
+
+        def single_walk(jobs: int, cache=None) -> list[str]:
+            return checker.check_files(checker._files(paths), jobs=jobs, cache=cache)
+
+        serial, serial_errors = timed("serial, one walk", lambda: single_walk(1))
+        pool, pool_errors = timed(f"pool, {args.jobs} jobs", lambda: single_walk(args.jobs))
+        timed("pool, filling the cache", lambda: single_walk(args.jobs, cache))
+        warm_cache = checker.VerifiedCache(cache.path)
+        warm, warm_errors = timed("serial, warm cache", lambda: single_walk(1, warm_cache))
+
+    if not serial_errors == pool_errors == warm_errors == expected:
+        raise SystemExit("modes disagree on the reported errors")
+    print(f"{len(expected)} invalid files reported identically by every mode")
+    print(f"pool speedup {legacy / pool:.2f}x, warm cache speedup {legacy / warm:.2f}x")
+    return 0
+
+
+if __name__ == "__main__":
+    raise SystemExit(main())
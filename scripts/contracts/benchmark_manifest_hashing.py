@@ -0,0 +1,129 @@
+#!/usr/bin/env python3
+"""Benchmark manifest digest and cache verification on a synthetic cache.
+
+Builds an offline cache of N synthetic schemas (10k by default) without Git and
+times three paths against it: the former serial digest plus ``read_bytes``
+comparison, the current code pinned to one worker, and the current bounded
+thread pool. Pass ``--size`` to bind larger schema bundles, where chunked
+streaming comparison and the pool matter most. The pool only pays off on hosts
+with more than one core.
+"""
+from __future__ import annotations
+
+import argparse
+import hashlib
+import json
+from pathlib import Path
+import sys
+import tempfile
+import time
+
+script_dir = Path(__file__).resolve().parent
+if str(script_dir) not in sys.path:
+    sys.path.insert(0, str(script_dir))
+
+import emit_source_manifest as producer  # noqa: E402
+
+
+def synthetic_payload(count: int, size: int) -> dict[str, bytes]:
+    payload: dict[str, bytes] = {}
+    for index in range(count):
+        body = {"$id": f"https://schemas.example.invalid/s{index}", "title": "x" * size}
+        relative = f"contracts/bench/{index % 100:02d}/s{index:05d}.schema.json"
+        payload[relative] = (json.dumps(body) + "\n").encode("utf-8")
+    return payload
+
+
+def legacy_verify(out_dir: Path, manifest_bytes: bytes, payload: dict[str, bytes]) -> dict[str, str]:
+    """The serial digest and ``read_bytes`` comparison the producer used before."""
+
+    digests = {relative: hashlib.sha256(data).hexdigest() for relative, data in payload.items()}
+    if (out_dir / producer.MANIFEST_NAME).read_bytes() != manifest_bytes:
+        raise AssertionError("manifest drift")
+    content_dir = out_dir / "content"
+    for relative, data in sorted(payload.items()):
+        target, _metadata = producer._regular_cached_schema(content_dir, relative)
+        if target.read_bytes() != data:
+            raise AssertionError(relative)
+    if producer._present_cache_files(content_dir) != set(payload):
+        raise AssertionError("unbound files")
+    return digests
+
+
+def current_verify(out_dir: Path, manifest_bytes: bytes, payload: dict[str, bytes]) -> dict[str, str]:
+    digests = producer._sha256_many(payload)
+    producer._verify(out_dir, "content", manifest_bytes, payload, "full", digests)
+    return digests
+
+
+def timed(label: str, function, *args, repeat: int) -> tuple[float, object]:
+    best = float("inf")
+    result = None
+    for _ in range(repeat):
+        start = time.perf_counter()
+        result = function(*args)
+        best = min(best, time.perf_counter() - start)
+    print(f"{label:<32} {best:8.3f} s")
+    return best, result
+
+
+def main() -> int:
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--count", type=int, default=10_000, help="Number of schemas.")
+    parser.add_argument("--size", type=int, default=4096, help="Approximate bytes per schema.")
+    parser.add_argument("--repeat", type=int, default=3, help="Best-of repetitions.")
+    args = parser.parse_args()
+
+    payload = synthetic_payload(args.count, args.size)
+    total = sum(len(data) for data in payload.values())
+    print(f"Synthetic cache: {len(payload)} schemas, {total / 1024 / 1024:.1f} MiB")
+
+    with tempfile.TemporaryDirectory() as temporary:
+        out_dir = Path(temporary)
+        producer._materialize(out_dir / "content", payload, overwrite=False)
+        manifest = {
+            "schema_version": 1,
+            "repository": producer.EXPECTED_REPOSITORY,
+            "commit": "0" * 40,
+            "source_kind": "offline_cache",
+            "source_root": "content",
+            "schemas": producer._sha256_many(payload),
+        }
+        manifest_bytes = producer.render_manifest(manifest)
+        (out_dir / producer.MANIFEST_NAME).write_bytes(manifest_bytes)
+
+        legacy, expected = timed(
+            "serial read_bytes (legacy)",
+            legacy_verify,
+            out_dir,
+            manifest_bytes,
+            payload,
+            repeat=args.repeat,
+        )
+        workers = producer.HASH_WORKERS
+        producer.HASH_WORKERS = 1
+        single, _ = timed(
+            "digest + verify, 1 worker",
+            current_verify,
+            out_dir,
+            manifest_bytes,
+            payload,
+            repeat=args.repeat,
+        )
+        producer.HASH_WORKERS = max(workers, 2)
+        pooled, result = timed(
+            f"digest + verify, {producer.HASH_WORKERS} workers",
+            current_verify,
+            out_dir,
+            manifest_bytes,
+            payload,
+            repeat=args.repeat,
+        )
+        if result != expected:
+            raise SystemExit("parallel digests diverged from the serial reference")
+    print(f"Speedup vs legacy: {legacy / pooled:.2f}x; vs 1 worker: {single / pooled:.2f}x")
+    return 0
+
+
+if __name__ == "__main__":
+    raise SystemExit(main())
@@ -0,0 +1,141 @@
+#!/usr/bin/env python3
+"""Benchmark the schema reference walker on pathological nesting.
+
+Builds synthetic schemas in memory, without Git, and times the former recursive
+generator against the current explicit-stack walker with memoized URI
+resolution. Two shapes are measured: a chain of ``--depth`` nested ``not``
+subschemas with a ``$ref`` at every level, and a ``--width`` wide ``allOf`` of
+``properties`` maps that repeat the same few ``$ref`` values, as generated
+schemas do. Both walkers must yield identical resources in identical order.
+"""
+from __future__ import annotations
+
+import argparse
+from pathlib import Path
+import sys
+import time
+from typing import Any, Iterable
+from urllib.parse import urldefrag, urljoin, urlsplit
+
+script_dir = Path(__file__).resolve().parent
+if str(script_dir) not in sys.path:
+    sys.path.insert(0, str(script_dir))
+
+import emit_source_manifest as producer  # noqa: E402
+
+RELATIVE = "contracts/bench/generated.schema.json"
+
+
+def legacy_resolve_uri(referrer: str, base_uri: str, value: str, keyword: str) -> str:
+    try:
+        parsed = urlsplit(value)
+        resolved = urljoin(base_uri, value)
+        urlsplit(resolved)
+    except ValueError as exc:
+        raise producer.ManifestError(f"SCHEMA_{keyword}_INVALID", value) from exc
+    if not resolved or (not parsed.scheme and value.startswith("//")):
+        raise producer.ManifestError(f"SCHEMA_{keyword}_INVALID", value)
+    return resolved
+
+
+def legacy_walk(relative: str, schema: Any, base_uri: str) -> Iterable[tuple[str, str]]:
+    """The recursive generator the producer used before."""
+
+    if isinstance(schema, dict):
+        active_base = base_uri
+        if "$id" in schema:
+            active_base = legacy_resolve_uri(relative, base_uri, schema["$id"], "ID")
+            yield "identifier", urldefrag(active_base)[0]
+        for key in sorted(schema):
+            value = schema[key]
+            if key == "$ref":
+                yield "reference", legacy_resolve_uri(relative, active_base, value, "REF")
+            elif key in producer.SCHEMA_VALUE_KEYWORDS:
+                yield from legacy_walk(relative, value, active_base)
+            elif key in producer.SCHEMA_ARRAY_KEYWORDS and isinstance(value, list):
+                for subschema in value:
+                    yield from legacy_walk(relative, subschema, active_base)
+            elif key in producer.SCHEMA_MAP_KEYWORDS and isinstance(value, dict):
+                for name in sorted(value):
+                    yield from legacy_walk(relative, value[name], active_base)
+
+
+def nested_schema(depth: int) -> dict[str, Any]:
+    schema: dict[str, Any] = {"type": "string"}
+    for level in range(depth):
+        schema = {"$ref": f"defs/{level % 7}.schema.json", "description": "x", "not": schema}
+    return schema
+
+
+def wide_schema(width: int) -> dict[str, Any]:
+    return {
+        "$id": "https://metarepo.invalid/contracts/bench/wide.schema.json",
+        "allOf": [
+            {
+                "properties": {
+                    f"p{field}": {"$ref": f"common/{field % 5}.schema.json#/$defs/v"}
+                    for field in range(20)
+                },
+                "title": f"branch {branch}",
+            }
+            for branch in range(width)
+        ],
+    }
+
+
+def timed(label: str, function, *args, repeat: int) -> tuple[float, object]:
+    best = float("inf")
+    result = None
+    for _ in range(repeat):
+        producer._join_uri.cache_clear()
+        start = time.perf_counter()
+        result = list(function(*args))
+        best = min(best, time.perf_counter() - start)
+    print(f"{label:<36} {best:8.4f} s")
+    return best, result
+
+
+def compare(label: str, schema: dict[str, Any], repeat: int) -> None:
+    base = producer._physical_schema_uri(RELATIVE)
+    try:
+        legacy, expected = timed(
+            f"{label}: recursive (legacy)", legacy_walk, RELATIVE, schema, base, repeat=repeat
+        )
+    except RecursionError:
+        print(f"{label + ': recursive (legacy)':<36} RecursionError")
+        legacy, expected = 0.0, None
+    current, result = timed(
+        f"{label}: explicit stack",
+        producer._schema_resources_and_references,
+        RELATIVE,
+        schema,
+        base,
+        repeat=repeat,
+    )
+    if expected is None:
+        return
+    if result != expected:
+        raise SystemExit(f"{label}: walkers disagree")
+    print(f"{label}: speedup {legacy / current:.2f}x")
+
+
+def main() -> int:
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument(
+        "--depth",
+        type=int,
+        action="append",
+        help="Nesting depth of the chain shape; repeatable. Default: 100, 400, 800.",
+    )
+    parser.add_argument("--width", type=int, default=2000, help="allOf branches of the wide shape.")
+    parser.add_argument("--repeat", type=int, default=5, help="Best-of repetitions.")
+    args = parser.parse_args()
+
+    for depth in args.depth or [100, 400, 800]:
+        compare(f"depth {depth}", nested_schema(depth), args.repeat)
+    compare(f"width {args.width}", wide_schema(args.width), args.repeat)
+    return 0
+
+
+if __name__ == "__main__":
+    raise SystemExit(main())
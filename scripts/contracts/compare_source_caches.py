@@ -0,0 +1,126 @@
+#!/usr/bin/env python3
+"""Compare two contract source caches through their Merkle layers.
+
+``emit_source_manifest.py --merkle`` writes per-directory Merkle digests next
+to the manifest. Two caches whose root digests agree bind identical bytes;
+otherwise only directories whose digests differ are descended into, so the
+work grows with the number of changed directories rather than with the number
+of bound schemas. Each layer must be bound to the manifest beside it by the
+manifest's SHA-256; neither manifest is parsed.
+"""
+from __future__ import annotations
+
+import argparse
+import hashlib
+import json
+from pathlib import Path
+import sys
+from typing import Any, Sequence
+
+script_dir = Path(__file__).resolve().parent
+if str(script_dir) not in sys.path:
+    sys.path.insert(0, str(script_dir))
+
+from apply_source_delta import _read_regular  # noqa: E402
+from emit_source_manifest import (  # noqa: E402
+    MANIFEST_NAME,
+    MERKLE_NAME,
+    ManifestError,
+    _regular_manifest_for_verify,
+)
+
+
+def load_layer(out_dir: Path) -> dict[str, dict[str, Any]]:
+    """Return the Merkle directories of ``out_dir`` after checking their binding."""
+
+    manifest_bytes = _read_regular(
+        _regular_manifest_for_verify(out_dir), "MANIFEST_UNREADABLE", "manifest"
+    )
+    data = _read_regular(out_dir / MERKLE_NAME, "MERKLE_MISSING", "Merkle layer")
+    try:
+        layer = json.loads(data)
+        directories = layer["directories"]
+        bound = (
+            layer["schema_version"] == 1
+            and layer["manifest_sha256"] == hashlib.sha256(manifest_bytes).hexdigest()
+            and isinstance(directories, dict)
+            and layer["root"] == directories["."]["digest"]
+        )
+    except (UnicodeDecodeError, ValueError, KeyError, TypeError) as exc:
+        raise ManifestError("MERKLE_DRIFT", f"not a Merkle layer: {out_dir / MERKLE_NAME}") from exc
+    if not bound:
+        raise ManifestError(
+            "MERKLE_DRIFT", f"the Merkle layer does not belong to {out_dir / MANIFEST_NAME}"
+        )
+    return directories
+
+
+def compare_layers(
+    left: dict[str, dict[str, Any]], right: dict[str, dict[str, Any]]
+) -> dict[str, Any]:
+    """List the schema paths that differ, visiting only directories that differ."""
+
+    changed: list[str] = []
+    added: list[str] = []
+    removed: list[str] = []
+    visited = 0
+    pending = ["."]
+    empty: dict[str, Any] = {"digest": None, "files": {}, "directories": {}}
+    try:
+        while pending:
+            directory = pending.pop()
+            before = left.get(directory, empty)
+            after = right.get(directory, empty)
+            if before["digest"] == after["digest"]:
+                continue
+            visited += 1
+            prefix = "" if directory == "." else f"{directory}/"
+            old_files, new_files = before["files"], after["files"]
+            for name in sorted(old_files.keys() | new_files.keys()):
+                if name not in new_files:
+                    removed.append(prefix + name)
+                elif name not in old_files:
+                    added.append(prefix + name)
+                elif old_files[name] != new_files[name]:
+                    changed.append(prefix + name)
+            old_directories, new_directories = before["directories"], after["directories"]
+            for name in sorted(old_directories.keys() | new_directories.keys(), reverse=True):
+                if old_directories.get(name) != new_directories.get(name):
+                    pending.append(prefix + name)
+    except (KeyError, TypeError, AttributeError) as exc:
+        raise ManifestError("MERKLE_DRIFT", "a Merkle layer is missing a directory node") from exc
+    return {
+        "identical": not visited,
+        "changed": sorted(changed),
+        "added": sorted(added),
+        "removed": sorted(removed),
+        "directories_visited": visited,
+    }
+
+
+def _parser() -> argparse.ArgumentParser:
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("left", help="Output directory holding the older cache.")
+    parser.add_argument("right", help="Output directory holding the newer cache.")
+    return parser
+
+
+def run(argv: Sequence[str] | None = None) -> int:
+    args = _parser().parse_args(argv)
+    result = compare_layers(
+        load_layer(Path(args.left).expanduser()), load_layer(Path(args.right).expanduser())
+    )
+    sys.stdout.write(json.dumps(result, indent=2) + "\n")
+    return 0
+
+
+def main(argv: Sequence[str] | None = None) -> int:
+    try:
+        return run(argv)
+    except ManifestError as exc:
+        print(str(exc), file=sys.stderr)
+        return 2
+
+
+if __name__ == "__main__":
+    raise SystemExit(main())
@@ -0,0 +1,227 @@
+#!/usr/bin/env python3
+"""Stream ``consumer-evidence.v1.json`` into compact records.
+
+The evidence file grows with org-wide code search, so it is not read as one
+string. The top-level object is scanned incrementally. The ``contracts`` and
+``claims`` arrays are decoded one item at a time with
+``json.JSONDecoder.raw_decode`` over a buffer that holds little more than the
+current item. Each object item becomes an ``EvidenceContract`` or
+``EvidenceClaim``: a ``__slots__`` record keeping only the fields
+``validate_consumers.py`` checks, with its strings interned. Repository names,
+commits, roles, statuses and paths repeat across thousands of claims, so
+interning stores each of them once. Items that are not objects are kept as
+decoded, so the validator still reports them. All other top-level values are
+small and are decoded whole.
+
+Peak memory therefore follows the number of claims, not the size of the text.
+Syntax errors are reported like ``json.loads`` reports them, with line, column
+and character offset counted from the start of the file.
+"""
+from __future__ import annotations
+
+import json
+from pathlib import Path
+import re
+import sys
+from typing import Any, Callable, Iterator, TextIO
+
+CHUNK_CHARS = 1 << 16
+STREAMED_ARRAYS = ("contracts", "claims")
+WHITESPACE = re.compile(r"[ \t\n\r]*")
+
+
+def _intern(value: Any) -> Any:
+    if isinstance(value, str):
+        return sys.intern(value)
+    if isinstance(value, list):
+        return [_intern(item) for item in value]
+    if isinstance(value, dict):
+        return {sys.intern(key): _intern(item) for key, item in value.items()}
+    return value
+
+
+class _Record:
+    """Read-only mapping view over the evidence fields kept in ``__slots__``."""
+
+    __slots__ = ()
+    KEYS: tuple[str, ...] = ()
+
+    def __init__(self, item: dict[str, Any]) -> None:
+        for slot, key in zip(self.__slots__, self.KEYS):
+            setattr(self, slot, _intern(item.get(key)))
+
+    def get(self, key: str, default: Any = None) -> Any:
+        try:
+            return getattr(self, self.__slots__[self.KEYS.index(key)])
+        except ValueError:
+            return default
+
+    def __getitem__(self, key: str) -> Any:
+        if key not in self.KEYS:
+            raise KeyError(key)
+        return self.get(key)
+
+    def to_json(self) -> dict[str, Any]:
+        return {key: getattr(self, slot) for slot, key in zip(self.__slots__, self.KEYS)}
+
+
+class EvidenceContract(_Record):
+    """One ``contracts[]`` item of the consumer evidence."""
+
+    __slots__ = ("id", "schema", "schema_exists", "schema_sha256", "lifecycle", "replacement")
+    KEYS = ("id", "schema", "schemaExists", "schemaSha256", "lifecycle", "replacement")
+
+
+class EvidenceClaim(_Record):
+    """One ``claims[]`` item of the consumer evidence."""
+
+    __slots__ = (
+        "id",
+        "contract",
+        "role",
+        "repository",
+        "commit",
+        "status",
+        "mode",
+        "files",
+        "evidence",
+        "mirror_checks",
+    )
+    KEYS = (
+        "id",
+        "contract",
+        "role",
+        "repository",
+        "commit",
+        "status",
+        "mode",
+        "files",
+        "evidence",
+        "mirrorChecks",
+    )
+
+
+class _Scanner:
+    """Incremental reader over a text stream, tracking absolute positions."""
+
+    def __init__(self, handle: TextIO, chunk: int = CHUNK_CHARS) -> None:
+        self._handle = handle
+        self._chunk = chunk
+        self._decoder = json.JSONDecoder()
+        self._buffer = ""
+        self._pos = 0
+        self._eof = False
+        self._offset = 0
+        self._line = 1
+        self._line_start = 0
+
+    def _fill(self) -> bool:
+        """Drop consumed text and read at least as much as is still buffered."""
+
+        if self._eof:
+            return False
+        consumed = self._buffer[: self._pos]
+        newlines = consumed.count("\n")
+        if newlines:
+            self._line += newlines
+            self._line_start = self._offset + consumed.rindex("\n") + 1
+        self._offset += self._pos
+        self._buffer = self._buffer[self._pos :]
+        self._pos = 0
+        data = self._handle.read(max(self._chunk, len(self._buffer)))
+        if not data:
+            self._eof = True
+            return False
+        self._buffer += data
+        return True
+
+    def error(self, message: str, pos: int | None = None) -> ValueError:
+        pos = self._pos if pos is None else pos
+        before = self._buffer[:pos]
+        newlines = before.count("\n")
+        line = self._line + newlines
+        line_start = (
+            self._offset + before.rindex("\n") + 1 if newlines else self._line_start
+        )
+        absolute = self._offset + pos
+        return ValueError(
+            f"{message}: line {line} column {absolute - line_start + 1} (char {absolute})"
+        )
+
+    def peek(self) -> str:
+        while True:
+            self._pos = WHITESPACE.match(self._buffer, self._pos).end()
+            if self._pos < len(self._buffer):
+                return self._buffer[self._pos]
+            if not self._fill():
+                return ""
+
+    def expect(self, char: str, message: str) -> None:
+        if self.peek() != char:
+            raise self.error(message)
+        self._pos += 1
+
+    def value(self) -> Any:
+        self.peek()
+        while True:
+            try:
+                value, end = self._decoder.raw_decode(self._buffer, self._pos)
+            except json.JSONDecodeError as exc:
+                offset = self._offset
+                if self._fill():
+                    continue
+                # The failed fill still dropped consumed text; rebase the position.
+                raise self.error(exc.msg, exc.pos - (self._offset - offset)) from None
+            # A number at the end of the buffer may continue in the next chunk.
+            if end == len(self._buffer) and self._fill():
+                continue
+            self._pos = end
+            return value
+
+    def items(self, build: Callable[[dict[str, Any]], Any]) -> Iterator[Any]:
+        self.expect("[", "Expecting value")
+        if self.peek() == "]":
+            self._pos += 1
+            return
+        while True:
+            item = self.value()
+            yield build(item) if isinstance(item, dict) else item
+            if self.peek() == "]":
+                self._pos += 1
+                return
+            self.expect(",", "Expecting ',' delimiter")
+
+    def document(self) -> dict[str, Any]:
+        self.expect("{", "Expecting '{' of the evidence object")
+        document: dict[str, Any] = {}
+        if self.peek() == "}":
+            self._pos += 1
+        else:
+            while True:
+                if self.peek() != '"':
+                    raise self.error("Expecting property name enclosed in double quotes")
+                key = self.value()
+                self.expect(":", "Expecting ':' delimiter")
+                if key in STREAMED_ARRAYS and self.peek() == "[":
+                    record = EvidenceContract if key == "contracts" else EvidenceClaim
+                    document[key] = list(self.items(record))
+                else:
+                    document[key] = self.value()
+                if self.peek() == "}":
+                    self._pos += 1
+                    break
+                self.expect(",", "Expecting ',' delimiter")
+        if self.peek():
+            raise self.error("Extra data")
+        return document
+
+
+def load_evidence(path: Path, *, chunk: int = CHUNK_CHARS) -> dict[str, Any]:
+    """Return the evidence object with its item arrays as records.
+
+    Raises ``OSError``, ``UnicodeError`` or ``ValueError`` like reading and
+    ``json.loads`` would.
+    """
+
+    with path.open(encoding="utf-8") as handle:
+        return _Scanner(handle, chunk).document()
@@ -14,9 +14,14 @@ contract validity, consumer compatibility or permission to publish.
 from __future__ import annotations
 
 import argparse
+from concurrent.futures import ThreadPoolExecutor
+from contextlib import contextmanager
 from dataclasses import dataclass
+import functools
 import hashlib
 import heapq
+import importlib.util
+import io
 import json
 import os
 from pathlib import Path, PurePosixPath
@@ -26,14 +31,72 @@ import shutil
 import stat
 import subprocess
 import sys
-from typing import Any, Iterable, Sequence
+import tarfile
+import threading
+import time
+from typing import (
+    Any,
+    BinaryIO,
+    Callable,
+    Collection,
+    Iterable,
+    Iterator,
+    Sequence,
+    TypeVar,
+    cast,
+)
 from urllib.parse import urldefrag, urljoin, urlsplit
+import zipfile
+
+try:  # pragma: no cover - POSIX only
+    import fcntl
+except ModuleNotFoundError:  # pragma: no cover - fallback path
+    fcntl = None  # type: ignore[assignment]
+
+
+def _load_git_objects() -> Any:
+    """Import the in-process object reader, installed or from this checkout."""
+
+    try:
+        from metarepo_tools import git_objects as module
+    except ModuleNotFoundError:
+        candidate = Path(__file__).resolve().parents[2] / "metarepo_tools" / "git_objects.py"
+        if not candidate.is_file():  # pragma: no cover - script copied on its own
+            return None
+        spec = importlib.util.spec_from_file_location("_metarepo_git_objects", candidate)
+        if spec is None or spec.loader is None:  # pragma: no cover
+            return None
+        module = importlib.util.module_from_spec(spec)
+        spec.loader.exec_module(module)
+    return module
+
+
+git_objects = _load_git_objects()
 
 EXPECTED_REPOSITORY = "heimgewebe/metarepo"
 MANIFEST_NAME = "metarepo-contract-source.v1.json"
+DELTA_NAME = "metarepo-contract-source.v1.delta.json"
+MERKLE_NAME = "metarepo-contract-source.v1.merkle.json"
+STAT_INDEX_NAME = ".metarepo-contract-source.v1.stat.json"
+STAT_INDEX_FORMAT = 1
+VERIFY_MODES = ("stat", "full")
+# hashlib releases the GIL for buffers above 2 KiB, so digests scale over threads.
+HASH_WORKERS = min(8, os.cpu_count() or 1)
+PARALLEL_HASH_MIN_BYTES = 1024 * 1024
+COMPARE_CHUNK_BYTES = 1024 * 1024
+ARCHIVE_FORMATS = ("tar", "zip")
+# 1980-01-01T00:00:00Z: the earliest timestamp a zip entry can carry.
+ARCHIVE_MTIME = 315532800
+ARCHIVE_DATE_TIME = (1980, 1, 1, 0, 0, 0)
+OBJECT_READERS = ("auto", "git")
+STORE_LINKS = ("hardlink", "reflink")
+# Linux ioctl that shares extents between two files on a copy-on-write filesystem.
+FICLONE = 0x40049409
 MANIFEST_SCHEMA_PATH = "contracts/contract.source.manifest.schema.json"
 SOURCE_KINDS = ("detached_archive", "offline_cache")
 DEFAULT_CONTENT_ROOT = "content"
+PARSE_CACHE_FORMAT = 1
+DEFAULT_PARSE_CACHE_MAX_BYTES = 64 * 1024 * 1024
 
 HEX40 = re.compile(r"^[0-9a-f]{40}$")
 RELATIVE_POSIX = re.compile(r"^(?!.*(^|/)\.\.?(/|$))[A-Za-z0-9._-]+(/[A-Za-z0-9._-]+)*$")
@@ -57,6 +120,9 @@ SCHEMA_ARRAY_KEYWORDS = frozenset({"allOf", "anyOf", "oneOf", "prefixItems"})
 SCHEMA_MAP_KEYWORDS = frozenset(
     {"$defs", "dependentSchemas", "patternProperties", "properties"}
 )
+SCHEMA_WALK_KEYWORDS = (
+    SCHEMA_VALUE_KEYWORDS | SCHEMA_ARRAY_KEYWORDS | SCHEMA_MAP_KEYWORDS | {"$ref"}
+)
 
 
 class ManifestError(RuntimeError):
@@ -77,6 +143,74 @@ class GitTreeEntry:
     object_id: str
 
 
+@dataclass(frozen=True)
+class SchemaFacts:
+    """Everything the identifier index and closure need from one schema blob.
+
+    ``resources`` lists the ``("identifier" | "reference", uri)`` pairs in walk
+    order. ``error`` is the ``(code, detail)`` verdict that stopped the walk, if
+    any; resources yielded before the failure are kept so a replay raises at
+    exactly the same point.
+    """
+
+    resources: tuple[tuple[str, str], ...]
+    error: tuple[str, str] | None = None
+
+
+@dataclass(frozen=True)
+class SchemaIndex:
+    """Identifier index over every committed schema of one bound tree.
+
+    Built once per tree and shared by every closure computed against it.
+    ``blobs`` holds the schema bytes read so far and grows as closures fetch
+    members that the index itself did not need to read.
+    """
+
+    identifiers: dict[str, str]
+    schemas: dict[str, SchemaFacts]
+    blobs: dict[str, bytes]
+
+
+class PhaseTimings:
+    """Per-phase wall and CPU seconds plus counters, reported by ``--timings``.
+
+    Phases entered more than once accumulate; the report lists them in the order
+    they were first entered. Nothing here touches stdout.
+    """
+
+    def __init__(self) -> None:
+        self.phases: dict[str, dict[str, float]] = {}
+        self.counters: dict[str, int] = {}
+
+    @contextmanager
+    def phase(self, name: str) -> Iterator[None]:
+        entry = self.phases.setdefault(name, {"wall_s": 0.0, "cpu_s": 0.0, "calls": 0})
+        wall, cpu = time.perf_counter(), time.process_time()
+        try:
+            yield
+        finally:
+            entry["wall_s"] += time.perf_counter() - wall
+            entry["cpu_s"] += time.process_time() - cpu
+            entry["calls"] += 1
+
+    def count(self, name: str, amount: int = 1) -> None:
+        self.counters[name] = self.counters.get(name, 0) + amount
+
+    def render(self) -> str:
+        phases = {
+            name: {
+                "wall_s": round(entry["wall_s"], 6),
+                "cpu_s": round(entry["cpu_s"], 6),
+                "calls": int(entry["calls"]),
+            }
+            for name, entry in self.phases.items()
+        }
+        return json.dumps(
+            {"timings": phases, "counters": dict(sorted(self.counters.items()))},
+            separators=(",", ":"),
+        )
+
+
 def _git_environment() -> dict[str, str]:
     env = {key: value for key, value in os.environ.items() if not key.startswith("GIT_")}
     env["GIT_NO_REPLACE_OBJECTS"] = "1"
@@ -106,24 +240,201 @@ def _run_git(root: Path, *args: str, absent_ok: bool = False) -> str:
     return result.stdout.strip()
 
 
-def _run_git_bytes(
-    root: Path, *args: str, code: str = "SOURCE_NOT_GIT", detail: str = "Git read failed"
-) -> bytes:
-    try:
-        result = subprocess.run(
-            ["git", "-C", str(root), *args],
-            check=True,
-            capture_output=True,
-            env=_git_environment(),
+class GitObjectReader:
+    """One long-lived ``git cat-file --batch`` channel for immutable object reads.
+
+    Every commit, tree and blob read of one emission is streamed through the same
+    process. Requests are pipelined: object names are written by a helper thread
+    while responses are consumed in request order, so a few hundred schema blobs
+    cost one fork instead of one per blob. Replacement refs stay disabled through
+    the hermetic Git environment.
+
+    With ``object_reader="auto"`` objects are first read in-process from the
+    object database through ``metarepo_tools.git_objects``; the ``cat-file``
+    channel is only started for repository layouts or objects that reader does
+    not support.
+    """
+
+    def __init__(self, root: Path, object_reader: str = "auto") -> None:
+        self.root = root
+        self._process: subprocess.Popen[bytes] | None = None
+        self._store = _open_object_store(root) if object_reader == "auto" else None
+        self.counters: dict[str, int] = {}
+
+    def _tally(self, kind: str, data: bytes, route: str) -> None:
+        for name, amount in (
+            (f"{kind}s_read", 1),
+            (f"{kind}_bytes", len(data)),
+            (f"objects_via_{route}", 1),
+        ):
+            self.counters[name] = self.counters.get(name, 0) + amount
+
+    def __enter__(self) -> GitObjectReader:
+        return self
+
+    def __exit__(self, *exc_info: object) -> None:
+        self.close()
+
+    def close(self) -> None:
+        store, self._store = self._store, None
+        if store is not None:
+            store.close()
+        process, self._process = self._process, None
+        if process is None:
+            return
+        try:
+            if process.stdin is not None:
+                process.stdin.close()
+            process.wait(timeout=5)
+        except (OSError, subprocess.TimeoutExpired):
+            process.kill()
+            process.wait()
+        finally:
+            for stream in (process.stdout, process.stderr):
+                if stream is not None:
+                    stream.close()
+
+    def _channel(self, code: str, detail: str) -> subprocess.Popen[bytes]:
+        if self._process is not None and self._process.poll() is None:
+            return self._process
+        self.close()
+        try:
+            self._process = subprocess.Popen(
+                ["git", "-C", str(self.root), "cat-file", "--batch"],
+                stdin=subprocess.PIPE,
+                stdout=subprocess.PIPE,
+                stderr=subprocess.PIPE,
+                env=_git_environment(),
+            )
+        except OSError as exc:
+            raise ManifestError(code, f"{detail}: {exc}") from exc
+        return self._process
+
+    def _broken(self, code: str, detail: str) -> ManifestError:
+        process = self._process
+        stderr = b""
+        if process is not None:
+            if process.stdin is not None:
+                try:
+                    process.stdin.close()
+                except OSError:
+                    pass
+            try:
+                process.wait(timeout=5)
+                if process.stderr is not None:
+                    stderr = process.stderr.read()
+            except (OSError, subprocess.TimeoutExpired):
+                pass
+        self.close()
+        message = stderr.decode("utf-8", errors="replace").strip()
+        return ManifestError(code, message or f"{detail}: Git object channel closed")
+
+    @staticmethod
+    def _send(process: subprocess.Popen[bytes], object_ids: list[str]) -> None:
+        assert process.stdin is not None
+        try:
+            process.stdin.write("".join(f"{oid}\n" for oid in object_ids).encode("ascii"))
+            process.stdin.flush()
+        except (OSError, ValueError):
+            # The reader side reports the broken channel with a typed error.
+            pass
+
+    def _receive(
+        self, process: subprocess.Popen[bytes], code: str, detail: str
+    ) -> tuple[list[bytes], bytes]:
+        assert process.stdout is not None
+        header = process.stdout.readline()
+        if not header.endswith(b"\n"):
+            raise self._broken(code, detail)
+        fields = header.split()
+        if len(fields) != 3:
+            return fields, b""
+        try:
+            size = int(fields[2])
+        except ValueError as exc:
+            raise self._broken(code, detail) from exc
+        data = process.stdout.read(size + 1)
+        if len(data) != size + 1 or not data.endswith(b"\n"):
+            raise self._broken(code, detail)
+        return fields, data[:-1]
+
+    def iter_objects(
+        self, requests: Sequence[tuple[str, str, str]], *, code: str
+    ) -> Iterator[bytes]:
+        """Yield the bytes of each ``(object_id, kind, detail)`` request in order.
+
+        A failing request raises its typed error when it is reached.
+        """
+
+        if self._store is None:
+            yield from self._iter_channel(requests, code=code)
+            return
+        for request in requests:
+            object_id, kind, detail = request
+            try:
+                found, data = self._store.read(object_id)
+            except git_objects.CorruptObject as exc:
+                raise ManifestError(code, f"{detail}: {exc}") from exc
+            except git_objects.ObjectStoreError:
+                yield from self._iter_channel([request], code=code)
+                continue
+            if found != kind:
+                raise ManifestError(code, f"{detail}: object {object_id} is not a {kind}")
+            self._tally(kind, data, "object_store")
+            yield data
+
+    def _iter_channel(
+        self, requests: Sequence[tuple[str, str, str]], *, code: str
+    ) -> Iterator[bytes]:
+        """Stream requests through ``cat-file``.
+
+        The channel is drained of any responses still in flight so it stays
+        reusable.
+        """
+
+        if not requests:
+            return
+        process = self._channel(code, requests[0][2])
+        writer = threading.Thread(
+            target=self._send,
+            args=(process, [object_id for object_id, _kind, _detail in requests]),
+            daemon=True,
         )
-    except (OSError, subprocess.CalledProcessError) as exc:
-        stderr = getattr(exc, "stderr", b"") or b""
-        if isinstance(stderr, bytes):
-            error_detail = stderr.decode("utf-8", errors="replace").strip()
-        else:
-            error_detail = str(stderr).strip()
-        raise ManifestError(code, error_detail or f"{detail}: {exc}") from exc
-    return result.stdout
+        writer.start()
+        remaining = len(requests)
+        try:
+            for object_id, kind, detail in requests:
+                fields, data = self._receive(process, code, detail)
+                remaining -= 1
+                if len(fields) != 3:
+                    raise ManifestError(
+                        code, f"{detail}: object {object_id} is unavailable"
+                    )
+                if fields[0].decode("ascii", errors="replace") != object_id:
+                    raise self._broken(code, detail)
+                if fields[1].decode("ascii", errors="replace") != kind:
+                    raise ManifestError(
+                        code, f"{detail}: object {object_id} is not a {kind}"
+                    )
+                self._tally(kind, data, "cat_file")
+                yield data
+        finally:
+            try:
+                while remaining and self._process is process:
+                    self._receive(process, code, "drain")
+                    remaining -= 1
+            except ManifestError:
+                pass
+            writer.join()
+
+    def read(self, object_id: str, kind: str, *, code: str, detail: str) -> bytes:
+        """Return the bytes of exactly one object of the expected kind."""
+
+        objects = self.iter_objects([(object_id, kind, detail)], code=code)
+        try:
+            return next(objects)
+        finally:
+            objects.close()
 
 
 def _repository_identity(origin: str) -> str:
@@ -164,10 +475,76 @@ def _repository_identity(origin: str) -> str:
     return normalized.lower()
 
 
+_T = TypeVar("_T")
+_R = TypeVar("_R")
+
+
 def _sha256(data: bytes) -> str:
     return hashlib.sha256(data).hexdigest()
 
 
+def _bounded_map(function: Callable[[_T], _R], items: Sequence[_T], total_bytes: int) -> list[_R]:
+    """Map in input order, on a bounded thread pool once the work is worth it."""
+
+    if HASH_WORKERS <= 1 or len(items) < 2 or total_bytes < PARALLEL_HASH_MIN_BYTES:
+        return [function(item) for item in items]
+    # Contiguous batches keep per-task overhead low for many small schemas.
+    size = -(-len(items) // (HASH_WORKERS * 4))
+    batches = [items[start : start + size] for start in range(0, len(items), size)]
+    with ThreadPoolExecutor(max_workers=HASH_WORKERS) as pool:
+        results = pool.map(lambda batch: [function(item) for item in batch], batches)
+        return [result for batch in results for result in batch]
+
+
+def _sha256_many(payload_bytes: dict[str, bytes]) -> dict[str, str]:
+    """Digest every payload; the result is ordered by path, never by completion."""
+
+    relatives = sorted(payload_bytes)
+    digests = _bounded_map(
+        lambda relative: _sha256(payload_bytes[relative]),
+        relatives,
+        sum(len(data) for data in payload_bytes.values()),
+    )
+    return dict(zip(relatives, digests))
+
+
+def _cached_bytes_match(path: Path, data: bytes) -> bool:
+    """Stream-compare one regular file against the bound bytes.
+
+    The final path component is opened without following symlinks, and the
+    file is read in fixed chunks into a reused buffer, so a large cached
+    bundle is never copied into one Python object. Reads release the GIL.
+    """
+
+    descriptor = os.open(path, os.O_RDONLY | getattr(os, "O_NOFOLLOW", 0))
+    with os.fdopen(descriptor, "rb", buffering=0) as handle:
+        metadata = os.fstat(handle.fileno())
+        if not stat.S_ISREG(metadata.st_mode):
+            raise OSError(f"not a regular file: {path}")
+        if metadata.st_size != len(data):
+            return False
+        return _stream_matches(handle, data)
+
+
+def _stream_matches(handle: io.RawIOBase | io.BufferedIOBase, data: bytes) -> bool:
+    """Compare a readable stream against ``data`` in fixed-size chunks."""
+
+    expected = memoryview(data)
+    buffer = bytearray(min(COMPARE_CHUNK_BYTES, len(data) + 1))
+    offset = 0
+    while True:
+        count = handle.readinto(buffer)
+        if not count:
+            return offset == len(data)
+        if offset + count > len(data):
+            return False
+        chunk = buffer if count == len(buffer) else buffer[:count]
+        # bytearray == memoryview compares with memcmp over both buffers.
+        if chunk != expected[offset : offset + count]:
+            return False
+        offset += count
+
+
 def _read_bytes(path: Path, code: str, detail: str) -> bytes:
     try:
         return path.read_bytes()
@@ -183,8 +560,17 @@ def _relative_path(value: str, code: str) -> str:
     return PurePosixPath(value).as_posix()
 
 
-def resolve_source(source_path: str, expected_commit: str | None) -> tuple[Path, str]:
-    """Resolve one explicit, clean, identity-bound Metarepo checkout."""
+def resolve_source(
+    source_path: str,
+    expected_commit: str | None,
+    object_reader: str = "auto",
+    *,
+    require_clean: bool = True,
+) -> tuple[Path, str]:
+    """Resolve one explicit, clean, identity-bound Metarepo checkout.
+
+    Callers that only read committed objects may pass ``require_clean=False``.
+    """
 
     try:
         root = Path(source_path).expanduser().resolve(strict=True)
@@ -234,16 +620,34 @@ def resolve_source(source_path: str, expected_commit: str | None) -> tuple[Path,
                 "SOURCE_COMMIT_MISMATCH", f"expected {expected}, observed {head}"
             )
 
-    _validate_commit_objects(root, head)
+    with GitObjectReader(root, object_reader) as objects:
+        _validate_commit_objects(objects, head)
+
+    if require_clean:
+        _require_clean(root)
+    return root, head
+
 
-    if _run_git(root, "status", "--porcelain=v1", "--untracked-files=all"):
+def _require_clean(root: Path) -> None:
+    # Without optional locks, status never rewrites the index's stat cache, so
+    # checking a source leaves its Git state exactly as it was.
+    if _run_git(
+        root, "--no-optional-locks", "status", "--porcelain=v1", "--untracked-files=all"
+    ):
         raise ManifestError(
             "SOURCE_DIRTY",
             "a manifest binds immutable bytes; the Metarepo source must be clean. "
             "Commit or stash local changes, or use the Git-checkout resolver path instead.",
         )
 
-    return root, head
+
+def _open_object_store(root: Path) -> Any:
+    if git_objects is None:
+        return None
+    try:
+        return git_objects.open_object_store(root)
+    except (git_objects.ObjectStoreError, OSError, UnicodeError):
+        return None
 
 
 def _git_object_id(kind: str, data: bytes) -> str:
@@ -251,14 +655,12 @@ def _git_object_id(kind: str, data: bytes) -> str:
     return hashlib.sha1(header + data).hexdigest()
 
 
-def _validate_commit_objects(root: Path, commit: str) -> None:
+def _validate_commit_objects(objects: GitObjectReader, commit: str) -> None:
     """Validate the literal commit and root-tree objects without replacements."""
 
-    commit_data = _run_git_bytes(
-        root,
-        "cat-file",
-        "commit",
+    commit_data = objects.read(
         commit,
+        "commit",
         code="SOURCE_COMMIT_INVALID",
         detail=f"cannot read commit object {commit}",
     )
@@ -277,11 +679,9 @@ def _validate_commit_objects(root: Path, commit: str) -> None:
         ) from exc
     if not HEX40.fullmatch(tree):
         raise ManifestError("SOURCE_COMMIT_INVALID", "commit has an invalid root tree")
-    tree_data = _run_git_bytes(
-        root,
-        "cat-file",
-        "tree",
+    tree_data = objects.read(
         tree,
+        "tree",
         code="SOURCE_COMMIT_INVALID",
         detail=f"cannot read root tree object {tree}",
     )
@@ -291,36 +691,86 @@ def _validate_commit_objects(root: Path, commit: str) -> None:
         )
 
 
-def _commit_tree(root: Path, commit: str) -> dict[str, GitTreeEntry]:
-    """Read the contracts tree from one commit, never from the working tree."""
+def _commit_root_tree(commit_data: bytes) -> str | None:
+    first_line = commit_data.split(b"\n", 1)[0]
+    if not first_line.startswith(b"tree "):
+        return None
+    try:
+        tree = first_line.removeprefix(b"tree ").decode("ascii")
+    except UnicodeDecodeError:
+        return None
+    return tree if HEX40.fullmatch(tree) else None
+
+
+def _tree_entry_kind(raw_mode: bytes) -> tuple[str, str]:
+    """Return the ``ls-tree`` mode and kind for one raw tree-object mode."""
+
+    mode = int(raw_mode, 8)
+    if stat.S_ISDIR(mode):
+        return "040000", "tree"
+    if stat.S_ISLNK(mode):
+        return "120000", "blob"
+    if stat.S_ISREG(mode):
+        return ("100755" if mode & 0o100 else "100644"), "blob"
+    return "160000", "commit"
+
+
+def _parse_tree(data: bytes) -> Iterator[tuple[str, str, str, bytes]]:
+    """Yield ``(mode, kind, object_id, raw_name)`` for each raw tree entry."""
+
+    offset = 0
+    while offset < len(data):
+        space = data.index(b" ", offset)
+        nul = data.index(b"\0", space)
+        mode, kind = _tree_entry_kind(data[offset:space])
+        object_id = data[nul + 1 : nul + 21].hex()
+        if len(object_id) != 40:
+            raise ValueError("truncated tree entry")
+        yield mode, kind, object_id, data[space + 1 : nul]
+        offset = nul + 21
+
+
+def _commit_tree(objects: GitObjectReader, commit: str) -> dict[str, GitTreeEntry]:
+    """Read the contracts tree from one commit, never from the working tree.
+
+    Equivalent to ``git ls-tree -r --full-tree <commit> -- contracts``; every
+    tree level is fetched as one pipelined batch over the object channel.
+    """
+
+    code = "SOURCE_COMMIT_INVALID"
+    detail = f"cannot inspect contract tree at {commit}"
+    root_tree = _commit_root_tree(objects.read(commit, "commit", code=code, detail=detail))
+    if root_tree is None:
+        raise ManifestError(code, f"{detail}: commit has no valid root tree")
 
-    raw_tree = _run_git_bytes(
-        root,
-        "ls-tree",
-        "-r",
-        "-z",
-        "--full-tree",
-        commit,
-        "--",
-        "contracts",
-        code="SOURCE_COMMIT_INVALID",
-        detail=f"cannot inspect contract tree at {commit}",
-    )
     entries: dict[str, GitTreeEntry] = {}
-    for raw_entry in raw_tree.split(b"\0"):
-        if not raw_entry:
-            continue
-        try:
-            raw_metadata, raw_path = raw_entry.split(b"\t", 1)
-            mode, kind, object_id = raw_metadata.decode("ascii").split(" ")
-            relative = raw_path.decode("utf-8")
-        except (UnicodeDecodeError, ValueError) as exc:
-            raise ManifestError(
-                "SCHEMA_PATH_INVALID",
-                "the committed contracts tree contains an unrepresentable path",
-            ) from exc
-        entries[relative] = GitTreeEntry(mode, kind, object_id)
-    return entries
+    level: list[tuple[str, str]] = [("", root_tree)]
+    while level:
+        subtrees: list[tuple[str, str]] = []
+        requests = [(object_id, "tree", detail) for _prefix, object_id in level]
+        for (prefix, _object_id), data in zip(
+            level, objects.iter_objects(requests, code=code)
+        ):
+            try:
+                parsed = list(_parse_tree(data))
+            except ValueError as exc:
+                raise ManifestError(code, f"{detail}: malformed tree object") from exc
+            for mode, kind, object_id, raw_name in parsed:
+                if not prefix and raw_name != b"contracts":
+                    continue
+                try:
+                    relative = prefix + raw_name.decode("utf-8")
+                except UnicodeDecodeError as exc:
+                    raise ManifestError(
+                        "SCHEMA_PATH_INVALID",
+                        "the committed contracts tree contains an unrepresentable path",
+                    ) from exc
+                if kind == "tree":
+                    subtrees.append((f"{relative}/", object_id))
+                else:
+                    entries[relative] = GitTreeEntry(mode, kind, object_id)
+        level = subtrees
+    return dict(sorted(entries.items(), key=lambda item: item[0].encode("utf-8")))
 
 
 def select_schemas(
@@ -377,13 +827,9 @@ def select_schemas(
     return sorted(selected)
 
 
-def _read_schema_blob(
-    root: Path,
-    tree: dict[str, GitTreeEntry],
-    relative: str,
-    *,
-    referrer: str | None = None,
-) -> bytes:
+def _schema_blob_entry(
+    tree: dict[str, GitTreeEntry], relative: str, *, referrer: str | None = None
+) -> GitTreeEntry:
     entry = tree.get(relative)
     if entry is None:
         if referrer is not None:
@@ -405,16 +851,54 @@ def _read_schema_blob(
             "SCHEMA_NOT_REGULAR",
             f"schema is not a regular Git blob in the bound commit: {relative}",
         )
-    return _run_git_bytes(
-        root,
-        "cat-file",
-        "blob",
+    return entry
+
+
+def _read_schema_blob(
+    objects: GitObjectReader,
+    tree: dict[str, GitTreeEntry],
+    relative: str,
+    *,
+    referrer: str | None = None,
+) -> bytes:
+    entry = _schema_blob_entry(tree, relative, referrer=referrer)
+    return objects.read(
         entry.object_id,
+        "blob",
         code="SCHEMA_UNREADABLE",
         detail=f"cannot read committed schema blob {relative}",
     )
 
 
+def _read_schema_blobs(
+    objects: GitObjectReader, tree: dict[str, GitTreeEntry], relatives: Sequence[str]
+) -> Iterator[tuple[str, bytes]]:
+    """Yield committed schema bytes in order over one pipelined batch.
+
+    Failures surface at the same position and with the same code as reading
+    each blob on its own would have produced.
+    """
+
+    requests: list[tuple[str, str, str]] = []
+    failure: ManifestError | None = None
+    for relative in relatives:
+        try:
+            entry = _schema_blob_entry(tree, relative)
+        except ManifestError as exc:
+            failure = exc
+            break
+        requests.append(
+            (entry.object_id, "blob", f"cannot read committed schema blob {relative}")
+        )
+    blobs = objects.iter_objects(requests, code="SCHEMA_UNREADABLE")
+    try:
+        yield from zip(relatives, blobs)
+    finally:
+        blobs.close()
+    if failure is not None:
+        raise failure
+
+
 def _decode_schema(relative: str, data: bytes) -> Any:
     def reject_duplicate_keys(pairs: list[tuple[str, Any]]) -> dict[str, Any]:
         result: dict[str, Any] = {}
@@ -434,7 +918,7 @@ def _decode_schema(relative: str, data: bytes) -> Any:
             object_pairs_hook=reject_duplicate_keys,
             parse_constant=reject_constant,
         )
-    except (UnicodeDecodeError, json.JSONDecodeError, ValueError) as exc:
+    except (UnicodeDecodeError, json.JSONDecodeError, ValueError, RecursionError) as exc:
         raise ManifestError(
             "SCHEMA_JSON_INVALID",
             f"cannot inspect local references in {relative}: {exc}",
@@ -445,17 +929,28 @@ def _physical_schema_uri(relative: str) -> str:
     return f"https://metarepo.invalid/{relative}"
 
 
-def _resolve_uri(referrer: str, base_uri: str, value: str, keyword: str) -> str:
+@functools.lru_cache(maxsize=65536)
+def _join_uri(base_uri: str, value: str) -> str | None:
+    """Resolve ``value`` against ``base_uri``; ``None`` marks an invalid value.
+
+    Generated schemas repeat the same ``$ref`` under the same base thousands of
+    times, so results are memoized per ``(base_uri, value)`` pair.
+    """
+
     try:
         parsed = urlsplit(value)
         resolved = urljoin(base_uri, value)
         urlsplit(resolved)
-    except ValueError as exc:
-        raise ManifestError(
-            f"SCHEMA_{keyword}_INVALID",
-            f"{referrer} contains an invalid ${keyword.lower()}: {value!r}",
-        ) from exc
+    except ValueError:
+        return None
     if not resolved or (not parsed.scheme and value.startswith("//")):
+        return None
+    return resolved
+
+
+def _resolve_uri(referrer: str, base_uri: str, value: str, keyword: str) -> str:
+    resolved = _join_uri(base_uri, value)
+    if resolved is None:
         raise ManifestError(
             f"SCHEMA_{keyword}_INVALID",
             f"{referrer} contains an invalid ${keyword.lower()}: {value!r}",
@@ -465,84 +960,251 @@ def _resolve_uri(referrer: str, base_uri: str, value: str, keyword: str) -> str:
 
 def _schema_resources_and_references(
     relative: str, schema: Any, base_uri: str
-) -> Iterable[tuple[str, str]]:
-    """Yield resources and references at Draft 2020-12 schema positions."""
-
-    if isinstance(schema, dict):
-        active_base = base_uri
-        if "$id" in schema:
-            identifier = schema["$id"]
+) -> Iterator[tuple[str, str]]:
+    """Yield resources and references at Draft 2020-12 schema positions.
+
+    The walk is depth-first over keywords in sorted order, driven by an explicit
+    stack so nesting depth costs neither recursion nor delegated generators.
+    Pending work is either a ``(subschema, base_uri)`` pair to visit or a
+    ``$ref`` value to resolve once it is reached.
+    """
+
+    stack: list[tuple[bool, Any, str]] = [(False, schema, base_uri)]
+    while stack:
+        is_reference, node, base = stack.pop()
+        if is_reference:
+            if not isinstance(node, str):
+                raise ManifestError(
+                    "SCHEMA_REF_INVALID", f"{relative} contains a non-string $ref"
+                )
+            yield "reference", _resolve_uri(relative, base, node, "REF")
+            continue
+        if not isinstance(node, dict):
+            continue
+        active_base = base
+        if "$id" in node:
+            identifier = node["$id"]
             if not isinstance(identifier, str):
                 raise ManifestError(
                     "SCHEMA_ID_INVALID", f"{relative} contains a non-string $id"
                 )
-            active_base = _resolve_uri(relative, base_uri, identifier, "ID")
+            active_base = _resolve_uri(relative, base, identifier, "ID")
             document_uri, fragment = urldefrag(active_base)
             if fragment:
                 raise ManifestError(
                     "SCHEMA_ID_INVALID", f"{relative} contains a fragment-bearing $id"
                 )
             yield "identifier", document_uri
-        for key in sorted(schema):
-            value = schema[key]
+        pending: list[tuple[bool, Any, str]] = []
+        for key in sorted(key for key in node if key in SCHEMA_WALK_KEYWORDS):
+            value = node[key]
             if key == "$ref":
-                if not isinstance(value, str):
-                    raise ManifestError(
-                        "SCHEMA_REF_INVALID", f"{relative} contains a non-string $ref"
-                    )
-                yield "reference", _resolve_uri(relative, active_base, value, "REF")
+                pending.append((True, value, active_base))
             elif key in SCHEMA_VALUE_KEYWORDS:
-                yield from _schema_resources_and_references(relative, value, active_base)
+                pending.append((False, value, active_base))
             elif key in SCHEMA_ARRAY_KEYWORDS and isinstance(value, list):
-                for subschema in value:
-                    yield from _schema_resources_and_references(
-                        relative, subschema, active_base
-                    )
+                pending.extend((False, subschema, active_base) for subschema in value)
             elif key in SCHEMA_MAP_KEYWORDS and isinstance(value, dict):
-                for name in sorted(value):
-                    yield from _schema_resources_and_references(
-                        relative, value[name], active_base
-                    )
+                pending.extend((False, value[name], active_base) for name in sorted(value))
+        stack.extend(reversed(pending))
+
+
+def _inspect_schema(relative: str, data: bytes) -> SchemaFacts:
+    resources: list[tuple[str, str]] = []
+    try:
+        schema = _decode_schema(relative, data)
+        resources.extend(
+            _schema_resources_and_references(
+                relative, schema, _physical_schema_uri(relative)
+            )
+        )
+    except ManifestError as exc:
+        return SchemaFacts(tuple(resources), (exc.code, exc.detail))
+    return SchemaFacts(tuple(resources))
+
+
+class SchemaParseCache:
+    """Content-addressed on-disk cache of per-blob schema inspection verdicts.
+
+    Entries are keyed by the immutable Git blob id plus the committed path that
+    anchors the blob's physical base URI, so a run against a new commit only
+    decodes blobs that actually changed. Writes go through a temporary file and
+    an atomic rename, unreadable or foreign entries count as misses, and
+    concurrent evictions tolerate each other; the directory can therefore be
+    shared between parallel CI jobs. The cache stores derived facts only; bound
+    bytes and their digests always come from the Git object store.
+    """
+
+    def __init__(self, directory: Path, max_bytes: int = DEFAULT_PARSE_CACHE_MAX_BYTES) -> None:
+        self.directory = directory / f"v{PARSE_CACHE_FORMAT}"
+        self.max_bytes = max_bytes
+        self.hits = 0
+        self.misses = 0
+        try:
+            self.directory.mkdir(parents=True, exist_ok=True)
+        except OSError as exc:
+            raise ManifestError("PARSE_CACHE_INVALID", f"{directory}: {exc}") from exc
+
+    def _entry_path(self, object_id: str, relative: str) -> Path:
+        path_key = _sha256(relative.encode("utf-8"))[:16]
+        return self.directory / object_id[:2] / f"{object_id}-{path_key}.json"
+
+    def get(self, object_id: str, relative: str) -> SchemaFacts | None:
+        facts = self._lookup(object_id, relative)
+        if facts is None:
+            self.misses += 1
+        else:
+            self.hits += 1
+        return facts
+
+    def _lookup(self, object_id: str, relative: str) -> SchemaFacts | None:
+        path = self._entry_path(object_id, relative)
+        try:
+            record = json.loads(path.read_bytes())
+        except (OSError, UnicodeDecodeError, ValueError):
+            return None
+        try:
+            if (
+                record["format"] != PARSE_CACHE_FORMAT
+                or record["object_id"] != object_id
+                or record["path"] != relative
+            ):
+                return None
+            resources = tuple((str(kind), str(uri)) for kind, uri in record["resources"])
+            error = record["error"]
+            facts = SchemaFacts(
+                resources, None if error is None else (str(error[0]), str(error[1]))
+            )
+        except (KeyError, TypeError, ValueError, IndexError):
+            return None
+        try:
+            os.utime(path)
+        except OSError:
+            pass
+        return facts
+
+    def put(self, object_id: str, relative: str, facts: SchemaFacts) -> None:
+        path = self._entry_path(object_id, relative)
+        record = {
+            "format": PARSE_CACHE_FORMAT,
+            "object_id": object_id,
+            "path": relative,
+            "resources": [list(item) for item in facts.resources],
+            "error": None if facts.error is None else list(facts.error),
+        }
+        payload = json.dumps(record, separators=(",", ":")).encode("utf-8")
+        temporary = path.with_name(f".{path.name}.{os.getpid()}.{threading.get_ident()}.tmp")
+        try:
+            path.parent.mkdir(exist_ok=True)
+            temporary.write_bytes(payload)
+            os.replace(temporary, path)
+        except OSError:
+            try:
+                temporary.unlink()
+            except OSError:
+                pass
+
+    def evict(self) -> None:
+        """Drop least recently used entries until the cache fits its budget."""
+
+        entries: list[tuple[int, int, str]] = []
+        total = 0
+        try:
+            shards = list(os.scandir(self.directory))
+        except OSError:
+            return
+        for shard in shards:
+            try:
+                if not shard.is_dir(follow_symlinks=False):
+                    continue
+                with os.scandir(shard.path) as iterator:
+                    for entry in iterator:
+                        metadata = entry.stat(follow_symlinks=False)
+                        entries.append((metadata.st_mtime_ns, metadata.st_size, entry.path))
+                        total += metadata.st_size
+            except OSError:
+                continue
+        for _mtime, size, path in sorted(entries):
+            if total <= self.max_bytes:
+                break
+            try:
+                os.unlink(path)
+            except FileNotFoundError:
+                pass
+            except OSError:
+                continue
+            total -= size
 
 
 def _schema_identifier_index(
-    root: Path, tree: dict[str, GitTreeEntry]
-) -> tuple[dict[str, str], dict[str, tuple[Any, bytes]]]:
-    """Index every committed schema resource identifier deterministically."""
+    objects: GitObjectReader,
+    tree: dict[str, GitTreeEntry],
+    cache: SchemaParseCache | None = None,
+    *,
+    known: dict[tuple[str, str], SchemaFacts] | None = None,
+) -> SchemaIndex:
+    """Index every committed schema resource identifier deterministically.
+
+    Blobs answered by ``known`` (facts keyed by ``(object_id, path)`` from an
+    index of another tree) or by ``cache`` are not read at all.
+    """
 
     identifiers: dict[str, str] = {}
-    schemas: dict[str, tuple[Any, bytes]] = {}
-    for relative in sorted(
+    schemas: dict[str, SchemaFacts] = {}
+    blobs: dict[str, bytes] = {}
+    committed = sorted(
         path
         for path in tree
         if path.startswith("contracts/") and path.endswith(".schema.json")
-    ):
-        data = _read_schema_blob(root, tree, relative)
-        schema = _decode_schema(relative, data)
-        schemas[relative] = (schema, data)
-        physical_uri = _physical_schema_uri(relative)
-        previous = identifiers.get(physical_uri)
-        if previous is not None and previous != relative:
-            raise ManifestError(
-                "SCHEMA_ID_DUPLICATE",
-                f"schema resource identifier {physical_uri!r} is bound by both "
-                f"{previous} and {relative}",
-            )
-        identifiers[physical_uri] = relative
-        for kind, identifier in _schema_resources_and_references(
-            relative, schema, physical_uri
-        ):
-            if kind != "identifier":
-                continue
-            previous = identifiers.get(identifier)
+    )
+    cached: dict[str, SchemaFacts] = {}
+    if cache is not None or known:
+        for relative in committed:
+            entry = tree[relative]
+            if entry.kind == "blob" and entry.mode in {"100644", "100755"}:
+                facts = (known or {}).get((entry.object_id, relative))
+                if facts is None and cache is not None:
+                    facts = cache.get(entry.object_id, relative)
+                if facts is not None:
+                    cached[relative] = facts
+    reads = _read_schema_blobs(
+        objects, tree, [path for path in committed if path not in cached]
+    )
+    try:
+        for relative in committed:
+            facts = cached.get(relative)
+            if facts is None:
+                _relative, data = next(reads)
+                blobs[relative] = data
+                facts = _inspect_schema(relative, data)
+                if cache is not None:
+                    cache.put(tree[relative].object_id, relative, facts)
+            schemas[relative] = facts
+            physical_uri = _physical_schema_uri(relative)
+            previous = identifiers.get(physical_uri)
             if previous is not None and previous != relative:
                 raise ManifestError(
                     "SCHEMA_ID_DUPLICATE",
-                    f"schema resource identifier {identifier!r} is bound by both "
+                    f"schema resource identifier {physical_uri!r} is bound by both "
                     f"{previous} and {relative}",
                 )
-            identifiers[identifier] = relative
-    return identifiers, schemas
+            identifiers[physical_uri] = relative
+            for kind, identifier in facts.resources:
+                if kind != "identifier":
+                    continue
+                previous = identifiers.get(identifier)
+                if previous is not None and previous != relative:
+                    raise ManifestError(
+                        "SCHEMA_ID_DUPLICATE",
+                        f"schema resource identifier {identifier!r} is bound by both "
+                        f"{previous} and {relative}",
+                    )
+                identifiers[identifier] = relative
+            if facts.error is not None:
+                raise ManifestError(*facts.error)
+    finally:
+        reads.close()
+    return SchemaIndex(identifiers, schemas, blobs)
 
 
 def _resolve_local_reference(
@@ -594,49 +1256,61 @@ def _resolve_local_reference(
     return normalized
 
 
-def _schema_closure(
-    root: Path,
+def _schema_closure_paths(
+    objects: GitObjectReader,
     tree: dict[str, GitTreeEntry],
     schema_paths: Iterable[str],
-) -> dict[str, bytes]:
-    """Return deterministic transitive local $ref closure from committed blobs."""
+    index: SchemaIndex,
+) -> list[str]:
+    """Return the sorted transitive local $ref closure without reading its bytes.
 
-    identifiers, schemas = _schema_identifier_index(root, tree)
+    Only a member the index has no facts for is read, and its bytes are kept in
+    ``index.blobs``.
+    """
+
+    identifiers, schemas, blobs = index.identifiers, index.schemas, index.blobs
     pending = [(relative, "") for relative in schema_paths]
     heapq.heapify(pending)
-    payload_bytes: dict[str, bytes] = {}
+    bound: set[str] = set()
     while pending:
         relative, referrer = heapq.heappop(pending)
-        if relative in payload_bytes:
+        if relative in bound:
             continue
-        cached = schemas.get(relative)
-        if cached is None:
-            data = _read_schema_blob(root, tree, relative, referrer=referrer or None)
-            schema = _decode_schema(relative, data)
-        else:
-            schema, data = cached
-        payload_bytes[relative] = data
-        for kind, resolved_uri in _schema_resources_and_references(
-            relative, schema, _physical_schema_uri(relative)
-        ):
+        facts = schemas.get(relative)
+        if facts is None:
+            data = _read_schema_blob(objects, tree, relative, referrer=referrer or None)
+            facts = _inspect_schema(relative, data)
+            if facts.error is not None:
+                raise ManifestError(*facts.error)
+            blobs[relative] = data
+        bound.add(relative)
+        for kind, resolved_uri in facts.resources:
             if kind != "reference":
                 continue
             dependency = _resolve_local_reference(relative, resolved_uri, identifiers)
-            if dependency is None or dependency in payload_bytes:
+            if dependency is None or dependency in bound:
                 continue
             heapq.heappush(pending, (dependency, relative))
-    return dict(sorted(payload_bytes.items()))
+    return sorted(bound)
 
 
-def build_manifest(
-    root: Path,
+def _schema_closure(
+    objects: GitObjectReader,
     tree: dict[str, GitTreeEntry],
-    commit: str,
-    source_kind: str,
-    content_root: str,
     schema_paths: Iterable[str],
-) -> tuple[dict[str, Any], dict[str, bytes]]:
-    """Return the manifest payload plus the exact bytes it binds."""
+    index: SchemaIndex,
+) -> dict[str, bytes]:
+    """Return deterministic transitive local $ref closure from committed blobs."""
+
+    bound = _schema_closure_paths(objects, tree, schema_paths, index)
+    blobs = index.blobs
+    unread = [relative for relative in bound if relative not in blobs]
+    blobs.update(_read_schema_blobs(objects, tree, unread))
+    return {relative: blobs[relative] for relative in bound}
+
+
+def _manifest_layout(source_kind: str, content_root: str) -> str:
+    """Validate source kind and content root; return the normalized root."""
 
     if source_kind not in SOURCE_KINDS:
         raise ManifestError(
@@ -644,14 +1318,46 @@ def build_manifest(
             f"source_kind must be one of {', '.join(SOURCE_KINDS)}",
         )
     content = _relative_path(content_root, "CONTENT_ROOT_INVALID")
-    if PurePosixPath(content).parts[0] == MANIFEST_NAME:
+    if PurePosixPath(content).parts[0] in {
+        MANIFEST_NAME,
+        DELTA_NAME,
+        MERKLE_NAME,
+        STAT_INDEX_NAME,
+    }:
         raise ManifestError(
             "CONTENT_ROOT_INVALID",
             "content root must not collide with the manifest path",
         )
+    return content
 
-    payload_bytes = _schema_closure(root, tree, schema_paths)
-    digests = {relative: _sha256(data) for relative, data in payload_bytes.items()}
+
+def build_manifest(
+    objects: GitObjectReader,
+    tree: dict[str, GitTreeEntry],
+    commit: str,
+    source_kind: str,
+    content_root: str,
+    schema_paths: Iterable[str],
+    cache: SchemaParseCache | None = None,
+    *,
+    index: SchemaIndex | None = None,
+    timings: PhaseTimings | None = None,
+) -> tuple[dict[str, Any], dict[str, bytes]]:
+    """Return the manifest payload plus the exact bytes it binds.
+
+    Pass a prebuilt ``index`` to share one identifier index between several
+    manifests of the same tree; otherwise one is built (through ``cache``).
+    """
+
+    timings = timings or PhaseTimings()
+    content = _manifest_layout(source_kind, content_root)
+    if index is None:
+        with timings.phase("schema_identifier_index"):
+            index = _schema_identifier_index(objects, tree, cache)
+    with timings.phase("schema_closure"):
+        payload_bytes = _schema_closure(objects, tree, schema_paths, index)
+    with timings.phase("sha256"):
+        digests = _sha256_many(payload_bytes)
 
     manifest = {
         "schema_version": 1,
@@ -664,6 +1370,63 @@ def build_manifest(
     return manifest, payload_bytes
 
 
+def build_delta(
+    objects: GitObjectReader,
+    base_commit: str,
+    consumers: Sequence[str],
+    schemas: Sequence[str],
+    tree: dict[str, GitTreeEntry],
+    index: SchemaIndex,
+    manifest: dict[str, Any],
+    payload_bytes: dict[str, bytes],
+    cache: SchemaParseCache | None = None,
+) -> tuple[dict[str, Any], dict[str, bytes]]:
+    """Describe how a cache bound at ``base_commit`` becomes ``manifest``.
+
+    The base closure is walked with the facts of every blob both trees share,
+    so only schemas that differ between the commits are read and inspected.
+    Returns the delta payload plus the bytes of every changed schema.
+    """
+
+    try:
+        if not HEX40.fullmatch(base_commit):
+            raise ManifestError(
+                "DELTA_BASE_INVALID", "base commit must be exactly 40 lowercase hex characters"
+            )
+        _validate_commit_objects(objects, base_commit)
+        base_tree = _commit_tree(objects, base_commit)
+        base_paths = select_schemas(base_tree, consumers, schemas)
+        known = {
+            (tree[relative].object_id, relative): facts
+            for relative, facts in index.schemas.items()
+        }
+        base_index = _schema_identifier_index(objects, base_tree, cache, known=known)
+        base_bound = _schema_closure_paths(objects, base_tree, base_paths, base_index)
+    except ManifestError as exc:
+        if exc.code == "DELTA_BASE_INVALID":
+            raise
+        raise ManifestError("DELTA_BASE_INVALID", f"{base_commit}: {exc}") from exc
+
+    base_ids = {relative: base_tree[relative].object_id for relative in base_bound}
+    changed = {
+        relative: data
+        for relative, data in payload_bytes.items()
+        if base_ids.get(relative) != tree[relative].object_id
+    }
+    delta = {
+        "schema_version": 1,
+        "repository": EXPECTED_REPOSITORY,
+        "base_commit": base_commit,
+        "commit": manifest["commit"],
+        "source_kind": manifest["source_kind"],
+        "source_root": manifest["source_root"],
+        "manifest_sha256": _sha256(render_manifest(manifest)),
+        "changed": {relative: manifest["schemas"][relative] for relative in sorted(changed)},
+        "removed": sorted(set(base_ids) - set(payload_bytes)),
+    }
+    return delta, changed
+
+
 def render_manifest(manifest: dict[str, Any]) -> bytes:
     """Render one canonical byte representation for identical inputs."""
 
@@ -673,6 +1436,65 @@ def render_manifest(manifest: dict[str, Any]) -> bytes:
     ).encode("utf-8")
 
 
+def merkle_directories(schemas: dict[str, str]) -> dict[str, dict[str, Any]]:
+    """Derive per-directory Merkle digests from per-schema SHA-256 values.
+
+    Every directory below the content root that holds a bound schema, and the
+    root itself as ``"."``, gets a node with its files, its subdirectories and
+    its own digest: the SHA-256 of one ``"<blob|tree> <digest> <name>\\n"``
+    line per entry, ordered by the UTF-8 bytes of the names. Equal digests
+    therefore mean equal bindings for the whole subtree.
+    """
+
+    files: dict[str, dict[str, str]] = {".": {}}
+    subdirectories: dict[str, set[str]] = {".": set()}
+    for relative, digest in schemas.items():
+        path = PurePosixPath(relative)
+        files.setdefault(path.parent.as_posix(), {})[path.name] = digest
+        for directory in path.parents:
+            if directory.parts:
+                subdirectories.setdefault(directory.parent.as_posix(), set()).add(directory.name)
+                subdirectories.setdefault(directory.as_posix(), set())
+
+    def depth(directory: str) -> int:
+        return 0 if directory == "." else directory.count("/") + 1
+
+    nodes: dict[str, dict[str, Any]] = {}
+    for directory in sorted(subdirectories, key=lambda item: (-depth(item), item)):
+        prefix = "" if directory == "." else f"{directory}/"
+        node_files = files.get(directory, {})
+        node_directories = {
+            name: nodes[f"{prefix}{name}"]["digest"] for name in subdirectories[directory]
+        }
+        entries = [("blob", digest, name) for name, digest in node_files.items()]
+        entries += [("tree", digest, name) for name, digest in node_directories.items()]
+        entries.sort(key=lambda entry: entry[2].encode("utf-8"))
+        nodes[directory] = {
+            "digest": _sha256(
+                "".join(f"{kind} {digest} {name}\n" for kind, digest, name in entries).encode(
+                    "utf-8"
+                )
+            ),
+            "files": node_files,
+            "directories": node_directories,
+        }
+    return nodes
+
+
+def render_merkle(manifest_bytes: bytes, schemas: dict[str, str]) -> bytes:
+    """Render the Merkle sidecar bound to exactly ``manifest_bytes``."""
+
+    directories = merkle_directories(schemas)
+    return render_manifest(
+        {
+            "schema_version": 1,
+            "manifest_sha256": _sha256(manifest_bytes),
+            "root": directories["."]["digest"],
+            "directories": directories,
+        }
+    )
+
+
 def _resolve_out_dir(out_dir: str, source_root: Path, create: bool) -> Path:
     path = Path(out_dir).expanduser()
     if create:
@@ -742,18 +1564,254 @@ def _manifest_target_for_write(out_dir: Path) -> Path:
     return manifest_path
 
 
-def _materialize(
-    content_dir: Path, payload_bytes: dict[str, bytes], overwrite: bool
-) -> None:
+@dataclass(frozen=True)
+class MaterializeSummary:
+    """What one reconciling write changed below the content root."""
+
+    written: tuple[str, ...]
+    removed: tuple[str, ...]
+    unchanged: tuple[str, ...]
+
+    def describe(self, content_dir: Path) -> str:
+        return (
+            f"materialized {content_dir}: {len(self.written)} written, "
+            f"{len(self.removed)} removed, {len(self.unchanged)} unchanged"
+        )
+
+
+def _atomic_write(target: Path, data: bytes) -> None:
+    """Replace ``target`` so readers see either the old or the new bytes."""
+
+    temporary = target.with_name(f".{target.name}.{os.getpid()}.tmp")
     try:
-        metadata = content_dir.lstat()
-    except FileNotFoundError:
-        metadata = None
+        temporary.write_bytes(data)
+        os.replace(temporary, target)
     except OSError as exc:
-        raise ManifestError("OUT_DIR_UNWRITABLE", f"{content_dir}: {exc}") from exc
+        try:
+            temporary.unlink()
+        except OSError:
+            pass
+        raise ManifestError("OUT_DIR_UNWRITABLE", f"{target}: {exc}") from exc
 
-    if metadata is not None:
-        if stat.S_ISLNK(metadata.st_mode) or not stat.S_ISDIR(metadata.st_mode):
+
+def _reflink(source: Path, target: Path) -> bool:
+    """Clone ``source`` into a new ``target`` sharing its extents, if supported."""
+
+    if fcntl is None or not sys.platform.startswith("linux"):
+        return False
+    try:
+        with open(source, "rb") as origin, open(target, "xb") as clone:
+            fcntl.ioctl(clone.fileno(), FICLONE, origin.fileno())
+    except OSError:
+        try:
+            target.unlink()
+        except OSError:
+            pass
+        return False
+    return True
+
+
+class ContentStore:
+    """Content-addressed schema bytes shared by many content roots.
+
+    Objects live read-only at ``sha256/<first two hex digits>/<digest>``. A
+    content root binds a file by hardlink to its object or, with ``reflink``, by
+    a copy-on-write clone; where neither works across filesystems it falls back
+    to a plain copy. Every bound file therefore stays a regular file at its own
+    path, and verifying a content root never follows a link into the store.
+    """
+
+    def __init__(self, directory: Path, link: str = "hardlink") -> None:
+        try:
+            directory.mkdir(parents=True, exist_ok=True)
+            metadata = directory.lstat()
+        except OSError as exc:
+            raise ManifestError("STORE_INVALID", f"{directory}: {exc}") from exc
+        if stat.S_ISLNK(metadata.st_mode) or not stat.S_ISDIR(metadata.st_mode):
+            raise ManifestError("STORE_INVALID", f"store is not a regular directory: {directory}")
+        self.directory = directory
+        self.link = link
+
+    def object_path(self, digest: str) -> Path:
+        return self.directory / "sha256" / digest[:2] / digest
+
+    def put(self, digest: str, data: bytes) -> Path:
+        """Store ``data`` under ``digest`` unless an intact object is already there."""
+
+        path = self.object_path(digest)
+        try:
+            if _cached_bytes_match(path, data):
+                return path
+        except OSError:
+            pass
+        temporary = path.with_name(f".{digest}.{os.getpid()}.{threading.get_ident()}.tmp")
+        try:
+            path.parent.mkdir(parents=True, exist_ok=True)
+            temporary.write_bytes(data)
+            os.chmod(temporary, 0o444)
+            os.replace(temporary, path)
+        except OSError as exc:
+            try:
+                temporary.unlink()
+            except OSError:
+                pass
+            raise ManifestError("STORE_UNWRITABLE", f"{path}: {exc}") from exc
+        return path
+
+    def shares(self, target: Path, digest: str) -> bool:
+        """Whether ``target`` is already bound to the stored object as well as it can be."""
+
+        if self.link != "hardlink":
+            return True
+        try:
+            stored = self.object_path(digest).lstat()
+            present = target.lstat()
+        except OSError:
+            return False
+        return os.path.samestat(stored, present) or stored.st_dev != present.st_dev
+
+    def install(self, digest: str, data: bytes, target: Path) -> None:
+        """Atomically bind ``target`` to the object for ``digest``."""
+
+        source = self.put(digest, data)
+        temporary = target.with_name(f".{target.name}.{os.getpid()}.tmp")
+        try:
+            try:
+                temporary.unlink()
+            except FileNotFoundError:
+                pass
+            linked = False
+            if self.link == "hardlink":
+                try:
+                    os.link(source, temporary, follow_symlinks=False)
+                    linked = True
+                except OSError:
+                    pass
+            if not linked and not _reflink(source, temporary):
+                temporary.write_bytes(data)
+            os.replace(temporary, target)
+        except OSError as exc:
+            try:
+                temporary.unlink()
+            except OSError:
+                pass
+            raise ManifestError("OUT_DIR_UNWRITABLE", f"{target}: {exc}") from exc
+
+    def collect(self, live: Collection[str], *, dry_run: bool = False) -> tuple[list[str], int]:
+        """Remove every object whose digest ``live`` does not name.
+
+        Returns the collected digests and the number of objects kept. Content
+        roots that hardlink a collected object keep their bytes; only the
+        shared copy goes away.
+        """
+
+        collected: list[str] = []
+        kept = 0
+        shards_dir = self.directory / "sha256"
+        try:
+            shards = sorted(os.scandir(shards_dir), key=lambda entry: entry.name)
+        except FileNotFoundError:
+            return collected, kept
+        except OSError as exc:
+            raise ManifestError("STORE_INVALID", f"{shards_dir}: {exc}") from exc
+        for shard in shards:
+            if not shard.is_dir(follow_symlinks=False):
+                continue
+            try:
+                with os.scandir(shard.path) as iterator:
+                    entries = sorted(iterator, key=lambda entry: entry.name)
+                for entry in entries:
+                    if entry.name.startswith("."):
+                        continue
+                    if entry.name in live and entry.is_file(follow_symlinks=False):
+                        kept += 1
+                        continue
+                    collected.append(entry.name)
+                    if not dry_run:
+                        if entry.is_dir(follow_symlinks=False):
+                            shutil.rmtree(entry.path)
+                        else:
+                            os.unlink(entry.path)
+            except FileNotFoundError:
+                continue
+            except OSError as exc:
+                raise ManifestError("STORE_UNWRITABLE", f"{shard.path}: {exc}") from exc
+        return collected, kept
+
+
+def _prune_unbound(
+    content_dir: Path, bound: Collection[str]
+) -> tuple[set[str], list[str]]:
+    """Remove every node outside the ``bound`` paths, never following links.
+
+    Returns the bound paths that already exist as regular files and the
+    removed paths. Only directories that hold bound files are descended into.
+    """
+
+    bound_dirs = {
+        parent.as_posix()
+        for relative in bound
+        for parent in PurePosixPath(relative).parents
+        if parent.parts
+    }
+    existing: set[str] = set()
+    removed: list[str] = []
+    pending = [content_dir]
+    while pending:
+        directory = pending.pop()
+        try:
+            with os.scandir(directory) as iterator:
+                entries = sorted(iterator, key=lambda entry: entry.name)
+            for entry in entries:
+                path = Path(entry.path)
+                relative = path.relative_to(content_dir).as_posix()
+                if entry.is_dir(follow_symlinks=False):
+                    if relative in bound_dirs:
+                        pending.append(path)
+                        continue
+                    shutil.rmtree(path)
+                elif entry.is_file(follow_symlinks=False) and relative in bound:
+                    existing.add(relative)
+                    continue
+                else:
+                    path.unlink()
+                removed.append(relative)
+        except OSError as exc:
+            raise ManifestError("OUT_DIR_UNWRITABLE", f"{directory}: {exc}") from exc
+    return existing, sorted(removed)
+
+
+def _materialize(
+    content_dir: Path,
+    payload_bytes: dict[str, bytes],
+    overwrite: bool,
+    keep: Collection[str] = (),
+    store: ContentStore | None = None,
+    digests: dict[str, str] | None = None,
+) -> MaterializeSummary:
+    """Reconcile the content root with ``payload_bytes``.
+
+    Unchanged files are left in place, new or changed files are written through
+    a temporary file and an atomic rename, and unbound nodes are removed. Paths
+    in ``keep`` stay bound without being compared; the caller has checked them.
+    Only an existing non-empty root requires ``overwrite``. With a ``store``,
+    files are bound to its objects under their ``digests`` instead, and an
+    unchanged copy that does not share its object yet is bound anew.
+    """
+
+    assert store is None or digests is not None
+
+    try:
+        metadata = content_dir.lstat()
+    except FileNotFoundError:
+        metadata = None
+    except OSError as exc:
+        raise ManifestError("OUT_DIR_UNWRITABLE", f"{content_dir}: {exc}") from exc
+
+    existing: set[str] = set()
+    removed: list[str] = []
+    if metadata is not None:
+        if stat.S_ISLNK(metadata.st_mode) or not stat.S_ISDIR(metadata.st_mode):
             raise ManifestError(
                 "CONTENT_ROOT_INVALID_TYPE",
                 f"content root is not a regular directory: {content_dir}",
@@ -767,17 +1825,187 @@ def _materialize(
                 "CONTENT_ROOT_NOT_EMPTY",
                 f"{content_dir} already has content; pass --overwrite to replace it",
             )
-        try:
-            shutil.rmtree(content_dir)
-        except OSError as exc:
-            raise ManifestError("OUT_DIR_UNWRITABLE", f"{content_dir}: {exc}") from exc
+        existing, removed = _prune_unbound(content_dir, {*payload_bytes, *keep})
+
+    written: list[str] = []
+    unchanged: list[str] = [relative for relative in keep if relative not in payload_bytes]
     for relative, data in sorted(payload_bytes.items()):
         target = content_dir / relative
+        if relative in existing:
+            try:
+                if _cached_bytes_match(target, data) and (
+                    store is None or store.shares(target, digests[relative])
+                ):
+                    unchanged.append(relative)
+                    continue
+            except OSError:
+                pass
         try:
             target.parent.mkdir(parents=True, exist_ok=True)
-            target.write_bytes(data)
         except OSError as exc:
             raise ManifestError("OUT_DIR_UNWRITABLE", f"{target}: {exc}") from exc
+        if store is None:
+            _atomic_write(target, data)
+        else:
+            store.install(digests[relative], data, target)
+        written.append(relative)
+    return MaterializeSummary(tuple(written), tuple(removed), tuple(sorted(unchanged)))
+
+
+def _write_cache(
+    out_dir: Path,
+    manifest: dict[str, Any],
+    manifest_bytes: bytes,
+    payload_bytes: dict[str, bytes],
+    *,
+    overwrite: bool,
+    stat_index: bool = False,
+    merkle: bool = False,
+    store: ContentStore | None = None,
+    delta: dict[str, Any] | None = None,
+) -> tuple[Path, MaterializeSummary]:
+    """Reconcile one output directory and replace its manifest last."""
+
+    content_dir = _resolve_content_dir(
+        out_dir, manifest["source_root"], error_code="OUT_DIR_UNWRITABLE"
+    )
+    manifest_path = _manifest_target_for_write(out_dir)
+    summary = _materialize(
+        content_dir, payload_bytes, overwrite, store=store, digests=manifest["schemas"]
+    )
+    _remove_sidecars(out_dir)
+    if delta is not None:
+        _atomic_write(out_dir / DELTA_NAME, render_manifest(delta))
+    if stat_index:
+        _write_stat_index(
+            out_dir, content_dir, manifest["source_root"], manifest_bytes, payload_bytes
+        )
+    if merkle:
+        _atomic_write(out_dir / MERKLE_NAME, render_merkle(manifest_bytes, manifest["schemas"]))
+    # The manifest is replaced last, so a reader that trusts it never observes a
+    # half-reconciled content root.
+    _atomic_write(manifest_path, manifest_bytes)
+    return content_dir, summary
+
+
+def _stat_fingerprint(metadata: os.stat_result) -> list[int]:
+    return [
+        metadata.st_size,
+        metadata.st_mtime_ns,
+        metadata.st_ctime_ns,
+        metadata.st_ino,
+    ]
+
+
+def _remove_sidecars(out_dir: Path) -> None:
+    """Drop the stat index, Merkle layer and delta a previous write left behind."""
+
+    for name in (STAT_INDEX_NAME, MERKLE_NAME, DELTA_NAME):
+        path = out_dir / name
+        try:
+            path.unlink()
+        except FileNotFoundError:
+            pass
+        except OSError as exc:
+            raise ManifestError("OUT_DIR_UNWRITABLE", f"{path}: {exc}") from exc
+
+
+def _write_stat_index(
+    out_dir: Path,
+    content_dir: Path,
+    content_root: str,
+    manifest_bytes: bytes,
+    payload_bytes: dict[str, bytes],
+) -> None:
+    """Record the stat fingerprint and SHA-256 of every freshly written file.
+
+    ``--verify`` may skip re-hashing a bound file whose fingerprint is
+    unchanged, and skip enumerating the content root when no recorded directory
+    changed. The sidecar is bound to the manifest bytes it was written with.
+    """
+
+    files: dict[str, list[Any]] = {}
+    directories: dict[str, list[int]] = {}
+    try:
+        for relative, data in sorted(payload_bytes.items()):
+            metadata = (content_dir / relative).lstat()
+            files[relative] = [*_stat_fingerprint(metadata), _sha256(data)]
+            for parent in PurePosixPath(relative).parents:
+                key = parent.as_posix() if parent.parts else ""
+                if key not in directories:
+                    directories[key] = _stat_fingerprint(
+                        (content_dir / key).lstat() if key else content_dir.lstat()
+                    )
+    except OSError as exc:
+        raise ManifestError("OUT_DIR_UNWRITABLE", f"{content_dir}: {exc}") from exc
+    record = {
+        "format": STAT_INDEX_FORMAT,
+        "manifest_sha256": _sha256(manifest_bytes),
+        "source_root": content_root,
+        "files": files,
+        "directories": dict(sorted(directories.items())),
+    }
+    _atomic_write(
+        out_dir / STAT_INDEX_NAME,
+        json.dumps(record, sort_keys=True, separators=(",", ":")).encode("utf-8"),
+    )
+
+
+@dataclass(frozen=True)
+class StatIndex:
+    """A loaded stat sidecar that is safe to trust for one manifest."""
+
+    files: dict[str, list[Any]]
+    directories: dict[str, list[int]]
+    written_ns: int
+
+    def trusts(self, fingerprint: list[int], recorded: Sequence[Any]) -> bool:
+        # Racily clean entries (changed within the sidecar's own timestamp
+        # granularity) are never trusted; they are re-hashed instead.
+        return (
+            list(recorded[:4]) == fingerprint
+            and fingerprint[1] < self.written_ns
+            and fingerprint[2] < self.written_ns
+        )
+
+
+def _load_stat_index(
+    out_dir: Path, content_root: str, manifest_bytes: bytes
+) -> StatIndex | None:
+    """Return the sidecar if it belongs to these manifest bytes, else ``None``."""
+
+    index_path = out_dir / STAT_INDEX_NAME
+    try:
+        metadata = index_path.lstat()
+        if not stat.S_ISREG(metadata.st_mode):
+            return None
+        record = json.loads(index_path.read_bytes())
+        if (
+            record["format"] != STAT_INDEX_FORMAT
+            or record["manifest_sha256"] != _sha256(manifest_bytes)
+            or record["source_root"] != content_root
+        ):
+            return None
+        files = record["files"]
+        directories = record["directories"]
+        if not isinstance(files, dict) or not isinstance(directories, dict):
+            return None
+    except (OSError, UnicodeDecodeError, ValueError, KeyError, TypeError):
+        return None
+    return StatIndex(files, directories, metadata.st_mtime_ns)
+
+
+def _directories_unchanged(content_dir: Path, index: StatIndex) -> bool:
+    for relative, recorded in index.directories.items():
+        try:
+            metadata = (content_dir / relative).lstat() if relative else content_dir.lstat()
+        except OSError:
+            return False
+        if not stat.S_ISDIR(metadata.st_mode) or not index.trusts(
+            _stat_fingerprint(metadata), recorded
+        ):
+            return False
+    return bool(index.directories)
 
 
 def _regular_manifest_for_verify(out_dir: Path) -> Path:
@@ -800,7 +2028,9 @@ def _regular_manifest_for_verify(out_dir: Path) -> Path:
     return manifest_path
 
 
-def _regular_cached_schema(content_dir: Path, relative: str) -> Path:
+def _regular_cached_schema(
+    content_dir: Path, relative: str
+) -> tuple[Path, os.stat_result]:
     current = content_dir
     parts = PurePosixPath(relative).parts
     for index, part in enumerate(parts):
@@ -832,12 +2062,14 @@ def _regular_cached_schema(content_dir: Path, relative: str) -> Path:
                 "CONTENT_INVALID_TYPE",
                 f"bound schema parent is not a directory: {relative}",
             )
-    return current
+    return current, metadata
 
 
-def _present_cache_files(content_dir: Path) -> set[str]:
+def _present_cache_files(content_dir: Path, below: Sequence[str] = ()) -> set[str]:
+    """Enumerate cache files, relative to ``content_dir``, below ``below`` or everywhere."""
+
     present: set[str] = set()
-    pending = [content_dir]
+    pending = [content_dir / directory for directory in below] or [content_dir]
     while pending:
         directory = pending.pop()
         try:
@@ -872,21 +2104,112 @@ def _present_cache_files(content_dir: Path) -> set[str]:
     return present
 
 
+def _verify_subtree_bindings(
+    observed_manifest: bytes,
+    manifest_bytes: bytes,
+    subtrees: Sequence[str],
+    payload_bytes: dict[str, bytes],
+) -> dict[str, bytes]:
+    """Prove the stored manifest binds ``subtrees`` as the source does.
+
+    Only the manifest header and the Merkle digests of the named directories
+    must agree; bindings elsewhere may differ. Returns the bound bytes below
+    those directories, which are all that is compared on disk afterwards.
+    """
+
+    expected = json.loads(manifest_bytes)
+    try:
+        observed = json.loads(observed_manifest)
+        observed_schemas = observed["schemas"]
+        if not isinstance(observed_schemas, dict) or not all(
+            isinstance(relative, str)
+            and RELATIVE_POSIX.fullmatch(relative)
+            and isinstance(digest, str)
+            for relative, digest in observed_schemas.items()
+        ):
+            raise TypeError("schemas")
+        same_header = all(
+            observed[key] == expected[key] for key in expected if key != "schemas"
+        ) and set(observed) == set(expected)
+    except (UnicodeDecodeError, ValueError, KeyError, TypeError) as exc:
+        raise ManifestError(
+            "MANIFEST_DRIFT", "the stored manifest is not a contract source manifest"
+        ) from exc
+    if not same_header:
+        raise ManifestError(
+            "MANIFEST_DRIFT",
+            "the stored manifest binds another repository, commit, source kind or content root",
+        )
+    expected_nodes = merkle_directories(expected["schemas"])
+    observed_nodes = merkle_directories(observed_schemas)
+    for subtree in subtrees:
+        node = expected_nodes.get(subtree)
+        if node is None:
+            raise ManifestError(
+                "VERIFY_SUBTREE_INVALID", f"the bound source binds no schema below {subtree}"
+            )
+        if observed_nodes.get(subtree, {}).get("digest") != node["digest"]:
+            raise ManifestError(
+                "MANIFEST_DRIFT",
+                f"the stored manifest binds {subtree} differently from the bound source",
+            )
+    prefixes = tuple(f"{subtree}/" for subtree in subtrees)
+    return {
+        relative: data
+        for relative, data in payload_bytes.items()
+        if relative.startswith(prefixes)
+    }
+
+
+def _verify_merkle(out_dir: Path, observed_manifest: bytes) -> None:
+    """Require a present Merkle sidecar to be exactly the layer of the stored manifest."""
+
+    merkle_path = out_dir / MERKLE_NAME
+    try:
+        metadata = merkle_path.lstat()
+    except FileNotFoundError:
+        return
+    except OSError as exc:
+        raise ManifestError("MERKLE_DRIFT", f"cannot inspect {merkle_path}: {exc}") from exc
+    if stat.S_ISLNK(metadata.st_mode) or not stat.S_ISREG(metadata.st_mode):
+        raise ManifestError(
+            "MERKLE_DRIFT", f"Merkle layer is not a regular non-symlink file: {merkle_path}"
+        )
+    observed = _read_bytes(merkle_path, "MERKLE_DRIFT", f"cannot read {merkle_path}")
+    try:
+        schemas = json.loads(observed_manifest)["schemas"]
+        expected = render_merkle(observed_manifest, schemas)
+    except (UnicodeDecodeError, ValueError, KeyError, TypeError, AttributeError):
+        expected = None
+    if observed != expected:
+        raise ManifestError(
+            "MERKLE_DRIFT", "the Merkle layer does not belong to the stored manifest"
+        )
+
+
 def _verify(
     out_dir: Path,
     content_root: str,
     manifest_bytes: bytes,
     payload_bytes: dict[str, bytes],
+    mode: str = "full",
+    digests: dict[str, str] | None = None,
+    subtrees: Sequence[str] = (),
 ) -> None:
     manifest_path = _regular_manifest_for_verify(out_dir)
     observed_manifest = _read_bytes(
         manifest_path, "MANIFEST_UNREADABLE", f"cannot read {manifest_path}"
     )
-    if observed_manifest != manifest_bytes:
+    if subtrees:
+        payload_bytes = _verify_subtree_bindings(
+            observed_manifest, manifest_bytes, subtrees, payload_bytes
+        )
+    elif observed_manifest != manifest_bytes:
         raise ManifestError(
             "MANIFEST_DRIFT",
             "the stored manifest differs from the manifest the bound source produces",
         )
+    _verify_merkle(out_dir, observed_manifest)
 
     content_dir = _resolve_content_dir(
         out_dir, content_root, error_code="CONTENT_UNREADABLE"
@@ -906,15 +2229,61 @@ def _verify(
             "CONTENT_ROOT_INVALID_TYPE",
             f"content root is not a regular directory: {content_dir}",
         )
+    index = (
+        _load_stat_index(out_dir, content_root, manifest_bytes) if mode == "stat" else None
+    )
+    if index is not None and digests is None:
+        digests = _sha256_many(payload_bytes)
+    # Structural checks stay sequential; the first failure bounds which files
+    # are compared, so the reported error is the one a serial walk would raise.
+    to_compare: list[tuple[str, Path | None]] = []
+    structural: ManifestError | None = None
     for relative, data in sorted(payload_bytes.items()):
-        target = _regular_cached_schema(content_dir, relative)
-        observed = _read_bytes(target, "CONTENT_UNREADABLE", f"cannot read {relative}")
-        if observed != data:
+        try:
+            target, metadata = _regular_cached_schema(content_dir, relative)
+        except ManifestError as exc:
+            structural = exc
+            break
+        if index is not None:
+            recorded = index.files.get(relative)
+            if (
+                isinstance(recorded, list)
+                and len(recorded) == 5
+                and digests is not None
+                and recorded[4] == digests[relative]
+                and index.trusts(_stat_fingerprint(metadata), recorded)
+            ):
+                continue
+        # A size mismatch is drift already; there is nothing worth reading.
+        to_compare.append((relative, target if metadata.st_size == len(data) else None))
+
+    def observe(item: tuple[str, Path | None]) -> bool | ManifestError:
+        relative, target = item
+        if target is None:
+            return False
+        try:
+            return _cached_bytes_match(target, payload_bytes[relative])
+        except OSError as exc:
+            return ManifestError("CONTENT_UNREADABLE", f"cannot read {relative}: {exc}")
+
+    matches = _bounded_map(
+        observe,
+        to_compare,
+        sum(len(payload_bytes[relative]) for relative, target in to_compare if target),
+    )
+    for (relative, _target), match in zip(to_compare, matches):
+        if isinstance(match, ManifestError):
+            raise match
+        if not match:
             raise ManifestError(
                 "CONTENT_DRIFT", f"cached schema bytes differ from the bound source: {relative}"
             )
+    if structural is not None:
+        raise structural
     bound = set(payload_bytes)
-    present = _present_cache_files(content_dir)
+    if not subtrees and index is not None and _directories_unchanged(content_dir, index):
+        return
+    present = _present_cache_files(content_dir, subtrees)
     unbound = sorted(present - bound)
     if unbound:
         raise ManifestError(
@@ -923,6 +2292,235 @@ def _verify(
         )
 
 
+def _archive_members(
+    manifest_bytes: bytes, content_root: str, payload_bytes: dict[str, bytes]
+) -> list[tuple[str, bytes | None]]:
+    """Return sorted ``(name, bytes)`` archive members; ``None`` marks a directory.
+
+    The layout is the one ``--out-dir`` produces: the manifest at the top level
+    next to the content root.
+    """
+
+    members: dict[str, bytes | None] = {MANIFEST_NAME: manifest_bytes}
+    for relative, data in payload_bytes.items():
+        name = f"{content_root}/{relative}"
+        members[name] = data
+        for parent in PurePosixPath(name).parents:
+            if parent.parts:
+                members.setdefault(parent.as_posix(), None)
+    return sorted(members.items())
+
+
+class _UnseekableWriter(io.RawIOBase):
+    """Expose only ``write`` so zip output never depends on seekability."""
+
+    def __init__(self, stream: BinaryIO) -> None:
+        self._stream = stream
+
+    def writable(self) -> bool:
+        return True
+
+    def write(self, data: Any) -> int:
+        return self._stream.write(data)
+
+    def flush(self) -> None:
+        self._stream.flush()
+
+
+def _write_archive(
+    stream: BinaryIO, archive_format: str, members: list[tuple[str, bytes | None]]
+) -> None:
+    """Stream a deterministic archive: sorted entries, fixed mtime and modes."""
+
+    if archive_format == "tar":
+        with tarfile.open(fileobj=stream, mode="w|", format=tarfile.PAX_FORMAT) as archive:
+            for name, data in members:
+                info = tarfile.TarInfo(name)
+                info.mtime = ARCHIVE_MTIME
+                info.uid = info.gid = 0
+                info.uname = info.gname = ""
+                if data is None:
+                    info.type = tarfile.DIRTYPE
+                    info.mode = 0o755
+                    archive.addfile(info)
+                else:
+                    info.mode = 0o644
+                    info.size = len(data)
+                    archive.addfile(info, io.BytesIO(data))
+        return
+    # Stored, not deflated: the bytes must not depend on the local zlib build.
+    with zipfile.ZipFile(
+        _UnseekableWriter(stream), "w", compression=zipfile.ZIP_STORED
+    ) as archive:
+        for name, data in members:
+            info = zipfile.ZipInfo(name if data is not None else f"{name}/", ARCHIVE_DATE_TIME)
+            info.create_system = 3
+            info.compress_type = zipfile.ZIP_STORED
+            if data is None:
+                info.external_attr = (stat.S_IFDIR | 0o755) << 16 | 0x10
+            else:
+                info.external_attr = (stat.S_IFREG | 0o644) << 16
+            archive.writestr(info, b"" if data is None else data)
+
+
+def _archive_destination(destination: str, source_root: Path) -> Path | None:
+    if destination == "-":
+        return None
+    path = Path(destination).expanduser()
+    try:
+        parent = path.parent.resolve(strict=True)
+    except (FileNotFoundError, OSError) as exc:
+        raise ManifestError(
+            "OUT_DIR_MISSING", f"archive directory is unavailable: {path.parent}"
+        ) from exc
+    if parent == source_root or source_root in parent.parents:
+        raise ManifestError(
+            "OUT_DIR_INSIDE_SOURCE",
+            "the archive must not be written inside the bound Metarepo source",
+        )
+    target = parent / path.name
+    if target.is_symlink() or (target.exists() and not target.is_file()):
+        raise ManifestError(
+            "OUT_DIR_INVALID", f"archive target is not a regular non-symlink file: {target}"
+        )
+    return target
+
+
+def _emit_archive(
+    destination: Path | None, archive_format: str, members: list[tuple[str, bytes | None]]
+) -> None:
+    if destination is None:
+        try:
+            _write_archive(sys.stdout.buffer, archive_format, members)
+            sys.stdout.buffer.flush()
+        except OSError as exc:
+            raise ManifestError("ARCHIVE_UNWRITABLE", f"stdout: {exc}") from exc
+        return
+    temporary = destination.with_name(f".{destination.name}.{os.getpid()}.tmp")
+    try:
+        with temporary.open("wb") as handle:
+            _write_archive(handle, archive_format, members)
+        os.replace(temporary, destination)
+    except OSError as exc:
+        try:
+            temporary.unlink()
+        except OSError:
+            pass
+        raise ManifestError("ARCHIVE_UNWRITABLE", f"{destination}: {exc}") from exc
+
+
+def _iter_archive(
+    stream: BinaryIO,
+) -> Iterator[tuple[str, str, io.BufferedIOBase | None]]:
+    """Yield ``(name, kind, reader)`` per member in one pass over a tar or zip.
+
+    ``kind`` is ``"file"``, ``"dir"`` or ``"other"``; readers are only valid
+    until the next member is requested.
+    """
+
+    if isinstance(stream, io.BufferedReader):
+        buffered = stream
+    else:
+        # BufferedReader only needs readinto(), which every binary stream has.
+        buffered = io.BufferedReader(cast(io.RawIOBase, stream))
+    if buffered.peek(4)[:4] == b"PK\x03\x04":
+        # The zip central directory sits at the end; an unseekable stream is
+        # held in memory, never extracted to disk.
+        source: BinaryIO = buffered if buffered.seekable() else io.BytesIO(buffered.read())
+        with zipfile.ZipFile(source) as archive:
+            for info in archive.infolist():
+                mode = info.external_attr >> 16
+                if info.is_dir():
+                    yield info.filename.rstrip("/"), "dir", None
+                elif mode and not stat.S_ISREG(mode):
+                    yield info.filename, "other", None
+                else:
+                    with archive.open(info) as opened:
+                        # A zipfile.ZipExtFile, readable with readinto.
+                        assert isinstance(opened, io.BufferedIOBase)
+                        yield info.filename, "file", opened
+        return
+    with tarfile.open(fileobj=buffered, mode="r|") as archive:
+        for member in archive:
+            if member.isdir():
+                yield member.name.rstrip("/"), "dir", None
+            elif member.isreg():
+                reader = archive.extractfile(member)
+                # A regular member always has one, an io.BufferedReader.
+                assert isinstance(reader, io.BufferedIOBase)
+                yield member.name, "file", reader
+            else:
+                yield member.name, "other", None
+
+
+def _verify_archive(
+    stream: BinaryIO,
+    content_root: str,
+    manifest_bytes: bytes,
+    payload_bytes: dict[str, bytes],
+) -> None:
+    """Check an archive member by member without extracting it.
+
+    Directory entries are optional; every regular file must be bound and
+    byte-identical, links and special members are rejected outright.
+    """
+
+    expected = dict(_archive_members(manifest_bytes, content_root, payload_bytes))
+    seen: set[str] = set()
+    try:
+        for name, kind, reader in _iter_archive(stream):
+            if not RELATIVE_POSIX.fullmatch(name) or name in seen:
+                raise ManifestError(
+                    "ARCHIVE_INVALID_MEMBER",
+                    f"archive member is not a unique normalized relative path: {name!r}",
+                )
+            seen.add(name)
+            if kind == "other":
+                raise ManifestError(
+                    "ARCHIVE_INVALID_MEMBER",
+                    f"archive member is neither a regular file nor a directory: {name}",
+                )
+            if name not in expected:
+                raise ManifestError(
+                    "CONTENT_UNBOUND", f"the archive carries a member the manifest does not bind: {name}"
+                )
+            data = expected[name]
+            if (kind == "dir") != (data is None):
+                raise ManifestError(
+                    "CONTENT_INVALID_TYPE", f"archive member has the wrong type: {name}"
+                )
+            if data is not None and (reader is None or not _stream_matches(reader, data)):
+                if name == MANIFEST_NAME:
+                    raise ManifestError(
+                        "MANIFEST_DRIFT",
+                        "the archived manifest differs from the manifest the bound source produces",
+                    )
+                raise ManifestError(
+                    "CONTENT_DRIFT", f"archived schema bytes differ from the bound source: {name}"
+                )
+    except (tarfile.TarError, zipfile.BadZipFile, EOFError, OSError) as exc:
+        raise ManifestError("ARCHIVE_UNREADABLE", f"cannot read archive: {exc}") from exc
+    if MANIFEST_NAME not in seen:
+        raise ManifestError("MANIFEST_MISSING", "the archive carries no manifest")
+    missing = sorted(
+        name for name, data in expected.items() if data is not None and name not in seen
+    )
+    if missing:
+        raise ManifestError(
+            "CONTENT_MISSING", f"bound schema is absent from the archive: {missing[0]}"
+        )
+
+
+def _target_spec(value: str) -> tuple[list[str], str]:
+    consumers, separator, out_dir = value.partition("=")
+    names = [name for name in consumers.split(",") if name]
+    if not separator or not names or not out_dir:
+        raise argparse.ArgumentTypeError(
+            f"expected CONSUMER[,CONSUMER...]=OUT_DIR, got {value!r}"
+        )
+    return names, out_dir
+
+
 def _parser() -> argparse.ArgumentParser:
     parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
     parser.add_argument(
@@ -932,9 +2530,51 @@ def _parser() -> argparse.ArgumentParser:
     )
     parser.add_argument(
         "--out-dir",
-        required=True,
         help="Directory that receives the manifest and its content root.",
     )
+    parser.add_argument(
+        "--target",
+        action="append",
+        default=[],
+        type=_target_spec,
+        metavar="CONSUMERS=OUT_DIR",
+        help=(
+            "Bulk mode: emit one manifest for the comma-separated consumer set into "
+            "OUT_DIR (repeatable). The source, tree and identifier index are resolved "
+            "once; each manifest is byte-identical to a single-target run."
+        ),
+    )
+    parser.add_argument(
+        "--archive",
+        metavar="PATH",
+        help=(
+            "Write the manifest and content root as one deterministic archive to PATH "
+            "('-' for stdout) instead of --out-dir. Requires source_kind detached_archive."
+        ),
+    )
+    parser.add_argument(
+        "--archive-format",
+        choices=ARCHIVE_FORMATS,
+        default="tar",
+        help="Archive container for --archive. Default: tar.",
+    )
+    parser.add_argument(
+        "--verify-archive",
+        metavar="PATH",
+        help=(
+            "Do not write; check a tar or zip archive at PATH ('-' for stdin) member by "
+            "member against the bound source without extracting it."
+        ),
+    )
+    parser.add_argument(
+        "--delta-from",
+        metavar="COMMIT",
+        help=(
+            "Write a delta into --out-dir instead of a full cache: the manifest, "
+            f"{DELTA_NAME} and only the schema bytes that changed since COMMIT. "
+            "Apply it with scripts/contracts/apply_source_delta.py."
+        ),
+    )
     parser.add_argument(
         "--consumer",
         action="append",
@@ -973,38 +2613,300 @@ def _parser() -> argparse.ArgumentParser:
     )
     parser.add_argument(
         "--verify",
+        nargs="?",
+        const="stat",
+        choices=VERIFY_MODES,
+        help=(
+            "Do not write; assert that an existing manifest and cache still match the "
+            "bound source. Plain --verify trusts unchanged stat fingerprints from a "
+            "--stat-index sidecar; --verify=full re-reads and compares every file."
+        ),
+    )
+    parser.add_argument(
+        "--stat-index",
         action="store_true",
-        help="Do not write; assert that an existing manifest and cache still match the bound source.",
+        help=(
+            f"Also write {STAT_INDEX_NAME} with (size, mtime_ns, ctime_ns, inode, sha256) "
+            "per bound file so later --verify runs can skip unchanged files."
+        ),
+    )
+    parser.add_argument(
+        "--merkle",
+        action="store_true",
+        help=(
+            f"Also write {MERKLE_NAME}: per-directory Merkle digests over the schema "
+            "SHA-256 values, bound to the manifest bytes. The manifest is unchanged."
+        ),
+    )
+    parser.add_argument(
+        "--verify-subtree",
+        action="append",
+        default=[],
+        metavar="DIR",
+        help=(
+            "With --verify, check only the bindings and files below this directory of "
+            "the content root, by its Merkle digest; repeatable."
+        ),
+    )
+    parser.add_argument(
+        "--object-reader",
+        choices=OBJECT_READERS,
+        default="auto",
+        help=(
+            "auto reads objects in-process from the object database and falls back to "
+            "'git cat-file' for unsupported layouts; git always uses 'git cat-file'."
+        ),
+    )
+    parser.add_argument(
+        "--timings",
+        action="store_true",
+        help=(
+            "After the run, print per-phase wall and CPU seconds plus object, schema "
+            "and byte counters as one JSON line to stderr. Stdout is unchanged."
+        ),
+    )
+    parser.add_argument(
+        "--parse-cache",
+        metavar="DIR",
+        help=(
+            "Reuse schema inspection verdicts keyed by Git blob id from this directory. "
+            "Safe to share between concurrent runs."
+        ),
+    )
+    parser.add_argument(
+        "--parse-cache-max-bytes",
+        type=int,
+        default=DEFAULT_PARSE_CACHE_MAX_BYTES,
+        metavar="BYTES",
+        help=(
+            "Evict least recently used parse-cache entries beyond this size. "
+            f"Default: {DEFAULT_PARSE_CACHE_MAX_BYTES}."
+        ),
+    )
+    parser.add_argument(
+        "--store",
+        metavar="DIR",
+        help=(
+            "Keep schema bytes once in this content-addressed store, keyed by SHA-256, "
+            "and bind content roots to its objects. Collect unused objects with "
+            "gc_source_store.py."
+        ),
+    )
+    parser.add_argument(
+        "--store-link",
+        choices=STORE_LINKS,
+        default="hardlink",
+        help=(
+            "How content roots bind store objects; either falls back to a copy where "
+            "the filesystem cannot link. Default: hardlink."
+        ),
     )
     return parser
 
 
 def run(argv: Sequence[str] | None = None) -> int:
-    args = _parser().parse_args(argv)
-
-    root, commit = resolve_source(args.source, args.expected_commit)
-    tree = _commit_tree(root, commit)
-    schema_paths = select_schemas(tree, args.consumer, args.schema)
-    manifest, payload_bytes = build_manifest(
-        root, tree, commit, args.source_kind, args.content_root, schema_paths
+    parser = _parser()
+    args = parser.parse_args(argv)
+    archive_mode = args.archive is not None or args.verify_archive is not None
+    targets: list[tuple[str | None, list[str], list[str]]]
+    if archive_mode:
+        if (
+            args.out_dir is not None
+            or args.target
+            or args.verify
+            or (args.archive is not None and args.verify_archive is not None)
+        ):
+            parser.error(
+                "--archive and --verify-archive exclude each other, --out-dir, "
+                "--target and --verify"
+            )
+        targets = [(None, args.consumer, args.schema)]
+    elif args.target:
+        if args.out_dir is not None or args.consumer or args.schema:
+            parser.error("--target cannot be combined with --out-dir, --consumer or --schema")
+        targets = [(out_dir, consumers, []) for consumers, out_dir in args.target]
+    elif args.out_dir is not None:
+        targets = [(args.out_dir, args.consumer, args.schema)]
+    else:
+        parser.error("one of --out-dir, --target, --archive or --verify-archive is required")
+    if args.delta_from is not None and (
+        archive_mode or args.target or args.verify or args.stat_index
+    ):
+        parser.error(
+            "--delta-from needs --out-dir and excludes --target, --verify, --stat-index "
+            "and archive output"
+        )
+    if args.store is not None and (archive_mode or args.verify):
+        parser.error("--store only applies when a content root is written")
+    if args.merkle and (archive_mode or args.verify):
+        parser.error("--merkle only applies when a content root is written")
+    if args.verify_subtree and not args.verify:
+        parser.error("--verify-subtree requires --verify")
+    args.verify_subtree = sorted(
+        {_relative_path(value, "VERIFY_SUBTREE_INVALID") for value in args.verify_subtree}
     )
-    manifest_bytes = render_manifest(manifest)
-    out_dir = _resolve_out_dir(args.out_dir, root, create=not args.verify)
+    if archive_mode and args.source_kind != "detached_archive":
+        raise ManifestError(
+            "SOURCE_KIND_INVALID", "archive output always binds source_kind detached_archive"
+        )
 
-    if args.verify:
-        _verify(out_dir, manifest["source_root"], manifest_bytes, payload_bytes)
-    else:
-        content_dir = _resolve_content_dir(
-            out_dir, manifest["source_root"], error_code="OUT_DIR_UNWRITABLE"
+    timings = PhaseTimings()
+    try:
+        with timings.phase("total"):
+            return _emit(args, targets, archive_mode, timings)
+    finally:
+        if args.timings:
+            print(timings.render(), file=sys.stderr)
+
+
+def _emit(
+    args: argparse.Namespace,
+    targets: list[tuple[str | None, list[str], list[str]]],
+    archive_mode: bool,
+    timings: PhaseTimings,
+) -> int:
+    with timings.phase("resolve_source"):
+        root, commit = resolve_source(args.source, args.expected_commit, args.object_reader)
+    cache = None
+    if args.parse_cache is not None:
+        cache = SchemaParseCache(
+            Path(args.parse_cache).expanduser(), args.parse_cache_max_bytes
         )
-        manifest_path = _manifest_target_for_write(out_dir)
-        _materialize(content_dir, payload_bytes, args.overwrite)
+    planned: list[tuple[str | None, dict[str, Any], dict[str, bytes]]] = []
+    delta: dict[str, Any] | None = None
+    with GitObjectReader(root, args.object_reader) as objects:
         try:
-            manifest_path.write_bytes(manifest_bytes)
-        except OSError as exc:
-            raise ManifestError("OUT_DIR_UNWRITABLE", f"{manifest_path}: {exc}") from exc
+            with timings.phase("commit_tree"):
+                tree = _commit_tree(objects, commit)
+            timings.count("tree_entries", len(tree))
+            index: SchemaIndex | None = None
+            for out_dir_arg, consumers, schemas in targets:
+                schema_paths = select_schemas(tree, consumers, schemas)
+                if index is None:
+                    _manifest_layout(args.source_kind, args.content_root)
+                    with timings.phase("schema_identifier_index"):
+                        index = _schema_identifier_index(objects, tree, cache)
+                    timings.count("schemas_indexed", len(index.schemas))
+                    timings.count("schemas_inspected", len(index.blobs))
+                manifest, payload_bytes = build_manifest(
+                    objects,
+                    tree,
+                    commit,
+                    args.source_kind,
+                    args.content_root,
+                    schema_paths,
+                    index=index,
+                    timings=timings,
+                )
+                timings.count("schemas_bound", len(payload_bytes))
+                timings.count("bound_bytes", sum(len(data) for data in payload_bytes.values()))
+                if args.delta_from is not None:
+                    with timings.phase("delta"):
+                        delta, payload_bytes = build_delta(
+                            objects,
+                            args.delta_from.strip().lower(),
+                            consumers,
+                            schemas,
+                            tree,
+                            index,
+                            manifest,
+                            payload_bytes,
+                            cache,
+                        )
+                    timings.count("schemas_changed", len(payload_bytes))
+                planned.append((out_dir_arg, manifest, payload_bytes))
+        finally:
+            for name, amount in objects.counters.items():
+                timings.count(name, amount)
+    if cache is not None:
+        timings.count("parse_cache_hits", cache.hits)
+        timings.count("parse_cache_misses", cache.misses)
+        cache.evict()
+
+    if archive_mode:
+        _unused, manifest, payload_bytes = planned[0]
+        manifest_bytes = render_manifest(manifest)
+        with timings.phase("archive"):
+            if args.verify_archive is not None:
+                if args.verify_archive == "-":
+                    _verify_archive(
+                        sys.stdin.buffer, manifest["source_root"], manifest_bytes, payload_bytes
+                    )
+                else:
+                    try:
+                        handle = open(Path(args.verify_archive).expanduser(), "rb")
+                    except OSError as exc:
+                        raise ManifestError(
+                            "ARCHIVE_UNREADABLE", f"{args.verify_archive}: {exc}"
+                        ) from exc
+                    with handle:
+                        _verify_archive(
+                            handle, manifest["source_root"], manifest_bytes, payload_bytes
+                        )
+            else:
+                destination = _archive_destination(args.archive, root)
+                members = _archive_members(
+                    manifest_bytes, manifest["source_root"], payload_bytes
+                )
+                _emit_archive(destination, args.archive_format, members)
+                if destination is None:
+                    return 0
+        sys.stdout.write(manifest_bytes.decode("utf-8"))
+        return 0
+
+    store = None
+    if args.store is not None:
+        store_dir = Path(args.store).expanduser()
+        resolved = store_dir.resolve()
+        if resolved == root or root in resolved.parents:
+            raise ManifestError(
+                "STORE_INVALID", "the store must not live inside the bound Metarepo source"
+            )
+        store = ContentStore(store_dir, args.store_link)
+    out_dirs: list[Path] = []
+    for out_dir_arg, _manifest, _payload_bytes in planned:
+        assert out_dir_arg is not None
+        out_dir = _resolve_out_dir(out_dir_arg, root, create=not args.verify)
+        if out_dir in out_dirs:
+            raise ManifestError(
+                "OUT_DIR_INVALID", f"more than one target names the output directory {out_dir}"
+            )
+        out_dirs.append(out_dir)
+
+    emitted: list[bytes] = []
+    for out_dir, (_out_dir_arg, manifest, payload_bytes) in zip(out_dirs, planned):
+        manifest_bytes = render_manifest(manifest)
+        if args.verify:
+            with timings.phase("verify"):
+                _verify(
+                    out_dir,
+                    manifest["source_root"],
+                    manifest_bytes,
+                    payload_bytes,
+                    args.verify,
+                    manifest["schemas"],
+                    args.verify_subtree,
+                )
+        else:
+            with timings.phase("materialize"):
+                content_dir, summary = _write_cache(
+                    out_dir,
+                    manifest,
+                    manifest_bytes,
+                    payload_bytes,
+                    overwrite=args.overwrite,
+                    stat_index=args.stat_index,
+                    merkle=args.merkle,
+                    store=store,
+                    delta=delta,
+                )
+            timings.count("files_written", len(summary.written))
+            timings.count("files_removed", len(summary.removed))
+            timings.count("files_unchanged", len(summary.unchanged))
+            print(summary.describe(content_dir), file=sys.stderr)
+        emitted.append(manifest_bytes)
 
-    sys.stdout.write(manifest_bytes.decode("utf-8"))
+    sys.stdout.write(b"".join(emitted).decode("utf-8"))
     return 0
 
 
@@ -0,0 +1,90 @@
+#!/usr/bin/env python3
+"""Collect content-addressed store objects that no live manifest binds.
+
+``emit_source_manifest.py --store`` keeps every schema byte sequence once under
+its SHA-256 and binds content roots to those objects. This command takes the
+complete set of live manifests, as files or as the output directories that hold
+them, and removes every store object none of them binds. Each live manifest is
+checked first; one unreadable or malformed manifest aborts before anything is
+removed, so a mistyped path never empties the store. Content roots that
+hardlink a collected object keep their bytes, only the shared copy goes away.
+"""
+from __future__ import annotations
+
+import argparse
+import json
+from pathlib import Path
+import stat
+import sys
+from typing import Sequence
+
+script_dir = Path(__file__).resolve().parent
+if str(script_dir) not in sys.path:
+    sys.path.insert(0, str(script_dir))
+
+from apply_source_delta import _load_manifest, _read_regular  # noqa: E402
+from emit_source_manifest import (  # noqa: E402
+    ContentStore,
+    ManifestError,
+    _regular_manifest_for_verify,
+)
+
+
+def live_digests(paths: Sequence[str]) -> set[str]:
+    """Return every digest bound by the manifests at ``paths``."""
+
+    digests: set[str] = set()
+    for value in paths:
+        path = Path(value).expanduser()
+        try:
+            is_dir = stat.S_ISDIR(path.lstat().st_mode)
+        except OSError:
+            is_dir = False
+        manifest_path = _regular_manifest_for_verify(path) if is_dir else path
+        manifest = _load_manifest(
+            _read_regular(manifest_path, "MANIFEST_UNREADABLE", "live manifest"),
+            "MANIFEST_UNREADABLE",
+            f"live manifest {manifest_path}",
+        )
+        digests.update(manifest["schemas"].values())
+    return digests
+
+
+def _parser() -> argparse.ArgumentParser:
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--store", required=True, help="Store directory to collect.")
+    parser.add_argument(
+        "--live",
+        action="append",
+        required=True,
+        help="Live manifest, or the output directory that holds one; repeatable.",
+    )
+    parser.add_argument(
+        "--dry-run", action="store_true", help="Report what would be collected, remove nothing."
+    )
+    return parser
+
+
+def run(argv: Sequence[str] | None = None) -> int:
+    args = _parser().parse_args(argv)
+    store_dir = Path(args.store).expanduser()
+    if not store_dir.is_dir():
+        raise ManifestError("STORE_INVALID", f"store is unavailable: {store_dir}")
+    live = live_digests(args.live)
+    collected, kept = ContentStore(store_dir).collect(live, dry_run=args.dry_run)
+    verb = "would collect" if args.dry_run else "collected"
+    print(f"{verb} {len(collected)} objects from {store_dir}, kept {kept}", file=sys.stderr)
+    sys.stdout.write(json.dumps({"collected": collected, "kept": kept}, indent=2) + "\n")
+    return 0
+
+
+def main(argv: Sequence[str] | None = None) -> int:
+    try:
+        return run(argv)
+    except ManifestError as exc:
+        print(str(exc), file=sys.stderr)
+        return 2
+
+
+if __name__ == "__main__":
+    raise SystemExit(main())
@@ -0,0 +1,332 @@
+#!/usr/bin/env python3
+"""Answer which committed contract schemas depend on a given schema.
+
+The reverse ``$ref`` index is derived once per committed ``contracts/`` tree
+from the same identifier index ``emit_source_manifest.py`` builds, and is
+persisted under ``--index-dir`` as ``<tree-object-id>.json``. A tree object id
+names the exact bytes of every schema, so the stored index never needs
+invalidation: any commit that leaves ``contracts/`` untouched reuses it, and a
+query then only reads the commit and root tree objects before walking the
+stored edges. A query with a warm ``--index-dir`` costs one ``git rev-parse``:
+it resolves ``HEAD`` and its ``contracts`` tree id, answers from the stored
+index and neither checks the worktree nor starts an object reader. Only a cold
+index, or ``--require-clean``, falls back to the full source resolution of the
+producer. The answer lists the transitive dependents, the consumer
+namespaces they belong to and, for every ``--manifest`` given, whether that
+manifest binds an affected schema.
+"""
+from __future__ import annotations
+
+import argparse
+from collections import deque
+from dataclasses import dataclass
+import json
+import os
+from pathlib import Path
+import sys
+from typing import Any, Iterable, Sequence
+
+script_dir = Path(__file__).resolve().parent
+if str(script_dir) not in sys.path:
+    sys.path.insert(0, str(script_dir))
+
+from emit_source_manifest import (  # noqa: E402
+    HEX40,
+    OBJECT_READERS,
+    GitObjectReader,
+    ManifestError,
+    SchemaIndex,
+    SchemaParseCache,
+    _commit_root_tree,
+    _commit_tree,
+    _parse_tree,
+    _relative_path,
+    _resolve_local_reference,
+    _run_git,
+    _schema_identifier_index,
+    resolve_source,
+)
+
+INDEX_VERSION = 1
+
+
+@dataclass(frozen=True)
+class DependentsIndex:
+    """Direct reverse ``$ref`` edges of one committed ``contracts/`` tree."""
+
+    tree: str
+    dependents: dict[str, tuple[str, ...]]
+    schemas: frozenset[str]
+
+    def transitive(self, schemas: Iterable[str]) -> list[str]:
+        """Return every schema that reaches one of ``schemas`` through ``$ref``."""
+
+        start = set(schemas)
+        seen: set[str] = set()
+        pending = deque(start)
+        while pending:
+            for dependent in self.dependents.get(pending.popleft(), ()):
+                if dependent not in seen:
+                    seen.add(dependent)
+                    pending.append(dependent)
+        return sorted(seen - start)
+
+    def render(self) -> bytes:
+        payload = {
+            "schema_version": INDEX_VERSION,
+            "contracts_tree": self.tree,
+            "schemas": sorted(self.schemas),
+            "dependents": {path: list(edges) for path, edges in sorted(self.dependents.items())},
+        }
+        return json.dumps(payload, separators=(",", ":"), ensure_ascii=False).encode("utf-8")
+
+
+def build_index(tree_id: str, index: SchemaIndex) -> DependentsIndex:
+    """Invert the local references recorded in ``index``.
+
+    A reference that does not resolve to a committed schema contributes no
+    edge; emitting a manifest whose closure reaches it still fails with the
+    usual ``SCHEMA_REF_*`` code.
+    """
+
+    reverse: dict[str, set[str]] = {}
+    for relative, facts in index.schemas.items():
+        for kind, resolved_uri in facts.resources:
+            if kind != "reference":
+                continue
+            try:
+                dependency = _resolve_local_reference(relative, resolved_uri, index.identifiers)
+            except ManifestError:
+                continue
+            if dependency is None or dependency == relative or dependency not in index.schemas:
+                continue
+            reverse.setdefault(dependency, set()).add(relative)
+    return DependentsIndex(
+        tree_id,
+        {path: tuple(sorted(edges)) for path, edges in reverse.items()},
+        frozenset(index.schemas),
+    )
+
+
+def _load_index(path: Path, tree_id: str) -> DependentsIndex | None:
+    """Load a persisted index, or ``None`` if it is absent or not trustworthy."""
+
+    try:
+        payload = json.loads(path.read_bytes())
+    except (OSError, UnicodeDecodeError, ValueError):
+        return None
+    if (
+        not isinstance(payload, dict)
+        or payload.get("schema_version") != INDEX_VERSION
+        or payload.get("contracts_tree") != tree_id
+        or not isinstance(payload.get("schemas"), list)
+        or not isinstance(payload.get("dependents"), dict)
+    ):
+        return None
+    schemas = payload["schemas"]
+    dependents = payload["dependents"]
+    if not all(isinstance(path, str) for path in schemas) or not all(
+        isinstance(edges, list) and all(isinstance(edge, str) for edge in edges)
+        for edges in dependents.values()
+    ):
+        return None
+    return DependentsIndex(
+        tree_id,
+        {path: tuple(edges) for path, edges in dependents.items()},
+        frozenset(schemas),
+    )
+
+
+def _store_index(path: Path, index: DependentsIndex) -> None:
+    temporary = path.with_name(f".{path.name}.{os.getpid()}.tmp")
+    try:
+        path.parent.mkdir(parents=True, exist_ok=True)
+        temporary.write_bytes(index.render())
+        os.replace(temporary, path)
+    except OSError as exc:
+        try:
+            temporary.unlink()
+        except OSError:
+            pass
+        raise ManifestError("DEPENDENTS_INDEX_UNWRITABLE", f"{path}: {exc}") from exc
+
+
+def contracts_tree_id(objects: GitObjectReader, commit: str) -> str:
+    """Return the object id of ``contracts/`` in the root tree of ``commit``."""
+
+    code = "SOURCE_COMMIT_INVALID"
+    detail = f"cannot inspect contract tree at {commit}"
+    root_tree = _commit_root_tree(objects.read(commit, "commit", code=code, detail=detail))
+    if root_tree is None:
+        raise ManifestError(code, f"{detail}: commit has no valid root tree")
+    try:
+        entries = list(_parse_tree(objects.read(root_tree, "tree", code=code, detail=detail)))
+    except ValueError as exc:
+        raise ManifestError(code, f"{detail}: malformed tree object") from exc
+    for _mode, kind, object_id, raw_name in entries:
+        if raw_name == b"contracts" and kind == "tree":
+            return object_id
+    raise ManifestError("SCHEMA_SELECTION", f"{commit} has no contracts/ tree")
+
+
+def _head_contracts_tree(source_path: str) -> tuple[str, str] | None:
+    """Return ``HEAD`` and its ``contracts`` tree id with one ``rev-parse``.
+
+    ``None`` means the cheap path does not apply; the caller then resolves the
+    source in full, which reports the actual failure.
+    """
+
+    try:
+        root = Path(source_path).expanduser().resolve(strict=True)
+        top, commit, tree_id = _run_git(
+            root, "rev-parse", "--show-toplevel", "HEAD", "HEAD:contracts"
+        ).splitlines()
+        if Path(top).resolve(strict=True) != root:
+            return None
+    except (ManifestError, OSError, ValueError):
+        return None
+    if not HEX40.fullmatch(commit) or not HEX40.fullmatch(tree_id):
+        return None
+    return commit, tree_id
+
+
+def dependents_index(
+    objects: GitObjectReader,
+    commit: str,
+    index_dir: Path | None,
+    cache: SchemaParseCache | None = None,
+) -> tuple[DependentsIndex, bool]:
+    """Return the index for ``commit`` and whether it was loaded from ``index_dir``."""
+
+    tree_id = contracts_tree_id(objects, commit)
+    path = index_dir / f"{tree_id}.json" if index_dir is not None else None
+    if path is not None:
+        stored = _load_index(path, tree_id)
+        if stored is not None:
+            return stored, True
+    tree = _commit_tree(objects, commit)
+    built = build_index(tree_id, _schema_identifier_index(objects, tree, cache))
+    if path is not None:
+        _store_index(path, built)
+    return built, False
+
+
+def _bound_schemas(manifest_path: str) -> set[str]:
+    try:
+        payload = json.loads(Path(manifest_path).read_bytes())
+    except (OSError, UnicodeDecodeError, ValueError) as exc:
+        raise ManifestError("MANIFEST_UNREADABLE", f"{manifest_path}: {exc}") from exc
+    schemas = payload.get("schemas") if isinstance(payload, dict) else None
+    if not isinstance(schemas, dict):
+        raise ManifestError("MANIFEST_UNREADABLE", f"{manifest_path} binds no schemas")
+    return set(schemas)
+
+
+def query(
+    index: DependentsIndex, schemas: Sequence[str], manifests: Sequence[str] = ()
+) -> dict[str, Any]:
+    """Describe everything a change to ``schemas`` can affect."""
+
+    selected: list[str] = []
+    for schema in schemas:
+        relative = _relative_path(schema, "SCHEMA_PATH_INVALID")
+        if relative not in index.schemas:
+            raise ManifestError(
+                "SCHEMA_NOT_TRACKED", f"schema is not tracked by the bound commit: {relative}"
+            )
+        selected.append(relative)
+    dependents = index.transitive(selected)
+    affected = set(selected) | set(dependents)
+    consumers = sorted(
+        {path.split("/")[1] for path in affected if path.count("/") >= 2}
+    )
+    return {
+        "contracts_tree": index.tree,
+        "schemas": sorted(set(selected)),
+        "dependents": dependents,
+        "consumers": consumers,
+        "manifests": [
+            manifest for manifest in manifests if _bound_schemas(manifest) & affected
+        ],
+    }
+
+
+def _parser() -> argparse.ArgumentParser:
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--source", required=True, help="Explicit Metarepo checkout.")
+    parser.add_argument(
+        "--expected-commit", help="Require HEAD of --source to be exactly this 40-hex commit."
+    )
+    parser.add_argument(
+        "--require-clean",
+        action="store_true",
+        help="Reject a --source worktree with uncommitted changes, as the producer does.",
+    )
+    parser.add_argument(
+        "--schema",
+        action="append",
+        default=[],
+        required=True,
+        help="Committed schema path whose dependents to list; repeatable.",
+    )
+    parser.add_argument(
+        "--manifest",
+        action="append",
+        default=[],
+        help="Contract source manifest to check for affected bindings; repeatable.",
+    )
+    parser.add_argument(
+        "--index-dir",
+        help="Directory that persists one reverse index per committed contracts/ tree.",
+    )
+    parser.add_argument(
+        "--parse-cache",
+        help="Schema parse cache shared with emit_source_manifest.py for index builds.",
+    )
+    parser.add_argument(
+        "--object-reader",
+        choices=OBJECT_READERS,
+        default="auto",
+        help="How Git objects are read; see emit_source_manifest.py.",
+    )
+    return parser
+
+
+def run(argv: Sequence[str] | None = None) -> int:
+    args = _parser().parse_args(argv)
+    index_dir = Path(args.index_dir).expanduser() if args.index_dir is not None else None
+    index = None
+    if index_dir is not None and not args.require_clean:
+        head = _head_contracts_tree(args.source)
+        if head is not None and args.expected_commit in (None, head[0]):
+            commit, tree_id = head
+            index = _load_index(index_dir / f"{tree_id}.json", tree_id)
+    if index is None:
+        root, commit = resolve_source(
+            args.source,
+            args.expected_commit,
+            args.object_reader,
+            require_clean=args.require_clean,
+        )
+        cache = None
+        if args.parse_cache is not None:
+            cache = SchemaParseCache(Path(args.parse_cache).expanduser())
+        with GitObjectReader(root, args.object_reader) as objects:
+            index, _reused = dependents_index(objects, commit, index_dir, cache)
+        if cache is not None:
+            cache.evict()
+    result = {"commit": commit, **query(index, args.schema, args.manifest)}
+    sys.stdout.write(json.dumps(result, indent=2, ensure_ascii=False) + "\n")
+    return 0
+
+
+def main(argv: Sequence[str] | None = None) -> int:
+    try:
+        return run(argv)
+    except ManifestError as exc:
+        print(str(exc), file=sys.stderr)
+        return 2
+
+
+if __name__ == "__main__":
+    raise SystemExit(main())
@@ -0,0 +1,522 @@
+#!/usr/bin/env python3
+"""Serve contract source closures, manifests and cache checks from a warm process.
+
+Local tooling asks for manifests and closures many times per session; each
+``emit_source_manifest.py`` run pays interpreter start-up, ``resolve_source``
+and a full identifier index build. This service resolves one explicit source
+checkout once and keeps its object reader, committed ``contracts/`` tree and
+identifier index in memory. It speaks line-delimited JSON-RPC 2.0 on
+stdin/stdout, or on a unix socket with ``--socket``.
+
+Before every request the service compares a fingerprint of ``HEAD``, the ref
+it names, ``packed-refs`` and the Git index with the one it was built from. On
+any change the source is resolved again under the same rules as the CLI, and
+the index is rebuilt reusing the facts of every blob the previous tree shared.
+``status`` and ``closure`` answer from committed objects only and never look
+at the worktree. ``emit`` and ``verify`` check that it is clean on every call,
+since an edit to a tracked file need not touch the index.
+
+On a socket every client gets its own connection thread, and requests are
+answered one at a time under a lock around the warm state. A socket left
+behind by a service that died is removed when nothing answers on it.
+
+Methods: ``status``, ``closure``, ``emit``, ``verify`` and ``shutdown``. A
+``ManifestError`` is answered with JSON-RPC error ``-32000`` whose ``data``
+carries the stable ``code`` and ``detail``. Any other failure of one request
+is answered with ``-32603``; the session keeps serving.
+"""
+from __future__ import annotations
+
+import argparse
+import json
+import os
+from pathlib import Path
+import socket
+import socketserver
+import stat
+import sys
+import threading
+from typing import Any, Callable, TextIO, Sequence
+
+script_dir = Path(__file__).resolve().parent
+if str(script_dir) not in sys.path:
+    sys.path.insert(0, str(script_dir))
+
+from emit_source_manifest import (  # noqa: E402
+    DEFAULT_CONTENT_ROOT,
+    OBJECT_READERS,
+    SOURCE_KINDS,
+    STORE_LINKS,
+    VERIFY_MODES,
+    ContentStore,
+    GitObjectReader,
+    GitTreeEntry,
+    ManifestError,
+    SchemaIndex,
+    SchemaParseCache,
+    _commit_tree,
+    _manifest_layout,
+    _relative_path,
+    _require_clean,
+    _resolve_out_dir,
+    _run_git,
+    _schema_closure_paths,
+    _schema_identifier_index,
+    _verify,
+    _write_cache,
+    build_manifest,
+    render_manifest,
+    resolve_source,
+    select_schemas,
+)
+
+PARSE_ERROR = -32700
+INVALID_REQUEST = -32600
+METHOD_NOT_FOUND = -32601
+INVALID_PARAMS = -32602
+INTERNAL_ERROR = -32603
+MANIFEST_FAILURE = -32000
+
+
+class RequestError(Exception):
+    """A JSON-RPC protocol error, as opposed to a typed manifest failure."""
+
+    def __init__(self, code: int, message: str) -> None:
+        self.code = code
+        super().__init__(message)
+
+
+def _git_state_paths(root: Path) -> tuple[Path, Path]:
+    git_dir, common_dir = _run_git(
+        root, "rev-parse", "--git-dir", "--git-common-dir"
+    ).splitlines()
+    return (root / git_dir).resolve(), (root / common_dir).resolve()
+
+
+def _fingerprint(git_dir: Path, common_dir: Path) -> tuple[Any, ...] | None:
+    """Identify HEAD and the index by the files Git rewrites when they move.
+
+    Returns ``None`` when the layout cannot be fingerprinted (a reftable
+    repository, say), so the caller revalidates on every request.
+    """
+
+    if (common_dir / "reftable").exists():
+        return None
+    try:
+        head = (git_dir / "HEAD").read_bytes()
+    except OSError:
+        return None
+    paths = [git_dir / "index", common_dir / "packed-refs"]
+    if head.startswith(b"ref: "):
+        ref = head[5:].strip().decode("utf-8", "replace")
+        paths += [git_dir / ref, common_dir / ref]
+    observed: list[Any] = [head]
+    for path in paths:
+        try:
+            metadata = path.stat()
+        except FileNotFoundError:
+            observed.append(None)
+            continue
+        except OSError:
+            return None
+        observed.append(
+            (metadata.st_ino, metadata.st_size, metadata.st_mtime_ns, metadata.st_ctime_ns)
+        )
+    return tuple(observed)
+
+
+def _strings(params: dict[str, Any], name: str) -> list[str]:
+    value = params.get(name, [])
+    if not isinstance(value, list) or not all(isinstance(item, str) for item in value):
+        raise RequestError(INVALID_PARAMS, f"{name} must be a list of strings")
+    return value
+
+
+def _string(params: dict[str, Any], name: str, default: str | None = None) -> str:
+    value = params.get(name, default)
+    if not isinstance(value, str):
+        raise RequestError(INVALID_PARAMS, f"{name} must be a string")
+    return value
+
+
+def _path(params: dict[str, Any], name: str) -> str:
+    value = _string(params, name)
+    if "\0" in value:
+        raise RequestError(INVALID_PARAMS, f"{name} must not contain NUL")
+    return value
+
+
+def _choice(params: dict[str, Any], name: str, choices: Sequence[str], default: str) -> str:
+    value = _string(params, name, default)
+    if value not in choices:
+        raise RequestError(INVALID_PARAMS, f"{name} must be one of {', '.join(choices)}")
+    return value
+
+
+class SourceService:
+    """Warm state for one explicit source checkout."""
+
+    def __init__(
+        self,
+        source: str,
+        object_reader: str = "auto",
+        cache: SchemaParseCache | None = None,
+    ) -> None:
+        self.source = source
+        self.object_reader = object_reader
+        self.cache = cache
+        self.root: Path | None = None
+        self.commit: str | None = None
+        self.objects: GitObjectReader | None = None
+        self.tree: dict[str, GitTreeEntry] = {}
+        self.index: SchemaIndex | None = None
+        self.fingerprint: tuple[Any, ...] | None = None
+        self.git_paths: tuple[Path, Path] | None = None
+        self.rebuilds = 0
+        self.stopped = False
+        self.lock = threading.Lock()
+        self.methods: dict[str, Callable[[dict[str, Any]], Any]] = {
+            "status": self.status,
+            "closure": self.closure,
+            "emit": self.emit,
+            "verify": self.verify,
+            "shutdown": self.shutdown,
+        }
+
+    def close(self) -> None:
+        if self.objects is not None:
+            self.objects.close()
+            self.objects = None
+
+    def _current(self) -> tuple[Any, ...] | None:
+        if self.git_paths is None:
+            return None
+        return _fingerprint(*self.git_paths)
+
+    def refresh(self, *, require_clean: bool = False) -> None:
+        """Rebuild the warm state if HEAD or the index moved since it was built.
+
+        With ``require_clean`` the worktree must be clean, whether or not the
+        state was rebuilt.
+        """
+
+        current = self._current()
+        if self.fingerprint is None or current != self.fingerprint:
+            self._rebuild()
+        if require_clean:
+            assert self.root is not None
+            _require_clean(self.root)
+
+    def _rebuild(self) -> None:
+        self.fingerprint = None
+        root, commit = resolve_source(
+            self.source, None, self.object_reader, require_clean=False
+        )
+        if self.git_paths is None or root != self.root:
+            self.git_paths = _git_state_paths(root)
+        # Taken before the rebuild: a change that races it only costs one more.
+        fingerprint = self._current()
+        known = None
+        if self.index is not None:
+            known = {
+                (self.tree[relative].object_id, relative): facts
+                for relative, facts in self.index.schemas.items()
+            }
+        objects = GitObjectReader(root, self.object_reader)
+        try:
+            tree = _commit_tree(objects, commit)
+            index = _schema_identifier_index(objects, tree, self.cache, known=known)
+        except BaseException:
+            objects.close()
+            raise
+        self.close()
+        self.root, self.commit, self.objects = root, commit, objects
+        self.tree, self.index = tree, index
+        self.fingerprint = fingerprint
+        self.rebuilds += 1
+
+    def _expect(self, params: dict[str, Any]) -> None:
+        expected = params.get("expected_commit")
+        if expected is None:
+            return
+        if not isinstance(expected, str):
+            raise RequestError(INVALID_PARAMS, "expected_commit must be a string")
+        if expected.strip().lower() != self.commit:
+            raise ManifestError(
+                "SOURCE_COMMIT_MISMATCH", f"expected {expected.strip().lower()}, observed {self.commit}"
+            )
+
+    def _selection(self, params: dict[str, Any]) -> list[str]:
+        return select_schemas(self.tree, _strings(params, "consumers"), _strings(params, "schemas"))
+
+    def _manifest(self, params: dict[str, Any]) -> tuple[dict[str, Any], dict[str, bytes]]:
+        assert self.objects is not None and self.index is not None and self.commit is not None
+        source_kind = _choice(params, "source_kind", SOURCE_KINDS, "detached_archive")
+        content_root = _string(params, "content_root", DEFAULT_CONTENT_ROOT)
+        schema_paths = self._selection(params)
+        _manifest_layout(source_kind, content_root)
+        return build_manifest(
+            self.objects,
+            self.tree,
+            self.commit,
+            source_kind,
+            content_root,
+            schema_paths,
+            index=self.index,
+        )
+
+    def status(self, params: dict[str, Any]) -> dict[str, Any]:
+        self.refresh()
+        assert self.index is not None
+        return {
+            "commit": self.commit,
+            "schemas_indexed": len(self.index.schemas),
+            "rebuilds": self.rebuilds,
+        }
+
+    def closure(self, params: dict[str, Any]) -> dict[str, Any]:
+        self.refresh()
+        self._expect(params)
+        assert self.objects is not None and self.index is not None
+        schemas = _schema_closure_paths(
+            self.objects, self.tree, self._selection(params), self.index
+        )
+        return {"commit": self.commit, "schemas": schemas}
+
+    def emit(self, params: dict[str, Any]) -> dict[str, Any]:
+        self.refresh(require_clean=True)
+        self._expect(params)
+        assert self.root is not None
+        manifest, payload_bytes = self._manifest(params)
+        out_dir = _resolve_out_dir(_path(params, "out_dir"), self.root, create=True)
+        store = None
+        if params.get("store") is not None:
+            store_dir = Path(_path(params, "store")).expanduser()
+            resolved = store_dir.resolve()
+            if resolved == self.root or self.root in resolved.parents:
+                raise ManifestError(
+                    "STORE_INVALID", "the store must not live inside the bound Metarepo source"
+                )
+            store = ContentStore(store_dir, _choice(params, "store_link", STORE_LINKS, "hardlink"))
+        content_dir, summary = _write_cache(
+            out_dir,
+            manifest,
+            render_manifest(manifest),
+            payload_bytes,
+            overwrite=params.get("overwrite") is True,
+            stat_index=params.get("stat_index") is True,
+            merkle=params.get("merkle") is True,
+            store=store,
+        )
+        return {"manifest": manifest, "summary": summary.describe(content_dir)}
+
+    def verify(self, params: dict[str, Any]) -> dict[str, Any]:
+        self.refresh(require_clean=True)
+        self._expect(params)
+        assert self.root is not None
+        mode = _choice(params, "mode", VERIFY_MODES, "stat")
+        subtrees = sorted(
+            {
+                _relative_path(value, "VERIFY_SUBTREE_INVALID")
+                for value in _strings(params, "subtrees")
+            }
+        )
+        manifest, payload_bytes = self._manifest(params)
+        out_dir = _resolve_out_dir(_path(params, "out_dir"), self.root, create=False)
+        _verify(
+            out_dir,
+            manifest["source_root"],
+            render_manifest(manifest),
+            payload_bytes,
+            mode,
+            manifest["schemas"],
+            subtrees,
+        )
+        return {"verified": True, "commit": self.commit, "schemas": sorted(manifest["schemas"])}
+
+    def shutdown(self, params: dict[str, Any]) -> None:
+        self.stopped = True
+        return None
+
+    def handle(self, request: Any) -> dict[str, Any] | None:
+        """Answer one decoded JSON-RPC request; notifications get no response."""
+
+        request_id = request.get("id") if isinstance(request, dict) else None
+        try:
+            if (
+                not isinstance(request, dict)
+                or request.get("jsonrpc") != "2.0"
+                or not isinstance(request.get("method"), str)
+            ):
+                raise RequestError(INVALID_REQUEST, "not a JSON-RPC 2.0 request")
+            method = self.methods.get(request["method"])
+            if method is None:
+                raise RequestError(METHOD_NOT_FOUND, f"unknown method {request['method']!r}")
+            params = request.get("params", {})
+            if not isinstance(params, dict):
+                raise RequestError(INVALID_PARAMS, "params must be an object")
+            result = method(params)
+        except RequestError as exc:
+            error: dict[str, Any] = {"code": exc.code, "message": str(exc)}
+        except ManifestError as exc:
+            error = {
+                "code": MANIFEST_FAILURE,
+                "message": str(exc),
+                "data": {"code": exc.code, "detail": exc.detail},
+            }
+        except Exception as exc:  # noqa: BLE001 - one request must not end the session
+            error = {"code": INTERNAL_ERROR, "message": f"{type(exc).__name__}: {exc}"}
+        else:
+            if "id" not in request:
+                return None
+            return {"jsonrpc": "2.0", "id": request_id, "result": result}
+        if isinstance(request, dict) and "id" not in request and error["code"] != INVALID_REQUEST:
+            return None
+        return {"jsonrpc": "2.0", "id": request_id, "error": error}
+
+    def serve(self, reader: TextIO, writer: TextIO) -> None:
+        """Answer line-delimited requests from ``reader`` until EOF or shutdown."""
+
+        for line in reader:
+            if not line.strip():
+                continue
+            try:
+                request = json.loads(line)
+            except (ValueError, RecursionError) as exc:
+                response: dict[str, Any] | None = {
+                    "jsonrpc": "2.0",
+                    "id": None,
+                    "error": {"code": PARSE_ERROR, "message": f"invalid JSON: {exc}"},
+                }
+            else:
+                with self.lock:
+                    response = self.handle(request)
+            if response is not None:
+                writer.write(json.dumps(response, separators=(",", ":"), ensure_ascii=False) + "\n")
+                writer.flush()
+            if self.stopped:
+                return
+
+
+def _remove_stale_socket(socket_path: Path) -> None:
+    """Unlink a socket nobody listens on; refuse one a live service answers on."""
+
+    try:
+        metadata = socket_path.lstat()
+    except FileNotFoundError:
+        return
+    if not stat.S_ISSOCK(metadata.st_mode):
+        raise ManifestError("SERVICE_SOCKET_INVALID", f"not a socket: {socket_path}")
+    probe = socket.socket(socket.AF_UNIX, socket.SOCK_STREAM)
+    try:
+        probe.connect(str(socket_path))
+    except (ConnectionRefusedError, FileNotFoundError):
+        pass
+    except OSError as exc:
+        raise ManifestError("SERVICE_SOCKET_INVALID", f"{socket_path}: {exc}") from exc
+    else:
+        raise ManifestError(
+            "SERVICE_SOCKET_INVALID", f"another service is listening on {socket_path}"
+        )
+    finally:
+        probe.close()
+    try:
+        socket_path.unlink()
+    except FileNotFoundError:
+        pass
+
+
+def _serve_socket(service: SourceService, socket_path: Path) -> None:
+    _remove_stale_socket(socket_path)
+
+    class Handler(socketserver.StreamRequestHandler):
+        def handle(self) -> None:
+            reader = (line.decode("utf-8", "replace") for line in self.rfile)
+            service.serve(reader, _SocketWriter(self.wfile))
+            if service.stopped:
+                # Called from a connection thread, so serve_forever can return.
+                self.server.shutdown()
+
+    class Server(socketserver.ThreadingUnixStreamServer):
+        daemon_threads = True
+
+    previous = os.umask(0o177)
+    try:
+        server = Server(str(socket_path), Handler)
+    except OSError as exc:
+        raise ManifestError("SERVICE_SOCKET_INVALID", f"{socket_path}: {exc}") from exc
+    finally:
+        os.umask(previous)
+    try:
+        with server:
+            server.serve_forever()
+    finally:
+        try:
+            socket_path.unlink()
+        except OSError:
+            pass
+
+
+class _SocketWriter:
+    def __init__(self, stream: Any) -> None:
+        self.stream = stream
+
+    def write(self, text: str) -> None:
+        self.stream.write(text.encode("utf-8"))
+
+    def flush(self) -> None:
+        self.stream.flush()
+
+
+def _parser() -> argparse.ArgumentParser:
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--source", required=True, help="Explicit clean Metarepo checkout.")
+    parser.add_argument(
+        "--socket",
+        metavar="PATH",
+        help="Listen on this unix socket (mode 0600) instead of stdin/stdout.",
+    )
+    parser.add_argument(
+        "--object-reader",
+        choices=OBJECT_READERS,
+        default="auto",
+        help="How Git objects are read; see emit_source_manifest.py.",
+    )
+    parser.add_argument(
+        "--parse-cache",
+        metavar="DIR",
+        help="Schema parse cache shared with emit_source_manifest.py for rebuilds.",
+    )
+    return parser
+
+
+def run(argv: Sequence[str] | None = None) -> int:
+    args = _parser().parse_args(argv)
+    cache = None
+    if args.parse_cache is not None:
+        cache = SchemaParseCache(Path(args.parse_cache).expanduser())
+    service = SourceService(args.source, args.object_reader, cache)
+    # Fail fast on an unusable source instead of on the first request.
+    service.refresh()
+    try:
+        if args.socket is not None:
+            _serve_socket(service, Path(args.socket).expanduser())
+        else:
+            service.serve(sys.stdin, sys.stdout)
+    finally:
+        service.close()
+        if cache is not None:
+            cache.evict()
+    return 0
+
+
+def main(argv: Sequence[str] | None = None) -> int:
+    try:
+        return run(argv)
+    except ManifestError as exc:
+        print(str(exc), file=sys.stderr)
+        return 2
+
+
+if __name__ == "__main__":
+    raise SystemExit(main())
@@ -1,10 +1,27 @@
 #!/usr/bin/env python3
-"""Validate the evidence-bound Metarepo contract consumer registry."""
+"""Validate the evidence-bound Metarepo contract consumer registry.
+
+With ``--cache FILE`` every contract and every claim that passed is
+remembered by the SHA-256 of the canonical JSON of exactly the inputs its
+verdict reads: the registry entry, its evidence record, ``observedAt``, the
+schema digest and, for claims, the ``repository_heads`` entry of the claimed
+repository. The digest of this script is part of every key. Unchanged
+entries are skipped on the next run; the document-wide checks always run, and
+a failing entry is never cached, so errors are reported exactly as without
+the cache.
+
+``--checkouts DIR`` additionally checks every evidence line and mirror digest
+against ``DIR/<repository>`` at the pinned commit; see
+``verify_consumer_checkouts.py``.
+"""
 
 from __future__ import annotations
 
+import argparse
+from dataclasses import dataclass
 import hashlib
 import json
+import os
 import re
 import sys
 from datetime import datetime
@@ -13,6 +30,12 @@ from typing import Any
 
 import yaml
 
+script_dir = Path(__file__).resolve().parent
+if str(script_dir) not in sys.path:
+    sys.path.insert(0, str(script_dir))
+
+from consumer_evidence import EvidenceClaim, EvidenceContract, load_evidence  # noqa: E402
+
 ROOT = Path(__file__).resolve().parents[2]
 REGISTRY_PATH = ROOT / "contracts/consumers.yaml"
 EVIDENCE_PATH = ROOT / "contracts/consumer-evidence.v1.json"
@@ -24,12 +47,22 @@ MODES = {None, "mirror", "reference-only", "notification-only"}
 SHA40 = re.compile(r"^[0-9a-f]{40}$")
 SHA64 = re.compile(r"^[0-9a-f]{64}$")
 REPO_NAME = re.compile(r"^[A-Za-z0-9._-]+$")
+CACHE_VERSION = 1
 
 
 class RegistryError(ValueError):
     """Raised when the registry or its evidence is inconsistent."""
 
 
+@dataclass(frozen=True)
+class ValidatedRegistry:
+    """The summary of a passed registry plus the evidence it was checked against."""
+
+    summary: dict[str, int]
+    repository_heads: dict[str, str]
+    claims: list[EvidenceClaim]
+
+
 def _require_string(value: Any, label: str) -> str:
     if not isinstance(value, str) or not value.strip():
         raise RegistryError(f"{label} must be a non-empty string")
@@ -53,6 +86,74 @@ def _safe_relative_path(value: Any, label: str) -> str:
 def _sha256(path: Path) -> str:
     return hashlib.sha256(path.read_bytes()).hexdigest()
 
+
+class VerdictCache:
+    """Keys of contract and claim verdicts that passed, in one JSON file.
+
+    A missing, unreadable or foreign cache file counts as empty. ``store``
+    keeps only the keys that passed in this run.
+    """
+
+    def __init__(self, path: Path) -> None:
+        self.path = path
+        self.checker = _sha256(Path(__file__))
+        self.hits = 0
+        self.misses = 0
+        self._known: frozenset[str] = frozenset()
+        self._passed: set[str] = set()
+        try:
+            stored = json.loads(path.read_bytes())
+        except (OSError, ValueError):
+            return
+        if (
+            isinstance(stored, dict)
+            and stored.get("version") == CACHE_VERSION
+            and isinstance(stored.get("verdicts"), list)
+        ):
+            self._known = frozenset(key for key in stored["verdicts"] if isinstance(key, str))
+
+    def key(self, kind: str, **inputs: Any) -> str | None:
+        """Digest the canonical JSON of ``inputs``; ``None`` if it has none."""
+
+        try:
+            canonical = json.dumps(
+                {"checker": self.checker, "inputs": inputs, "kind": kind},
+                allow_nan=False,
+                ensure_ascii=False,
+                separators=(",", ":"),
+                sort_keys=True,
+            )
+        except (TypeError, ValueError):
+            return None
+        return hashlib.sha256(canonical.encode("utf-8")).hexdigest()
+
+    def passed(self, key: str | None) -> bool:
+        if key is not None and key in self._known:
+            self.hits += 1
+            self._passed.add(key)
+            return True
+        self.misses += 1
+        return False
+
+    def record(self, key: str | None) -> None:
+        if key is not None:
+            self._passed.add(key)
+
+    def store(self) -> None:
+        payload = {"version": CACHE_VERSION, "verdicts": sorted(self._passed)}
+        temporary = self.path.with_name(f".{self.path.name}.{os.getpid()}.tmp")
+        try:
+            self.path.parent.mkdir(parents=True, exist_ok=True)
+            temporary.write_text(json.dumps(payload) + "\n", encoding="utf-8")
+            os.replace(temporary, self.path)
+        except OSError:
+            try:
+                temporary.unlink()
+            except OSError:
+                pass
+            raise
+
+
 def _claim_ref(ref: Any, expected_id: str) -> None:
     expected = f"contracts/consumer-evidence.v1.json#claims/{expected_id}"
     if ref != expected:
@@ -70,7 +171,7 @@ def _validate_claim(
     identity: str,
     role: str,
     item: dict[str, Any],
-    evidence_claims: dict[str, dict[str, Any]],
+    evidence_claims: dict[str, EvidenceClaim],
     repository_heads: dict[str, str],
     observed_at: str,
     schema_sha256: str | None,
@@ -159,17 +260,68 @@ def _validate_claim(
             raise RegistryError(f"verified mirror {claim_id} lacks checks for declared files")
 
 
-def validate_registry(root: Path = ROOT) -> dict[str, int]:
+def _record_json(record: EvidenceClaim | EvidenceContract | None) -> dict[str, Any] | None:
+    return None if record is None else record.to_json()
+
+
+def _load_evidence(path: Path) -> dict[str, Any]:
+    try:
+        return load_evidence(path)
+    except (OSError, UnicodeError, ValueError) as exc:
+        raise RegistryError(f"cannot parse {path}: {exc}") from exc
+
+
+def _validate_contract(
+    *,
+    identity: str,
+    item: dict[str, Any],
+    schema: str,
+    schema_exists: bool,
+    schema_digest: str | None,
+    contract_evidence: EvidenceContract | None,
+    observed_at: str,
+) -> None:
+    lifecycle = item.get("lifecycle")
+    if lifecycle not in LIFECYCLES:
+        raise RegistryError(f"{identity}.lifecycle is invalid")
+    if item.get("last_verified") != observed_at:
+        raise RegistryError(f"{identity}.last_verified differs from evidence")
+    _require_string(item.get("status_reason"), f"{identity}.status_reason")
+    replacement = item.get("replacement")
+    if replacement is not None:
+        _require_string(replacement, f"{identity}.replacement")
+    _contract_ref(item.get("evidence_ref"), identity)
+
+    if lifecycle != "historical" and not schema_exists:
+        raise RegistryError(f"{identity} active or compatibility schema is missing: {schema}")
+    if contract_evidence is None:
+        raise RegistryError(f"contract evidence missing: {identity}")
+    expected_contract = {
+        "schema": schema,
+        "schemaExists": schema_exists,
+        "schemaSha256": schema_digest,
+        "lifecycle": lifecycle,
+        "replacement": replacement,
+    }
+    for key, value in expected_contract.items():
+        if contract_evidence.get(key) != value:
+            raise RegistryError(f"contract evidence {identity} differs at {key}")
+
+
+def validate_registry(root: Path = ROOT, cache: VerdictCache | None = None) -> dict[str, int]:
+    return check_registry(root, cache).summary
+
+
+def check_registry(root: Path = ROOT, cache: VerdictCache | None = None) -> ValidatedRegistry:
+    """Validate the registry and keep the scope heads and claims it was bound to."""
+
     registry_path = root / REGISTRY_PATH.relative_to(ROOT)
     evidence_path = root / EVIDENCE_PATH.relative_to(ROOT)
     try:
         registry = yaml.safe_load(registry_path.read_text(encoding="utf-8"))
     except (OSError, yaml.YAMLError) as exc:
         raise RegistryError(f"cannot parse {registry_path}: {exc}") from exc
-    try:
-        evidence = json.loads(evidence_path.read_text(encoding="utf-8"))
-    except (OSError, json.JSONDecodeError) as exc:
-        raise RegistryError(f"cannot parse {evidence_path}: {exc}") from exc
+    evidence = _load_evidence(evidence_path)
 
     if not isinstance(registry, dict) or not registry:
         raise RegistryError("consumer registry must be a non-empty mapping")
@@ -217,18 +369,18 @@ def validate_registry(root: Path = ROOT) -> dict[str, int]:
             raise RegistryError(f"duplicate scope repository: {name}")
         repository_heads[name] = commit
 
-    evidence_contracts: dict[str, dict[str, Any]] = {}
+    evidence_contracts: dict[str, EvidenceContract] = {}
     for item in _require_list(evidence.get("contracts"), "evidence.contracts"):
-        if not isinstance(item, dict):
+        if not isinstance(item, EvidenceContract):
             raise RegistryError("evidence contract must be an object")
         identity = _require_string(item.get("id"), "evidence contract id")
         if identity in evidence_contracts:
             raise RegistryError(f"duplicate evidence contract: {identity}")
         evidence_contracts[identity] = item
 
-    evidence_claims: dict[str, dict[str, Any]] = {}
+    evidence_claims: dict[str, EvidenceClaim] = {}
     for item in _require_list(evidence.get("claims"), "evidence.claims"):
-        if not isinstance(item, dict):
+        if not isinstance(item, EvidenceClaim):
             raise RegistryError("evidence claim must be an object")
         claim_id = _require_string(item.get("id"), "evidence claim id")
         if claim_id in evidence_claims:
@@ -251,72 +403,82 @@ def validate_registry(root: Path = ROOT) -> dict[str, int]:
             schema = _safe_relative_path(item.get("schema"), f"{identity}.schema")
             if not schema.startswith("contracts/"):
                 raise RegistryError(f"{identity}.schema must stay below contracts/")
-            lifecycle = item.get("lifecycle")
-            if lifecycle not in LIFECYCLES:
-                raise RegistryError(f"{identity}.lifecycle is invalid")
-            if item.get("last_verified") != observed_at:
-                raise RegistryError(f"{identity}.last_verified differs from evidence")
-            _require_string(item.get("status_reason"), f"{identity}.status_reason")
-            replacement = item.get("replacement")
-            if replacement is not None:
-                _require_string(replacement, f"{identity}.replacement")
-            _contract_ref(item.get("evidence_ref"), identity)
-
             schema_path = root / schema
             schema_exists = schema_path.is_file()
-            if lifecycle != "historical" and not schema_exists:
-                raise RegistryError(f"{identity} active or compatibility schema is missing: {schema}")
             schema_digest = _sha256(schema_path) if schema_exists else None
-
             contract_evidence = evidence_contracts.get(identity)
-            if contract_evidence is None:
-                raise RegistryError(f"contract evidence missing: {identity}")
-            expected_contract = {
-                "schema": schema,
-                "schemaExists": schema_exists,
-                "schemaSha256": schema_digest,
-                "lifecycle": lifecycle,
-                "replacement": replacement,
-            }
-            for key, value in expected_contract.items():
-                if contract_evidence.get(key) != value:
-                    raise RegistryError(f"contract evidence {identity} differs at {key}")
-
-            allowed_statuses = {
-                "active": {"verified", "unverified"},
-                "compatibility": {"compatibility"},
-                "historical": {"historical"},
-            }[lifecycle]
-            for producer in _require_list(item.get("producers"), f"{identity}.producers"):
-                if not isinstance(producer, dict):
-                    raise RegistryError(f"{identity}.producer must be an object")
-                if producer.get("status") not in allowed_statuses:
-                    raise RegistryError(f"{identity}.producer status conflicts with lifecycle {lifecycle}")
-                _validate_claim(
+            contract_key = None
+            if cache is not None:
+                contract_key = cache.key(
+                    "contract",
                     identity=identity,
-                    role="producer",
-                    item=producer,
-                    evidence_claims=evidence_claims,
-                    repository_heads=repository_heads,
+                    item={
+                        key: value
+                        for key, value in item.items()
+                        if key not in ("producers", "consumers")
+                    },
+                    evidence=_record_json(contract_evidence),
                     observed_at=observed_at,
                     schema_sha256=schema_digest,
                 )
-                claim_count += 1
-            for consumer in _require_list(item.get("consumers"), f"{identity}.consumers"):
-                if not isinstance(consumer, dict):
-                    raise RegistryError(f"{identity}.consumer must be an object")
-                if consumer.get("status") not in allowed_statuses:
-                    raise RegistryError(f"{identity}.consumer status conflicts with lifecycle {lifecycle}")
-                _validate_claim(
+            if cache is None or not cache.passed(contract_key):
+                _validate_contract(
                     identity=identity,
-                    role="consumer",
-                    item=consumer,
-                    evidence_claims=evidence_claims,
-                    repository_heads=repository_heads,
+                    item=item,
+                    schema=schema,
+                    schema_exists=schema_exists,
+                    schema_digest=schema_digest,
+                    contract_evidence=contract_evidence,
                     observed_at=observed_at,
-                    schema_sha256=schema_digest,
                 )
-                claim_count += 1
+                if cache is not None:
+                    cache.record(contract_key)
+
+            lifecycle = item["lifecycle"]
+            allowed_statuses = {
+                "active": {"verified", "unverified"},
+                "compatibility": {"compatibility"},
+                "historical": {"historical"},
+            }[lifecycle]
+            for role, key in (("producer", "producers"), ("consumer", "consumers")):
+                for claim in _require_list(item.get(key), f"{identity}.{key}"):
+                    claim_count += 1
+                    claim_key = None
+                    if cache is not None:
+                        repo = claim.get("repo") if isinstance(claim, dict) else None
+                        repository = f"heimgewebe/{repo}"
+                        claim_key = cache.key(
+                            "claim",
+                            identity=identity,
+                            role=role,
+                            item=claim,
+                            allowed_statuses=sorted(allowed_statuses),
+                            evidence=_record_json(
+                                evidence_claims.get(f"{identity}::{role}::{repo}")
+                            ),
+                            repository_head={repository: repository_heads.get(repository)},
+                            observed_at=observed_at,
+                            schema_sha256=schema_digest,
+                        )
+                        if cache.passed(claim_key):
+                            continue
+                    if not isinstance(claim, dict):
+                        raise RegistryError(f"{identity}.{role} must be an object")
+                    if claim.get("status") not in allowed_statuses:
+                        raise RegistryError(
+                            f"{identity}.{role} status conflicts with lifecycle {lifecycle}"
+                        )
+                    _validate_claim(
+                        identity=identity,
+                        role=role,
+                        item=claim,
+                        evidence_claims=evidence_claims,
+                        repository_heads=repository_heads,
+                        observed_at=observed_at,
+                        schema_sha256=schema_digest,
+                    )
+                    if cache is not None:
+                        cache.record(claim_key)
 
     for identity, item in evidence_contracts.items():
         if identity not in identities:
@@ -341,20 +503,71 @@ def validate_registry(root: Path = ROOT) -> dict[str, int]:
     if missing_replacements:
         raise RegistryError(f"replacement identities missing: {sorted(missing_replacements)}")
 
-    return {
-        "contracts": len(identities),
-        "claims": claim_count,
-        "repositories": len(repository_heads),
-    }
-
-
-def main() -> int:
+    return ValidatedRegistry(
+        {
+            "contracts": len(identities),
+            "claims": claim_count,
+            "repositories": len(repository_heads),
+        },
+        repository_heads,
+        list(evidence_claims.values()),
+    )
+
+
+def main(argv: list[str] | None = None) -> int:
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument(
+        "--cache",
+        type=Path,
+        help="File remembering the contract and claim verdicts that passed",
+    )
+    parser.add_argument(
+        "--checkouts",
+        type=Path,
+        help="Directory holding sibling checkouts to verify evidence lines and mirrors in",
+    )
+    parser.add_argument(
+        "--jobs",
+        type=int,
+        default=None,
+        help="Repositories verified concurrently with --checkouts",
+    )
+    args = parser.parse_args(argv)
+    cache = VerdictCache(args.cache) if args.cache is not None else None
     try:
-        summary = validate_registry()
+        validated = check_registry(cache=cache)
     except RegistryError as exc:
         print(f"contract-consumer-registry: FAIL: {exc}", file=sys.stderr)
         return 1
-    print(json.dumps({"status": "valid", **summary}, sort_keys=True))
+    finally:
+        if cache is not None:
+            try:
+                cache.store()
+            except OSError as exc:
+                print(f"warning: cannot write {cache.path}: {exc}", file=sys.stderr)
+    if args.checkouts is not None:
+        from verify_consumer_checkouts import CHECKOUT_WORKERS, verify_checkouts
+
+        reports = verify_checkouts(
+            validated.claims,
+            validated.repository_heads,
+            args.checkouts,
+            jobs=args.jobs or CHECKOUT_WORKERS,
+        )
+        errors = [error for report in reports for error in report.errors]
+        output: dict[str, Any] = {"status": "valid", **validated.summary}
+        for error in errors:
+            print(f"contract-consumer-registry: FAIL: {error}", file=sys.stderr)
+        if errors:
+            return 1
+        output["checkouts"] = {
+            "blobs": sum(report.blobs for report in reports),
+            "skipped": [report.repository for report in reports if report.skipped],
+            "verified": sum(not report.skipped for report in reports),
+        }
+    else:
+        output = {"status": "valid", **validated.summary}
+    print(json.dumps(output, sort_keys=True))
     return 0
 
 
@@ -0,0 +1,230 @@
+#!/usr/bin/env python3
+"""Verify consumer evidence against local checkouts at the pinned commits.
+
+``consumer-evidence.v1.json`` records ``path``/``line`` pairs and mirror
+``sha256`` values at the commit each repository was audited at. This optional
+stage groups that evidence by repository and, for every repository whose
+checkout exists as ``<checkouts>/<name>``, opens one
+``emit_source_manifest.GitObjectReader``. The reader resolves every referenced
+path in the pinned commit's tree level by level and reads each distinct blob
+once over the same pipelined channel. Evidence lines must lie within the blob,
+and mirror checks must match its SHA-256. The working tree of the checkout is
+never read.
+
+Repositories are verified concurrently on a bounded thread pool; each owns
+its reader. Reports come back in ``repository_heads`` order, so the output
+does not depend on scheduling. A repository without a checkout is skipped.
+"""
+from __future__ import annotations
+
+from concurrent.futures import ThreadPoolExecutor
+from dataclasses import dataclass, field
+import hashlib
+import os
+from pathlib import Path
+import sys
+from typing import Any, Iterable, Mapping
+
+script_dir = Path(__file__).resolve().parent
+if str(script_dir) not in sys.path:
+    sys.path.insert(0, str(script_dir))
+
+from emit_source_manifest import (  # noqa: E402
+    GitObjectReader,
+    ManifestError,
+    _commit_root_tree,
+    _parse_tree,
+)
+
+CHECKOUT_WORKERS = min(8, os.cpu_count() or 1)
+REGULAR_MODES = frozenset({"100644", "100755"})
+
+
+@dataclass(frozen=True)
+class BlobFacts:
+    """What the checks need from one blob: its line count and digest."""
+
+    lines: int
+    sha256: str
+
+
+@dataclass
+class CheckoutReport:
+    """Outcome of verifying one repository's evidence."""
+
+    repository: str
+    commit: str
+    checkout: Path
+    skipped: bool = False
+    blobs: int = 0
+    errors: list[str] = field(default_factory=list)
+
+
+def _line_count(data: bytes) -> int:
+    return data.count(b"\n") + (1 if data and not data.endswith(b"\n") else 0)
+
+
+def _resolve_blobs(
+    objects: GitObjectReader, commit: str, paths: Iterable[str]
+) -> dict[str, str | None]:
+    """Map each path to its regular blob in ``commit``, or ``None``.
+
+    Only the trees on the way to a requested path are read, one pipelined
+    batch per directory depth.
+    """
+
+    code = "EVIDENCE_COMMIT_UNREADABLE"
+    detail = f"cannot read evidence tree at {commit}"
+    found: dict[str, str | None] = dict.fromkeys(paths)
+    directories = {
+        path[: index + 1] for path in found for index, char in enumerate(path) if char == "/"
+    }
+    root_tree = _commit_root_tree(objects.read(commit, "commit", code=code, detail=detail))
+    if root_tree is None:
+        raise ManifestError(code, f"{detail}: commit has no valid root tree")
+    level: list[tuple[str, str]] = [("", root_tree)]
+    while level:
+        subtrees: list[tuple[str, str]] = []
+        requests = [(object_id, "tree", detail) for _prefix, object_id in level]
+        for (prefix, _object_id), data in zip(level, objects.iter_objects(requests, code=code)):
+            try:
+                entries = list(_parse_tree(data))
+            except ValueError as exc:
+                raise ManifestError(code, f"{detail}: malformed tree object") from exc
+            for mode, kind, object_id, raw_name in entries:
+                relative = prefix + raw_name.decode("utf-8", errors="surrogateescape")
+                if kind == "tree" and f"{relative}/" in directories:
+                    subtrees.append((f"{relative}/", object_id))
+                elif kind == "blob" and mode in REGULAR_MODES and relative in found:
+                    found[relative] = object_id
+        level = subtrees
+    return found
+
+
+def _well_formed(item: Any, needs: str) -> bool:
+    if not isinstance(item, Mapping) or not isinstance(item.get("path"), str) or not item["path"]:
+        return False
+    value = item.get(needs)
+    if needs == "line":
+        return isinstance(value, int) and not isinstance(value, bool)
+    return isinstance(value, str)
+
+
+def _entries(
+    claim: Mapping[str, Any], key: str, errors: list[str]
+) -> list[tuple[int, Mapping[str, Any]]]:
+    """Return the well-formed ``key`` entries of ``claim``; report the others.
+
+    ``validate_registry`` only checks the entries a claim's status needs, so
+    every entry's shape is checked again before it is used.
+    """
+
+    items = claim.get(key)
+    if items is None:
+        return []
+    if not isinstance(items, list):
+        errors.append(f"{claim.get('id')}.{key} must be a list")
+        return []
+    needs = "line" if key == "evidence" else "sha256"
+    entries = []
+    for index, item in enumerate(items):
+        if _well_formed(item, needs):
+            entries.append((index, item))
+        else:
+            errors.append(f"{claim.get('id')}.{key}[{index}] needs a path and a {needs}")
+    return entries
+
+
+def verify_repository(
+    repository: str, commit: str, checkout: Path, claims: list[Mapping[str, Any]]
+) -> CheckoutReport:
+    """Check the evidence lines and mirror digests of ``claims`` in one checkout."""
+
+    report = CheckoutReport(repository, commit, checkout)
+    if not checkout.is_dir():
+        report.skipped = True
+        return report
+
+    checked = [
+        (
+            claim.get("id"),
+            _entries(claim, "evidence", report.errors),
+            _entries(claim, "mirrorChecks", report.errors),
+        )
+        for claim in claims
+    ]
+    paths: set[str] = set()
+    for _claim_id, evidence_items, checks in checked:
+        paths.update(evidence["path"] for _index, evidence in evidence_items)
+        paths.update(check["path"] for _index, check in checks)
+    try:
+        with GitObjectReader(checkout) as objects:
+            blobs = _resolve_blobs(objects, commit, sorted(paths))
+            object_ids = sorted({object_id for object_id in blobs.values() if object_id})
+            requests = [
+                (object_id, "blob", f"cannot read evidence blob {object_id} at {commit}")
+                for object_id in object_ids
+            ]
+            facts = {
+                object_id: BlobFacts(_line_count(data), hashlib.sha256(data).hexdigest())
+                for object_id, data in zip(
+                    object_ids, objects.iter_objects(requests, code="EVIDENCE_BLOB_UNREADABLE")
+                )
+            }
+    except ManifestError as exc:
+        report.errors.append(f"{repository} checkout {checkout}: {exc}")
+        return report
+    report.blobs = len(facts)
+
+    for claim_id, evidence_items, checks in checked:
+        for index, evidence in evidence_items:
+            path = evidence["path"]
+            object_id = blobs[path]
+            if object_id is None:
+                report.errors.append(
+                    f"{claim_id}.evidence[{index}].path {path} is not a file at {commit}"
+                )
+            elif evidence["line"] > facts[object_id].lines:
+                report.errors.append(
+                    f"{claim_id}.evidence[{index}].line {evidence['line']} exceeds "
+                    f"{facts[object_id].lines} lines of {path} at {commit}"
+                )
+        for index, check in checks:
+            path = check["path"]
+            object_id = blobs[path]
+            if object_id is None:
+                report.errors.append(
+                    f"{claim_id}.mirrorChecks[{index}].path {path} is not a file at {commit}"
+                )
+            elif facts[object_id].sha256 != check.get("sha256"):
+                report.errors.append(
+                    f"{claim_id}.mirrorChecks[{index}].sha256 differs from {path} at {commit}"
+                )
+    return report
+
+
+def verify_checkouts(
+    claims: Iterable[Mapping[str, Any]],
+    repository_heads: Mapping[str, str],
+    checkouts: Path,
+    *,
+    jobs: int = CHECKOUT_WORKERS,
+) -> list[CheckoutReport]:
+    """Verify every repository's evidence in ``<checkouts>/<name>``.
+
+    ``claims`` and ``repository_heads`` must come from
+    ``validate_consumers.check_registry``, which binds every claim to its
+    scope commit.
+    """
+
+    grouped: dict[str, list[Mapping[str, Any]]] = {name: [] for name in repository_heads}
+    for claim in claims:
+        grouped[claim["repository"]].append(claim)
+    work = [
+        (name, commit, checkouts / name.rsplit("/", 1)[-1], grouped[name])
+        for name, commit in repository_heads.items()
+    ]
+    if jobs <= 1 or len(work) < 2:
+        return [verify_repository(*item) for item in work]
+    with ThreadPoolExecutor(max_workers=min(jobs, len(work))) as pool:
+        return list(pool.map(lambda item: verify_repository(*item), work))
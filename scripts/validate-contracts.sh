@@ -4,6 +4,20 @@ set -euo pipefail
 ROOT_DIR=$(cd -- "$(dirname -- "${BASH_SOURCE[0]}")/.." && pwd)
 cd "$ROOT_DIR"
 
+# Successful validations are remembered per input digest; see
+# metarepo_tools/validation_cache.py. --no-cache revalidates everything.
+use_cache=1
+for argument in "$@"; do
+  case "$argument" in
+    --no-cache) use_cache=0 ;;
+    *)
+      echo "usage: validate-contracts.sh [--no-cache]" >&2
+      exit 2
+      ;;
+  esac
+done
+CACHE_DIR="${CONTRACT_VALIDATION_CACHE:-${XDG_CACHE_HOME:-$HOME/.cache}/metarepo/contract-validation}"
+
 if [[ ! -d contracts ]]; then
   echo "contracts directory not found – nothing to validate"
   exit 0
@@ -21,7 +35,11 @@ if ! command -v python3 > /dev/null 2>&1; then
   echo "::error::python3 is required to strictly parse contract JSON"
   exit 1
 fi
-python3 scripts/check-contract-json.py contracts
+# Strict parse plus one-pass lint: duplicate $ids (nested ones included) and
+# unresolved local $refs fail here; orphan schemas are reported as notices.
+echo "::group::Strict parse and lint contracts"
+python3 scripts/check-contract-json.py --lint contracts
+echo "::endgroup::"
 
 # --- Setup direct AJV runtime ---
 echo "::group::Setup Validator"
@@ -92,156 +110,138 @@ fi
 
 if ((${#schemas[@]} == 0)); then
   echo "::notice::No schemas found under contracts/"
-else
-  # Check for duplicate $ids before validation
-  echo "::group::Check for Duplicate IDs"
-  # Extract IDs and check for duplicates
-  # We use grep to find lines with "$id", then sed to extract the value between quotes.
-  # Assumes format: "$id": "VALUE",
-  # shellcheck disable=SC2016
-  duplicates=$(grep -r '"$id"' contracts |
-    grep -v "contracts/examples" |
-    sed -n 's/.*"\$id"[[:space:]]*:[[:space:]]*"\([^"]*\)".*/\1/p' |
-    sort |
-    uniq -d)
+fi
 
-  if [[ -n "$duplicates" ]]; then
-    echo "::error::Duplicate \$id found in schemas:"
-    echo "$duplicates"
-    # Identify files containing the duplicates
-    for dup in $duplicates; do
-      echo "Files with ID '$dup':"
-      grep -r "$dup" contracts | grep -v "contracts/examples" | awk -F: '{print "  - " $1}'
-    done
-    exit 1
-  else
-    echo "No duplicate IDs found."
-  fi
-  echo "::endgroup::"
+# Key every compile, example and fixture by the digests of its inputs and look
+# it up in the result cache. Each line: key<TAB>hit|miss<TAB>compile<TAB>schema
+# or key<TAB>hit|miss<TAB>kind<TAB>path<TAB>match|none|ambiguous<TAB>name[<TAB>schema ...]
+# This script is salted too: it holds the runner arguments and decides which
+# validator sees which kind, so changing it must not reuse old results. So are
+# the streaming fixture validator and, through uv.lock, its jsonschema.
+cache_args=("plan" "--cache-dir" "$CACHE_DIR" "--salt" "ajv=$actual_ajv ajv-formats=$actual_formats")
+cache_args+=("--salt-file" "$AJV_RUNNER" "--salt-file" "$AJV_PACKAGE_LOCK")
+cache_args+=("--salt-file" "$ROOT_DIR/scripts/validate-contracts.sh")
+cache_args+=("--salt-file" "$ROOT_DIR/metarepo_tools/contract_validation.py")
+if [[ -f "$ROOT_DIR/uv.lock" ]]; then
+  cache_args+=("--salt-file" "$ROOT_DIR/uv.lock")
+fi
+if ((use_cache == 0)); then
+  cache_args+=("--no-cache")
+fi
+if ! plan=$(python3 -m metarepo_tools.validation_cache "${cache_args[@]}"); then
+  echo "::error::Unable to resolve examples and fixtures to their schemas"
+  exit 1
+fi
 
+# Stores the keys of validations that passed.
+record_validated() {
+  if ((use_cache == 1 && $# > 0)); then
+    python3 -m metarepo_tools.validation_cache record --cache-dir "$CACHE_DIR" "$@"
+  fi
+}
+
+if ((${#schemas[@]} > 0)); then
+  compile_hits=$'\n'
+  compile_keys=()
+  while IFS=$'\t' read -r -u 3 -a entry; do
+    ((${#entry[@]} == 4)) && [[ "${entry[2]}" == compile ]] || continue
+    if [[ "${entry[1]}" == hit ]]; then
+      compile_hits+="${entry[3]}"$'\n'
+      echo "::group::Schema ${entry[3]}"
+      echo "schema ${entry[3]} is valid (cached)"
+      echo "::endgroup::"
+    else
+      compile_keys+=("${entry[0]}")
+    fi
+  done 3<<< "$plan"
+
+  # One runner process registers every schema once and compiles the ones whose
+  # closure changed; it prints one ::group:: per compiled schema and writes one
+  # JSON line per compiled schema (sorted by path) to CONTRACT_COMPILE_RESULTS.
+  compile_results="${CONTRACT_COMPILE_RESULTS:-$TMP_DIR/schema-compile.jsonl}"
+  args=("compile-all" "--modules" "$AJV_MODULES" "--strict" "log" "--results" "$compile_results")
+  compile_targets=0
   for schema in "${schemas[@]}"; do
-    echo "::group::Schema ${schema}"
-
-    # Build a list of references excluding the current schema to avoid duplicate ID errors
-    refs=()
-    for s in "${schemas[@]}"; do
-      if [[ "$s" != "$schema" ]]; then
-        refs+=("$s")
-      fi
-    done
-
-    # Construct args array for the direct, pinned AJV runner.
-    args=("compile" "--modules" "$AJV_MODULES" "--strict" "log" "--schema" "${schema}")
-    for r in "${refs[@]}"; do
-      args+=("--ref" "$r")
-    done
-
-    if ! output=$(node "$AJV_RUNNER" "${args[@]}" 2>&1); then
-      echo "::error::Validation failed for schema: ${schema}"
-      echo "Command args: ${args[*]}"
-      echo "$output"
+    if [[ "$compile_hits" == *$'\n'"$schema"$'\n'* ]]; then
+      args+=("--ref" "$schema")
+    else
+      args+=("--schema" "$schema")
+      compile_targets=$((compile_targets + 1))
+    fi
+  done
 
-      if echo "$output" | grep -q "already exists"; then
-        echo "::notice::Hint: This error often indicates a duplicate \$id. Check the 'Check for Duplicate IDs' group output above or verify that the schema is not referencing itself via \$ref with the same ID."
-      fi
-      exit 1
+  if ((compile_targets == 0)); then
+    : > "$compile_results"
+  elif ! output=$(node "$AJV_RUNNER" "${args[@]}" 2>&1); then
+    echo "$output"
+    echo "::error::Schema compilation failed; per-schema results: ${compile_results}"
+    if echo "$output" | grep -q "already exists"; then
+      echo "::notice::Hint: This error often indicates a duplicate \$id. Check the 'Strict parse and lint contracts' group output above or verify that the schema is not referencing itself via \$ref with the same ID."
     fi
+    exit 1
+  else
     echo "$output"
-    echo "::endgroup::"
-  done
+  fi
+  record_validated "${compile_keys[@]}"
 fi
 
-# Validate examples
-if [[ "$globstar_ok" -eq 1 ]]; then
-  examples=(contracts/examples/**/*.example.json)
-else
-  examples=()
-  while IFS= read -r e; do
-    examples+=("$e")
-  done < <(find contracts/examples -type f -name "*.example.json" -print 2> /dev/null)
+# Python for the in-process tools; uv provides the locked jsonschema when present.
+python_runner=(python3)
+if command -v uv > /dev/null 2>&1; then
+  python_runner=(uv run python)
 fi
 
-if ((${#examples[@]} == 0)); then
-  echo "::notice::No examples found under contracts/examples/"
-else
-  for example in "${examples[@]}"; do
-    filename=$(basename "$example" .example.json)
-
-    # Calculate relative dir from contracts/examples
-    # e.g., contracts/examples/heim-pc/state/foo.example.json -> heim-pc/state
-    example_dir=$(dirname "$example")
-    # Using python to get relative path is robust but let's try pure bash text processing
-    # Remove prefix contracts/examples/ or contracts/examples
-    rel_dir=${example_dir#contracts/examples}
-    rel_dir=${rel_dir#/}
-
-    # Search for candidates recursively
-    candidates=()
-    if [[ "$globstar_ok" -eq 1 ]]; then
-      # Bash 4+ recursive glob
-      candidates=(contracts/**/"${filename}.schema.json")
-    else
-      # Bash 3 fallback using find
-      while IFS= read -r c; do
-        candidates+=("$c")
-      done < <(find contracts -type f -name "${filename}.schema.json" -print 2> /dev/null)
+# Runs the pinned runner for every resolved example that is not cached, and the
+# streaming validator (metarepo_tools/contract_validation.py) for every such
+# fixture: fixtures are read line by line and large ones are split across
+# workers instead of being handed to AJV whole. Records the data files that
+# passed and sets resolved_seen to 1 if there was any data file of that kind.
+validate_resolved() {
+  local wanted=$1
+  local key cached kind data status name schema s passed index streamed_status
+  local -a entry matches refs args validated streamed_args streamed_paths streamed_keys
+  resolved_seen=0
+  validated=()
+  streamed_args=()
+  streamed_paths=()
+  streamed_keys=()
+  while IFS=$'\t' read -r -u 3 -a entry; do
+    ((${#entry[@]} >= 6)) || continue
+    key=${entry[0]} cached=${entry[1]} kind=${entry[2]} data=${entry[3]} status=${entry[4]} name=${entry[5]}
+    matches=("${entry[@]:6}")
+    [[ "$kind" == "$wanted" ]] || continue
+    resolved_seen=1
+
+    if [[ "$kind" == fixture && "$status" == match && "$cached" == miss ]]; then
+      streamed_args+=("--fixture" "$data" "${matches[0]}")
+      streamed_paths+=("$data")
+      streamed_keys+=("$key")
+      continue
     fi
 
-    # Deduplicate candidates (portable)
-    unique_candidates=()
-    while IFS= read -r line; do
-      [[ -n "$line" ]] && unique_candidates+=("$line")
-    done < <(printf '%s\n' "${candidates[@]}" | sort -u)
-
-    # Filter for existing files (sanity check)
-    found=()
-    for c in "${unique_candidates[@]}"; do
-      [[ -f "$c" ]] && found+=("$c")
-    done
-
-    # Disambiguation logic
-    final_candidate=""
-    if ((${#found[@]} == 1)); then
-      final_candidate="${found[0]}"
-    elif ((${#found[@]} > 1)); then
-      # Try to match directory structure
-      matched_candidates=()
-      for c in "${found[@]}"; do
-        c_dir=$(dirname "$c")
-        # Check if c_dir ends with rel_dir
-        if [[ -z "$rel_dir" ]]; then
-          # Root examples carry no directory evidence, so every same-name
-          # schema remains a candidate and ambiguity must be handled below.
-          matched_candidates+=("$c")
-        else
-          # Check if path contains rel_dir
-          if [[ "$c_dir" == *"$rel_dir" ]]; then
-            matched_candidates+=("$c")
-          fi
-        fi
-      done
-
-      # If filtering helped, update found list
-      if ((${#matched_candidates[@]} > 0)); then
-        found=("${matched_candidates[@]}")
+    if [[ "$kind" == example ]]; then
+      if [[ "$status" == ambiguous ]]; then
+        echo "::error::Ambiguous schema match for ${data}. Found multiple candidates:"
+        printf '  - %s\n' "${matches[@]}"
+        exit 2
       fi
-
-      if ((${#found[@]} == 1)); then
-        final_candidate="${found[0]}"
-      else
-        echo "::error::Ambiguous schema match for ${example}. Found multiple candidates:"
-        printf '  - %s\n' "${found[@]}"
+      echo "::group::Validate Example ${data}"
+    else
+      echo "::group::Validate ${data}"
+      if [[ "$status" == ambiguous ]]; then
+        echo "::error::Ambiguous schema match for ${data}. Found multiple candidates:"
+        printf '  - %s\n' "${matches[@]}"
         exit 2
       fi
     fi
 
-    echo "::group::Validate Example ${example}"
-    if [[ -n "$final_candidate" ]]; then
-      schema="$final_candidate"
+    if [[ "$status" == match && "$cached" == hit ]]; then
+      echo "${data} valid (cached)"
+    elif [[ "$status" == match ]]; then
+      schema="${matches[0]}"
 
-      # Build reference args excluding current schema to be safe (though validate -s overrides -r usually)
-      # Actually for validation, we want ALL schemas as refs, including others.
-      # AJV might complain if -s and -r have same ID. Safe bet is to exclude.
+      # Register every other schema as a reference; AJV rejects the same
+      # schema passed both as --schema and as --ref.
       refs=()
       for s in "${schemas[@]}"; do
         if [[ "$s" != "$schema" ]]; then
@@ -249,85 +249,57 @@ else
         fi
       done
 
-      args=("validate" "--modules" "$AJV_MODULES" "--strict" "false" "--schema" "${schema}" "--data" "${example}")
+      args=("validate" "--modules" "$AJV_MODULES" "--strict" "false" "--schema" "${schema}" "--data" "${data}")
       for r in "${refs[@]}"; do
         args+=("--ref" "$r")
       done
 
-      node "$AJV_RUNNER" "${args[@]}"
+      node "$AJV_RUNNER" "${args[@]}" < /dev/null
+      validated+=("$key")
+    elif [[ "$kind" == example ]]; then
+      echo "::notice::No matching schema found for $data (searched contracts/**/${name}.schema.json)"
     else
-      echo "::notice::No matching schema found for $example (searched contracts/**/${filename}.schema.json)"
+      echo "::notice::No matching schema for ${data} (searched contracts/**/${name}.schema.json)"
     fi
     echo "::endgroup::"
-  done
-fi
-
-# Fixtures check: use nullglob/globstar from above
-fixtures=(fixtures/**/*.jsonl)
-if ((${#fixtures[@]} > 0)); then
-  for fixture in "${fixtures[@]}"; do
-    base="$(basename "${fixture}" .jsonl)"
-
-    # Search for candidates recursively
-    candidates=()
-    if [[ "$globstar_ok" -eq 1 ]]; then
-      # Bash 4+ recursive glob
-      candidates=(contracts/**/"${base}.schema.json")
-    else
-      # Bash 3 fallback using find
-      while IFS= read -r c; do
-        candidates+=("$c")
-      done < <(find contracts -type f -name "${base}.schema.json" -print 2> /dev/null)
-    fi
-
-    # Deduplicate candidates (portable)
-    unique_candidates=()
-    while IFS= read -r line; do
-      [[ -n "$line" ]] && unique_candidates+=("$line")
-    done < <(printf '%s\n' "${candidates[@]}" | sort -u)
-
-    # Filter for existing files
-    found=()
-    for c in "${unique_candidates[@]}"; do
-      [[ -f "$c" ]] && found+=("$c")
-    done
-
-    echo "::group::Validate ${fixture}"
-    if ((${#found[@]} == 1)); then
-      schema="${found[0]}"
-
-      # Build reference args
-      refs=()
-      for s in "${schemas[@]}"; do
-        if [[ "$s" != "$schema" ]]; then
-          refs+=("$s")
+  done 3<<< "$plan"
+
+  streamed_status=0
+  if ((${#streamed_paths[@]} > 0)); then
+    : > "$TMP_DIR/fixtures-passed.txt"
+    "${python_runner[@]}" -m metarepo_tools.contract_validation "${streamed_args[@]}" \
+      --passed "$TMP_DIR/fixtures-passed.txt" || streamed_status=$?
+    while IFS= read -r passed; do
+      for index in "${!streamed_paths[@]}"; do
+        if [[ "${streamed_paths[$index]}" == "$passed" ]]; then
+          validated+=("${streamed_keys[$index]}")
         fi
       done
+    done < "$TMP_DIR/fixtures-passed.txt"
+  fi
+  record_validated "${validated[@]}"
+  if ((streamed_status != 0)); then
+    exit "$streamed_status"
+  fi
+}
 
-      args=("validate" "--modules" "$AJV_MODULES" "--strict" "log" "--all-errors" "--schema" "${schema}" "--data" "${fixture}")
-      for r in "${refs[@]}"; do
-        args+=("--ref" "$r")
-      done
+# Validate examples
+validate_resolved example
+if ((resolved_seen == 0)); then
+  echo "::notice::No examples found under contracts/examples/"
+fi
 
-      node "$AJV_RUNNER" "${args[@]}"
-    elif ((${#found[@]} > 1)); then
-      echo "::error::Ambiguous schema match for ${fixture}. Found multiple candidates:"
-      printf '  - %s\n' "${found[@]}"
-      exit 2
-    else
-      echo "::notice::No matching schema for ${fixture} (searched contracts/**/${base}.schema.json)"
-    fi
-    echo "::endgroup::"
-  done
-else
+# Fixtures check
+validate_resolved fixture
+if ((resolved_seen == 0)); then
   echo "No fixtures found under fixtures/"
 fi
 
 # Governance registry: validate lifecycle, provenance and evidence-bound producer/consumer claims.
 echo "::group::Validate contract consumer registry"
-if command -v uv > /dev/null 2>&1; then
-  uv run python scripts/contracts/validate_consumers.py
-else
-  python3 scripts/contracts/validate_consumers.py
+consumer_args=(scripts/contracts/validate_consumers.py)
+if ((use_cache)); then
+  consumer_args+=(--cache "$CACHE_DIR/consumer-verdicts.json")
 fi
+"${python_runner[@]}" "${consumer_args[@]}"
 echo "::endgroup::"
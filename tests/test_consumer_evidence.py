@@ -0,0 +1,89 @@
+"""Guard the streaming consumer evidence loader."""
+from __future__ import annotations
+
+import json
+from pathlib import Path
+import sys
+import tracemalloc
+
+import pytest
+
+ROOT = Path(__file__).resolve().parents[1]
+VALIDATOR_DIR = ROOT / "scripts" / "contracts"
+if str(VALIDATOR_DIR) not in sys.path:
+    sys.path.insert(0, str(VALIDATOR_DIR))
+
+from consumer_evidence import EvidenceClaim, EvidenceContract, load_evidence  # noqa: E402
+
+EVIDENCE = ROOT / "contracts" / "consumer-evidence.v1.json"
+
+
+def test_streamed_records_match_the_whole_document() -> None:
+    expected = json.loads(EVIDENCE.read_text(encoding="utf-8"))
+
+    loaded = load_evidence(EVIDENCE, chunk=61)
+
+    assert {key: value for key, value in loaded.items() if key not in ("claims", "contracts")} == {
+        key: value for key, value in expected.items() if key not in ("claims", "contracts")
+    }
+    assert all(isinstance(item, EvidenceContract) for item in loaded["contracts"])
+    assert [item.to_json() for item in loaded["contracts"]] == [
+        {key: item.get(key) for key in EvidenceContract.KEYS} for item in expected["contracts"]
+    ]
+    assert [item.to_json() for item in loaded["claims"]] == [
+        {key: item.get(key) for key in EvidenceClaim.KEYS} for item in expected["claims"]
+    ]
+    first, second = [
+        claim for claim in loaded["claims"] if claim["repository"] == "heimgewebe/aussensensor"
+    ][:2]
+    assert first.repository is second.repository
+    assert first.commit is second.commit
+
+
+@pytest.mark.parametrize(
+    "text",
+    [
+        '{"claims": [{"id": "a"}, {"id" "b"}]}',
+        '\n{"contracts": [\n  {"id": "x"},\n]}',
+        '{"claims": [1, 2]} []',
+        '{"observedAt": "2026-01-01T00:00:00+00:00",}',
+        '{"claims": [{"id": "a\nb"}]}',
+    ],
+)
+def test_syntax_errors_are_reported_like_json_loads(tmp_path: Path, text: str) -> None:
+    path = tmp_path / "evidence.json"
+    path.write_text(text, encoding="utf-8")
+    with pytest.raises(ValueError) as expected:
+        json.loads(text)
+
+    for chunk in (1, 4, 1 << 16):
+        with pytest.raises(ValueError) as streamed:
+            load_evidence(path, chunk=chunk)
+        assert str(streamed.value) == str(expected.value)
+
+
+def test_peak_memory_follows_claims_not_text_size(tmp_path: Path) -> None:
+    path = tmp_path / "evidence.json"
+    note = "x" * 20_000
+    claims = [
+        {
+            "id": f"c/{index}::consumer::repo{index % 5}",
+            "repository": f"heimgewebe/repo{index % 5}",
+            "note": note,
+            "evidence": [{"path": "README.md", "line": 1, "kind": "doc"}],
+        }
+        for index in range(500)
+    ]
+    path.write_text(json.dumps({"claims": claims, "contracts": [3]}), encoding="utf-8")
+    size = path.stat().st_size
+
+    tracemalloc.start()
+    try:
+        loaded = load_evidence(path)
+        _current, peak = tracemalloc.get_traced_memory()
+    finally:
+        tracemalloc.stop()
+
+    assert len(loaded["claims"]) == 500
+    assert loaded["contracts"] == [3]
+    assert peak < size / 10
@@ -15,7 +15,14 @@ VALIDATOR_DIR = ROOT / "scripts" / "contracts"
 if str(VALIDATOR_DIR) not in sys.path:
     sys.path.insert(0, str(VALIDATOR_DIR))
 
-from validate_consumers import RegistryError, validate_registry  # noqa: E402
+import validate_consumers  # noqa: E402
+from validate_consumers import (  # noqa: E402
+    RegistryError,
+    VerdictCache,
+    check_registry,
+    main,
+    validate_registry,
+)
 
 
 def _fixture_root(directory: str) -> Path:
@@ -62,6 +69,40 @@ def test_current_registry_is_valid_and_evidence_bound() -> None:
     assert summary == {"contracts": 23, "claims": 58, "repositories": 11}
 
 
+def test_checked_registry_exposes_the_evidence_it_was_bound_to() -> None:
+    evidence = _load_evidence(ROOT)
+
+    validated = check_registry(ROOT)
+
+    assert validated.summary == validate_registry(ROOT)
+    assert validated.repository_heads == {
+        item["repository"]: item["commit"] for item in evidence["scope"]["repositories"]
+    }
+    assert [claim["id"] for claim in validated.claims] == [
+        claim["id"] for claim in evidence["claims"]
+    ]
+
+
+def test_checkouts_reuse_the_validated_evidence(
+    tmp_path: Path, monkeypatch: pytest.MonkeyPatch, capsys: pytest.CaptureFixture[str]
+) -> None:
+    loads: list[Path] = []
+    load_evidence = validate_consumers.load_evidence
+
+    def counting_load(path: Path) -> dict[str, object]:
+        loads.append(path)
+        return load_evidence(path)
+
+    monkeypatch.setattr(validate_consumers, "load_evidence", counting_load)
+
+    assert main(["--checkouts", str(tmp_path), "--jobs", "1"]) == 0
+
+    assert len(loads) == 1
+    output = json.loads(capsys.readouterr().out)
+    assert output["checkouts"]["verified"] == 0
+    assert len(output["checkouts"]["skipped"]) == output["repositories"]
+
+
 def test_active_contract_with_missing_schema_fails_closed() -> None:
     with tempfile.TemporaryDirectory() as directory:
         root = _fixture_root(directory)
@@ -174,3 +215,45 @@ def test_evidence_must_cover_every_declared_repository() -> None:
         with pytest.raises(RegistryError, match="must cover every declared repository"):
             validate_registry(root)
 
+
+def test_verdict_cache_rechecks_only_changed_entries() -> None:
+    with tempfile.TemporaryDirectory() as directory:
+        root = _fixture_root(directory)
+        cache_path = Path(directory) / "verdicts.json"
+        cold = VerdictCache(cache_path)
+        summary = validate_registry(root, cold)
+        cold.store()
+        assert (cold.hits, cold.misses) == (0, 23 + 58)
+
+        warm = VerdictCache(cache_path)
+        assert validate_registry(root, warm) == summary
+        warm.store()
+        assert (warm.hits, warm.misses) == (23 + 58, 0)
+
+        evidence = _load_evidence(root)
+        heads = evidence["scope"]["repositories"]
+        head = next(item for item in heads if item["repository"] == "heimgewebe/semantAH")
+        head["commit"] = "0" * 40
+        _write_evidence(root, evidence)
+        with pytest.raises(RegistryError) as uncached:
+            validate_registry(root)
+        changed = VerdictCache(cache_path)
+        with pytest.raises(RegistryError) as cached:
+            validate_registry(root, changed)
+        assert str(cached.value) == str(uncached.value)
+        assert "::semantAH is not bound to scope commit" in str(cached.value)
+        assert changed.misses == 1
+
+
+def test_verdict_cache_keys_claims_by_schema_digest() -> None:
+    with tempfile.TemporaryDirectory() as directory:
+        root = _fixture_root(directory)
+        cache_path = Path(directory) / "verdicts.json"
+        cache = VerdictCache(cache_path)
+        validate_registry(root, cache)
+        cache.store()
+
+        schema = root / "contracts/aussen.event.schema.json"
+        schema.write_text(schema.read_text(encoding="utf-8") + "\n", encoding="utf-8")
+        with pytest.raises(RegistryError, match="contract evidence event_backbone/aussen.event"):
+            validate_registry(root, VerdictCache(cache_path))
@@ -327,10 +327,11 @@ def test_non_string_ref_fails_closed(tmp_path):
         ),
     ],
 )
-def test_verify_rejects_every_cache_divergence(tmp_path, mutate, code):
+@pytest.mark.parametrize("emit_extra", [(), ("--stat-index",)])
+def test_verify_rejects_every_cache_divergence(tmp_path, mutate, code, emit_extra):
     repo = _source_repo(tmp_path)
     out_dir = tmp_path / "cache"
-    _emit(repo, out_dir, "--source-kind", "offline_cache")
+    _emit(repo, out_dir, "--source-kind", "offline_cache", *emit_extra)
 
     mutate(out_dir)
 
@@ -749,3 +750,1507 @@ def test_cli_entry_point_reports_typed_failures_without_traceback(tmp_path, caps
 
     assert exit_code == 2
     assert capsys.readouterr().err.startswith("SOURCE_DIRTY: ")
+
+
+@pytest.mark.parametrize(("object_reader", "channels"), [("git", 2), ("auto", 0)])
+def test_object_reads_share_one_git_channel_regardless_of_schema_count(
+    tmp_path, monkeypatch, object_reader, channels
+):
+    import emit_source_manifest
+
+    repo = _source_repo(tmp_path)
+    for index in range(40):
+        _write_schema(
+            repo,
+            f"contracts/heim-pc/generated/s{index:02d}.schema.json",
+            {"$ref": f"s{(index + 1) % 40:02d}.schema.json"},
+        )
+    _git(repo, "add", "-A")
+    _git(repo, "commit", "-m", "add generated schemas")
+
+    launched: list[list[str]] = []
+    real_popen = subprocess.Popen
+
+    def counting_popen(args, *rest, **kwargs):
+        launched.append(list(args))
+        return real_popen(args, *rest, **kwargs)
+
+    monkeypatch.setattr(emit_source_manifest.subprocess, "Popen", counting_popen)
+    manifest = _emit(repo, tmp_path / "out", "--object-reader", object_reader)
+
+    assert len(manifest["schemas"]) == 42
+    # resolve_source keeps its own provenance channel; everything else is one.
+    # The in-process reader needs no channel at all.
+    assert sum("cat-file" in args for args in launched) == channels
+    assert len(launched) < 10
+
+
+def test_parse_cache_replays_verdicts_and_skips_unchanged_blobs(tmp_path, monkeypatch):
+    import emit_source_manifest
+
+    repo = _source_repo(tmp_path)
+    _write_schema(repo, "contracts/other/unrelated.schema.json", {"type": "string"})
+    _git(repo, "add", "-A")
+    _git(repo, "commit", "-m", "add unrelated schema")
+    cache_dir = tmp_path / "parse-cache"
+
+    first = _emit(repo, tmp_path / "first", "--parse-cache", str(cache_dir))
+    assert list(cache_dir.glob("v1/*/*.json"))
+
+    inspected: list[str] = []
+    real_inspect = emit_source_manifest._inspect_schema
+
+    def counting_inspect(relative, data):
+        inspected.append(relative)
+        return real_inspect(relative, data)
+
+    monkeypatch.setattr(emit_source_manifest, "_inspect_schema", counting_inspect)
+    second = _emit(repo, tmp_path / "second", "--parse-cache", str(cache_dir))
+    assert second == first
+    assert inspected == []
+
+    (repo / ZONES_SCHEMA).write_text('{"type": "object", "type": "array"}\n', encoding="utf-8")
+    _git(repo, "commit", "-am", "introduce a duplicate key")
+    for attempt in range(2):
+        with pytest.raises(ManifestError) as excinfo:
+            _emit(repo, tmp_path / f"dup-{attempt}", "--parse-cache", str(cache_dir))
+        assert excinfo.value.code == "SCHEMA_JSON_INVALID"
+        assert "duplicate object key 'type'" in excinfo.value.detail
+    # Only the changed blob was inspected, and only on the cold run.
+    assert inspected == [ZONES_SCHEMA]
+
+
+def test_parse_cache_ignores_corrupt_entries_and_stays_within_budget(tmp_path):
+    repo = _source_repo(tmp_path)
+    cache_dir = tmp_path / "parse-cache"
+    expected = _emit(repo, tmp_path / "cold", "--parse-cache", str(cache_dir))
+    for entry in cache_dir.glob("v1/*/*.json"):
+        entry.write_text('{"format": 1, "resources": "truncated', encoding="utf-8")
+
+    assert _emit(repo, tmp_path / "warm", "--parse-cache", str(cache_dir)) == expected
+
+    _emit(
+        repo,
+        tmp_path / "bounded",
+        "--parse-cache",
+        str(cache_dir),
+        "--parse-cache-max-bytes",
+        "0",
+    )
+    assert not list(cache_dir.glob("v1/*/*.json"))
+
+
+def test_bulk_targets_share_one_index_and_match_single_target_bytes(
+    tmp_path, monkeypatch, capsys
+):
+    import emit_source_manifest
+
+    repo = _source_repo(tmp_path)
+    _write_schema(repo, BASE_EVENT_SCHEMA, {"type": "object"})
+    _write_schema(repo, CHRONIK_SCHEMA, {"$ref": "../events/base.event.schema.json"})
+    _git(repo, "add", "-A")
+    _git(repo, "commit", "-m", "add chronik consumer")
+
+    singles = {}
+    for name, consumers in (("heim-pc", ["heim-pc"]), ("both", ["heim-pc", "chronik"])):
+        out_dir = tmp_path / "single" / name
+        argv = ["--source", str(repo), "--out-dir", str(out_dir)]
+        for consumer in consumers:
+            argv += ["--consumer", consumer]
+        assert run(argv) == 0
+        singles[name] = out_dir
+    capsys.readouterr()
+
+    builds = []
+    real_index = emit_source_manifest._schema_identifier_index
+
+    def counting_index(*args, **kwargs):
+        builds.append(args)
+        return real_index(*args, **kwargs)
+
+    monkeypatch.setattr(emit_source_manifest, "_schema_identifier_index", counting_index)
+    bulk = tmp_path / "bulk"
+    assert (
+        run(
+            [
+                "--source",
+                str(repo),
+                "--target",
+                f"heim-pc={bulk / 'heim-pc'}",
+                "--target",
+                f"heim-pc,chronik={bulk / 'both'}",
+            ]
+        )
+        == 0
+    )
+
+    assert len(builds) == 1
+    stdout = capsys.readouterr().out
+    expected_stdout = ""
+    for name, single in singles.items():
+        manifest_bytes = (single / MANIFEST_NAME).read_bytes()
+        assert (bulk / name / MANIFEST_NAME).read_bytes() == manifest_bytes
+        expected_stdout += manifest_bytes.decode("utf-8")
+        for cached in (single / "content").rglob("*.json"):
+            relative = cached.relative_to(single)
+            assert (bulk / name / relative).read_bytes() == cached.read_bytes()
+    assert stdout == expected_stdout
+
+    with pytest.raises(ManifestError) as excinfo:
+        run(
+            [
+                "--source",
+                str(repo),
+                "--target",
+                f"heim-pc={bulk / 'same'}",
+                "--target",
+                f"chronik={bulk / 'same'}",
+            ]
+        )
+    assert excinfo.value.code == "OUT_DIR_INVALID"
+    assert not (bulk / "same" / MANIFEST_NAME).exists()
+    with pytest.raises(SystemExit):
+        run(["--source", str(repo), "--target", "heim-pc", "--consumer", "chronik"])
+
+
+def test_stat_index_lets_verify_skip_unchanged_files_but_not_rewrites(
+    tmp_path, monkeypatch
+):
+    import os
+
+    import emit_source_manifest
+
+    repo = _source_repo(tmp_path)
+    out_dir = tmp_path / "cache"
+    _emit(repo, out_dir, "--source-kind", "offline_cache", "--stat-index")
+    verify = [
+        "--source",
+        str(repo),
+        "--out-dir",
+        str(out_dir),
+        "--consumer",
+        "heim-pc",
+        "--source-kind",
+        "offline_cache",
+    ]
+
+    reads: list[Path] = []
+    real_read = emit_source_manifest._read_bytes
+
+    def counting_read(path, code, detail):
+        reads.append(path)
+        return real_read(path, code, detail)
+
+    monkeypatch.setattr(emit_source_manifest, "_read_bytes", counting_read)
+    monkeypatch.setattr(
+        emit_source_manifest,
+        "_present_cache_files",
+        lambda content_dir: pytest.fail("unchanged directories must not be walked"),
+    )
+    assert run([*verify, "--verify"]) == 0
+    assert reads == [out_dir / MANIFEST_NAME]
+
+    compared: list[Path] = []
+    real_match = emit_source_manifest._cached_bytes_match
+
+    def counting_match(path, data):
+        compared.append(path)
+        return real_match(path, data)
+
+    monkeypatch.setattr(emit_source_manifest, "_cached_bytes_match", counting_match)
+    assert run([*verify, "--verify"]) == 0
+    assert compared == []
+
+    monkeypatch.undo()
+    monkeypatch.setattr(emit_source_manifest, "_cached_bytes_match", counting_match)
+    assert run([*verify, "--verify=full"]) == 0
+    assert len(compared) == 2
+
+    # Same size, restored mtime: the ctime still exposes the in-place rewrite.
+    cached = out_dir / "content" / ZONES_SCHEMA
+    before = cached.stat()
+    original = cached.read_bytes()
+    cached.write_bytes(original.replace(b"object", b"OBJECT"))
+    os.utime(cached, ns=(before.st_atime_ns, before.st_mtime_ns))
+    with pytest.raises(ManifestError) as excinfo:
+        run([*verify, "--verify"])
+    assert excinfo.value.code == "CONTENT_DRIFT"
+
+    # The sidecar is replaced atomically like every other sidecar.
+    replaced: list[Path] = []
+    real_write = emit_source_manifest._atomic_write
+
+    def recording_write(target, data):
+        replaced.append(target)
+        real_write(target, data)
+
+    monkeypatch.setattr(emit_source_manifest, "_atomic_write", recording_write)
+    _emit(repo, out_dir, "--source-kind", "offline_cache", "--stat-index", "--overwrite")
+    assert out_dir / emit_source_manifest.STAT_INDEX_NAME in replaced
+    monkeypatch.undo()
+
+    # A fresh emission without --stat-index drops the stale sidecar.
+    _emit(repo, out_dir, "--source-kind", "offline_cache", "--overwrite")
+    assert not (out_dir / emit_source_manifest.STAT_INDEX_NAME).exists()
+
+
+def test_parallel_hashing_is_deterministic_and_reports_the_first_drift(
+    tmp_path, monkeypatch
+):
+    import emit_source_manifest
+
+    repo = _source_repo(tmp_path)
+    for index in range(24):
+        _write_schema(
+            repo,
+            f"contracts/heim-pc/bulk/s{index:02d}.schema.json",
+            {"title": "x" * (index * 97)},
+        )
+    _git(repo, "add", "-A")
+    _git(repo, "commit", "-m", "add bulk schemas")
+
+    serial = _emit(repo, tmp_path / "serial")
+    monkeypatch.setattr(emit_source_manifest, "HASH_WORKERS", 4)
+    monkeypatch.setattr(emit_source_manifest, "PARALLEL_HASH_MIN_BYTES", 0)
+    out_dir = tmp_path / "parallel"
+    assert _emit(repo, out_dir) == serial
+    assert (out_dir / MANIFEST_NAME).read_bytes() == (
+        tmp_path / "serial" / MANIFEST_NAME
+    ).read_bytes()
+
+    for index in (20, 5):
+        target = out_dir / "content/contracts/heim-pc/bulk" / f"s{index:02d}.schema.json"
+        target.write_bytes(target.read_bytes().replace(b'"x', b'"y'))
+    (out_dir / "content/contracts/heim-pc/bulk/s09.schema.json").unlink()
+    with pytest.raises(ManifestError) as excinfo:
+        run(
+            [
+                "--source",
+                str(repo),
+                "--out-dir",
+                str(out_dir),
+                "--consumer",
+                "heim-pc",
+                "--verify=full",
+            ]
+        )
+    assert excinfo.value.code == "CONTENT_DRIFT"
+    assert excinfo.value.detail.endswith("bulk/s05.schema.json")
+
+
+def test_overwrite_reconciles_only_changed_and_unbound_cache_nodes(tmp_path, capsys):
+    repo = _source_repo(tmp_path)
+    out_dir = tmp_path / "cache"
+    _emit(repo, out_dir)
+    content = out_dir / "content"
+    drift_inode = (content / DRIFT_SCHEMA).stat().st_ino
+
+    _write_schema(repo, ZONES_SCHEMA, {"title": "zones v2", "type": "object"})
+    _git(repo, "commit", "-am", "change zones")
+    (content / "contracts/heim-pc/stale.schema.json").write_text("{}\n", encoding="utf-8")
+    (content / "orphan").mkdir()
+    (content / "orphan/nested.json").write_text("{}\n", encoding="utf-8")
+    outside = tmp_path / "outside.json"
+    outside.write_text("keep me\n", encoding="utf-8")
+    (content / "contracts/link.json").symlink_to(outside)
+    capsys.readouterr()
+
+    manifest = _emit(repo, out_dir, "--overwrite")
+
+    assert capsys.readouterr().err == (
+        f"materialized {content.resolve()}: 1 written, 3 removed, 1 unchanged\n"
+    )
+    assert (content / DRIFT_SCHEMA).stat().st_ino == drift_inode
+    assert (content / ZONES_SCHEMA).read_bytes() == (repo / ZONES_SCHEMA).read_bytes()
+    assert not (content / "orphan").exists()
+    assert not (content / "contracts/link.json").is_symlink()
+    assert outside.read_text(encoding="utf-8") == "keep me\n"
+    assert sorted(
+        path.relative_to(content).as_posix() for path in content.rglob("*") if path.is_file()
+    ) == sorted(manifest["schemas"])
+    assert not list(out_dir.rglob("*.tmp"))
+
+
+def _archive(repo: Path, destination: Path, archive_format: str) -> bytes:
+    assert (
+        run(
+            [
+                "--source",
+                str(repo),
+                "--archive",
+                str(destination),
+                "--archive-format",
+                archive_format,
+                "--source-kind",
+                "detached_archive",
+                "--consumer",
+                "heim-pc",
+            ]
+        )
+        == 0
+    )
+    return destination.read_bytes()
+
+
+def _verify_archive(repo: Path, archive: Path) -> None:
+    run(
+        [
+            "--source",
+            str(repo),
+            "--verify-archive",
+            str(archive),
+            "--source-kind",
+            "detached_archive",
+            "--consumer",
+            "heim-pc",
+        ]
+    )
+
+
+@pytest.mark.parametrize("archive_format", ["tar", "zip"])
+def test_archive_output_is_byte_deterministic_and_verifies_in_place(
+    tmp_path, capsys, archive_format
+):
+    repo = _source_repo(tmp_path)
+    first = _archive(repo, tmp_path / f"first.{archive_format}", archive_format)
+    manifest_out = capsys.readouterr().out
+    second = _archive(repo, tmp_path / f"second.{archive_format}", archive_format)
+    assert first == second
+    assert capsys.readouterr().out == manifest_out
+    assert json.loads(manifest_out)["source_kind"] == "detached_archive"
+
+    _verify_archive(repo, tmp_path / f"first.{archive_format}")
+    assert capsys.readouterr().out == manifest_out
+
+    if archive_format == "tar":
+        import tarfile
+
+        with tarfile.open(tmp_path / "first.tar") as archive:
+            members = archive.getmembers()
+        assert {member.mtime for member in members} == {315532800}
+        assert {(member.uid, member.gid) for member in members} == {(0, 0)}
+        assert [member.name for member in members] == sorted(member.name for member in members)
+    else:
+        import zipfile
+
+        with zipfile.ZipFile(tmp_path / "first.zip") as archive:
+            assert {info.compress_type for info in archive.infolist()} == {zipfile.ZIP_STORED}
+            assert archive.read(f"content/{ZONES_SCHEMA}") == (repo / ZONES_SCHEMA).read_bytes()
+            assert json.loads(archive.read(MANIFEST_NAME)) == json.loads(manifest_out)
+
+
+def _tar_with(tmp_path: Path, repo: Path, mutate) -> Path:
+    import io
+    import tarfile
+
+    pristine = tmp_path / "pristine.tar"
+    if not pristine.exists():
+        _archive(repo, pristine, "tar")
+    rebuilt = tmp_path / "rebuilt.tar"
+    with tarfile.open(pristine) as source, tarfile.open(rebuilt, "w") as target:
+        for member in source.getmembers():
+            data = source.extractfile(member).read() if member.isreg() else None
+            replacement = mutate(member, data)
+            if replacement is None:
+                continue
+            member, data = replacement
+            if data is not None:
+                member.size = len(data)
+            target.addfile(member, io.BytesIO(data) if data is not None else None)
+        extra = mutate(None, None)
+        if extra is not None:
+            member, data = extra
+            target.addfile(member, io.BytesIO(data) if data is not None else None)
+    return rebuilt
+
+
+def _drift_zones(member, data):
+    if member is not None and member.name == f"content/{ZONES_SCHEMA}":
+        return member, data + b" "
+    return None if member is None else (member, data)
+
+
+def _drop_zones(member, data):
+    if member is not None and member.name == f"content/{ZONES_SCHEMA}":
+        return None
+    return None if member is None else (member, data)
+
+
+def _add_unbound(member, data):
+    import tarfile
+
+    if member is None:
+        extra = tarfile.TarInfo("content/contracts/heim-pc/extra.schema.json")
+        return extra, b"{}\n"
+    return member, data
+
+
+def _add_symlink(member, data):
+    import tarfile
+
+    if member is None:
+        link = tarfile.TarInfo("content/contracts/heim-pc/link.schema.json")
+        link.type = tarfile.SYMTYPE
+        link.linkname = "/etc/passwd"
+        return link, None
+    return member, data
+
+
+def _escape_root(member, data):
+    import tarfile
+
+    if member is None:
+        return tarfile.TarInfo("content/../escape.json"), b"{}\n"
+    return member, data
+
+
+@pytest.mark.parametrize(
+    ("mutate", "code"),
+    [
+        (_drift_zones, "CONTENT_DRIFT"),
+        (_drop_zones, "CONTENT_MISSING"),
+        (_add_unbound, "CONTENT_UNBOUND"),
+        (_add_symlink, "ARCHIVE_INVALID_MEMBER"),
+        (_escape_root, "ARCHIVE_INVALID_MEMBER"),
+    ],
+)
+def test_verify_archive_rejects_every_divergence_without_extracting(
+    tmp_path, mutate, code
+):
+    repo = _source_repo(tmp_path)
+    archive = _tar_with(tmp_path, repo, mutate)
+    before = sorted(path.name for path in tmp_path.iterdir())
+    with pytest.raises(ManifestError) as excinfo:
+        _verify_archive(repo, archive)
+    assert excinfo.value.code == code
+    assert sorted(path.name for path in tmp_path.iterdir()) == before
+
+
+def test_archive_output_requires_detached_archive_and_a_clean_destination(tmp_path):
+    repo = _source_repo(tmp_path)
+    with pytest.raises(ManifestError) as excinfo:
+        run(
+            [
+                "--source",
+                str(repo),
+                "--archive",
+                str(tmp_path / "a.tar"),
+                "--source-kind",
+                "offline_cache",
+                "--consumer",
+                "heim-pc",
+            ]
+        )
+    assert excinfo.value.code == "SOURCE_KIND_INVALID"
+    with pytest.raises(ManifestError) as excinfo:
+        _archive(repo, repo / "inside.tar", "tar")
+    assert excinfo.value.code == "OUT_DIR_INSIDE_SOURCE"
+    with pytest.raises(SystemExit):
+        run(
+            [
+                "--source",
+                str(repo),
+                "--archive",
+                str(tmp_path / "a.tar"),
+                "--out-dir",
+                str(tmp_path / "cache"),
+                "--source-kind",
+                "detached_archive",
+                "--consumer",
+                "heim-pc",
+            ]
+        )
+
+
+def test_standalone_script_finds_the_object_reader_of_its_checkout(tmp_path):
+    probe = (
+        "import sys; sys.path.insert(0, sys.argv[1]); import emit_source_manifest as m; "
+        "print(m.git_objects is not None and hasattr(m.git_objects, 'open_object_store'))"
+    )
+    result = subprocess.run(
+        [sys.executable, "-I", "-c", probe, str(PRODUCER_DIR)],
+        cwd=tmp_path,
+        check=True,
+        text=True,
+        capture_output=True,
+    )
+    assert result.stdout.strip() == "True"
+
+
+def test_in_process_object_reader_matches_cat_file_and_falls_back(tmp_path, monkeypatch):
+    import emit_source_manifest
+
+    repo = _source_repo(tmp_path)
+    _write_schema(repo, ZONES_SCHEMA, {"title": "zones v2", "type": "object"})
+    _git(repo, "commit", "-am", "delta against the seed")
+    _git(repo, "repack", "-adq")
+    reference = _emit(repo, tmp_path / "git", "--object-reader", "git")
+    packed = _emit(repo, tmp_path / "auto")
+    assert packed == reference
+    assert (tmp_path / "auto" / "content" / ZONES_SCHEMA).read_bytes() == (
+        tmp_path / "git" / "content" / ZONES_SCHEMA
+    ).read_bytes()
+
+    launched: list[list[str]] = []
+    real_popen = subprocess.Popen
+
+    def counting_popen(args, *rest, **kwargs):
+        launched.append(list(args))
+        return real_popen(args, *rest, **kwargs)
+
+    monkeypatch.setattr(emit_source_manifest.subprocess, "Popen", counting_popen)
+    alternates = repo / ".git/objects/info/alternates"
+    alternates.parent.mkdir(parents=True, exist_ok=True)
+    alternates.write_text(str(tmp_path / "elsewhere") + "\n", encoding="utf-8")
+    assert _emit(repo, tmp_path / "fallback") == reference
+    assert sum("cat-file" in args for args in launched) == 2
+
+
+def _delta(repo: Path, out_dir: Path, base: str, *extra: str) -> dict:
+    assert (
+        run(
+            [
+                "--source",
+                str(repo),
+                "--out-dir",
+                str(out_dir),
+                "--consumer",
+                "heim-pc",
+                "--source-kind",
+                "offline_cache",
+                "--delta-from",
+                base,
+                *extra,
+            ]
+        )
+        == 0
+    )
+    return json.loads((out_dir / "metarepo-contract-source.v1.delta.json").read_text("utf-8"))
+
+
+def _apply(delta_dir: Path, cache_dir: Path, *extra: str) -> int:
+    from apply_source_delta import run as apply_run
+
+    return apply_run(["--delta", str(delta_dir), "--cache", str(cache_dir), *extra])
+
+
+def _advance(repo: Path) -> None:
+    _write_schema(repo, ZONES_SCHEMA, {"title": "zones v2", "type": "object"})
+    _git(repo, "rm", "-q", DRIFT_SCHEMA)
+    _write_schema(
+        repo,
+        "contracts/heim-pc/config/added.schema.json",
+        {"$ref": "../shared/common.schema.json"},
+    )
+    _write_schema(repo, "contracts/heim-pc/shared/common.schema.json", {"type": "string"})
+    _git(repo, "add", "-A")
+    _git(repo, "commit", "-m", "advance heim-pc")
+
+
+def test_delta_carries_only_changed_bytes_and_upgrades_a_cache_in_place(tmp_path, capsys):
+    repo = _source_repo(tmp_path)
+    base = _git(repo, "rev-parse", "HEAD")
+    cache = tmp_path / "cache"
+    _emit(repo, cache, "--source-kind", "offline_cache")
+    zones_inode = (cache / "content" / ZONES_SCHEMA).stat().st_ino
+    _advance(repo)
+
+    delta = _delta(repo, tmp_path / "delta", base)
+    full = _emit(repo, tmp_path / "full", "--source-kind", "offline_cache")
+    schema = json.loads(
+        (ROOT / "contracts/contract.source.delta.schema.json").read_text(encoding="utf-8")
+    )
+    Draft202012Validator.check_schema(schema)
+    Draft202012Validator(schema).validate(delta)
+    assert delta["base_commit"] == base
+    assert delta["commit"] == full["commit"]
+    assert delta["removed"] == [DRIFT_SCHEMA]
+    assert sorted(delta["changed"]) == [
+        "contracts/heim-pc/config/added.schema.json",
+        ZONES_SCHEMA,
+        "contracts/heim-pc/shared/common.schema.json",
+    ]
+    assert (tmp_path / "delta" / MANIFEST_NAME).read_bytes() == (
+        tmp_path / "full" / MANIFEST_NAME
+    ).read_bytes()
+    assert sorted(
+        path.relative_to(tmp_path / "delta" / "content").as_posix()
+        for path in (tmp_path / "delta" / "content").rglob("*")
+        if path.is_file()
+    ) == sorted(delta["changed"])
+
+    assert _apply(tmp_path / "delta", cache, "--check") == 0
+    assert (cache / MANIFEST_NAME).read_bytes() != (tmp_path / "full" / MANIFEST_NAME).read_bytes()
+    capsys.readouterr()
+    assert _apply(tmp_path / "delta", cache) == 0
+    captured = capsys.readouterr()
+    assert captured.out == (tmp_path / "full" / MANIFEST_NAME).read_text(encoding="utf-8")
+    assert captured.err.endswith(": 3 written, 1 removed, 0 unchanged\n")
+    assert (cache / "content" / ZONES_SCHEMA).stat().st_ino != zones_inode
+    run(
+        [
+            "--source",
+            str(repo),
+            "--out-dir",
+            str(cache),
+            "--consumer",
+            "heim-pc",
+            "--source-kind",
+            "offline_cache",
+            "--verify=full",
+        ]
+    )
+
+
+def test_delta_reuses_facts_for_blobs_both_commits_share(tmp_path, monkeypatch):
+    import emit_source_manifest
+
+    repo = _source_repo(tmp_path)
+    for index in range(20):
+        _write_schema(repo, f"contracts/other/s{index:02d}.schema.json", {"type": "string"})
+    _git(repo, "add", "-A")
+    _git(repo, "commit", "-m", "unrelated schemas")
+    base = _git(repo, "rev-parse", "HEAD")
+    _write_schema(repo, ZONES_SCHEMA, {"title": "zones v2", "type": "object"})
+    _git(repo, "commit", "-am", "change zones")
+
+    inspected: list[str] = []
+    real_inspect = emit_source_manifest._inspect_schema
+
+    def counting_inspect(relative, data):
+        inspected.append(relative)
+        return real_inspect(relative, data)
+
+    monkeypatch.setattr(emit_source_manifest, "_inspect_schema", counting_inspect)
+    delta = _delta(repo, tmp_path / "delta", base)
+    committed = 23
+    # Every schema of the new tree once, then only the base version of zones.
+    assert len(inspected) == committed + 1
+    assert inspected[-1] == ZONES_SCHEMA
+    assert list(delta["changed"]) == [ZONES_SCHEMA]
+    assert delta["removed"] == []
+
+
+def _corrupt_delta_bytes(delta_dir: Path, _cache: Path) -> None:
+    (delta_dir / "content" / ZONES_SCHEMA).write_text("{}\n", encoding="utf-8")
+
+
+def _extra_delta_file(delta_dir: Path, _cache: Path) -> None:
+    (delta_dir / "content/contracts/heim-pc/extra.schema.json").write_text("{}\n", "utf-8")
+
+
+def _forge_delta_digest(delta_dir: Path, _cache: Path) -> None:
+    path = delta_dir / "metarepo-contract-source.v1.delta.json"
+    delta = json.loads(path.read_text(encoding="utf-8"))
+    delta["removed"] = []
+    path.write_text(json.dumps(delta), encoding="utf-8")
+
+
+def _swap_delta_manifest(delta_dir: Path, cache: Path) -> None:
+    shutil.copyfile(cache / MANIFEST_NAME, delta_dir / MANIFEST_NAME)
+
+
+def _advance_cache(_delta_dir: Path, cache: Path) -> None:
+    path = cache / MANIFEST_NAME
+    manifest = json.loads(path.read_text(encoding="utf-8"))
+    manifest["commit"] = "0" * 40
+    path.write_text(json.dumps(manifest), encoding="utf-8")
+
+
+def _lose_carried_file(_delta_dir: Path, cache: Path) -> None:
+    manifest = json.loads((cache / MANIFEST_NAME).read_text(encoding="utf-8"))
+    for relative in manifest["schemas"]:
+        if relative != ZONES_SCHEMA and relative != DRIFT_SCHEMA:
+            (cache / "content" / relative).unlink()
+
+
+def _tamper_carried_file(_delta_dir: Path, cache: Path) -> None:
+    (cache / "content" / "contracts/heim-pc/config/kept.schema.json").write_text(
+        '{"type": "string"}\n', encoding="utf-8"
+    )
+
+
+@pytest.mark.parametrize(
+    ("mutate", "code"),
+    [
+        (_corrupt_delta_bytes, "CONTENT_DRIFT"),
+        (_extra_delta_file, "CONTENT_UNBOUND"),
+        (_forge_delta_digest, "DELTA_INCONSISTENT"),
+        (_swap_delta_manifest, "DELTA_INCONSISTENT"),
+        (_advance_cache, "DELTA_BASE_MISMATCH"),
+        (_lose_carried_file, "CONTENT_MISSING"),
+        (_tamper_carried_file, "CONTENT_DRIFT"),
+    ],
+)
+def test_apply_delta_checks_everything_before_touching_the_cache(tmp_path, mutate, code):
+    repo = _source_repo(tmp_path)
+    _write_schema(repo, "contracts/heim-pc/config/kept.schema.json", {"type": "object"})
+    _git(repo, "add", "-A")
+    _git(repo, "commit", "-m", "kept schema")
+    base = _git(repo, "rev-parse", "HEAD")
+    cache = tmp_path / "cache"
+    _emit(repo, cache, "--source-kind", "offline_cache")
+    _advance(repo)
+    _delta(repo, tmp_path / "delta", base)
+    mutate(tmp_path / "delta", cache)
+    before = {
+        path.relative_to(cache).as_posix(): path.read_bytes()
+        for path in cache.rglob("*")
+        if path.is_file()
+    }
+
+    with pytest.raises(ManifestError) as excinfo:
+        _apply(tmp_path / "delta", cache)
+    assert excinfo.value.code == code
+    assert {
+        path.relative_to(cache).as_posix(): path.read_bytes()
+        for path in cache.rglob("*")
+        if path.is_file()
+    } == before
+
+
+def test_apply_delta_stat_mode_rehashes_carried_files_the_sidecar_no_longer_trusts(tmp_path):
+    repo = _source_repo(tmp_path)
+    _write_schema(repo, "contracts/heim-pc/config/kept.schema.json", {"type": "object"})
+    _git(repo, "add", "-A")
+    _git(repo, "commit", "-m", "kept schema")
+    base = _git(repo, "rev-parse", "HEAD")
+    cache = tmp_path / "cache"
+    _emit(repo, cache, "--source-kind", "offline_cache", "--stat-index")
+    _advance(repo)
+    _delta(repo, tmp_path / "delta", base)
+    kept = cache / "content" / "contracts/heim-pc/config/kept.schema.json"
+    original = kept.read_bytes()
+
+    _tamper_carried_file(tmp_path / "delta", cache)
+    with pytest.raises(ManifestError) as excinfo:
+        _apply(tmp_path / "delta", cache, "--verify", "stat")
+    assert excinfo.value.code == "CONTENT_DRIFT"
+
+    kept.write_bytes(original)
+    assert _apply(tmp_path / "delta", cache, "--verify", "stat") == 0
+
+
+def test_delta_base_must_be_a_readable_commit_with_the_selection(tmp_path):
+    repo = _source_repo(tmp_path)
+    with pytest.raises(ManifestError) as excinfo:
+        _delta(repo, tmp_path / "delta", "f" * 40)
+    assert excinfo.value.code == "DELTA_BASE_INVALID"
+    with pytest.raises(SystemExit):
+        _delta(repo, tmp_path / "delta", _git(repo, "rev-parse", "HEAD"), "--stat-index")
+
+
+def test_timings_report_phases_and_counters_without_touching_stdout(tmp_path, capsys):
+    repo = _source_repo(tmp_path)
+    _emit(repo, tmp_path / "plain")
+    plain = capsys.readouterr()
+
+    _emit(repo, tmp_path / "timed", "--timings", "--parse-cache", str(tmp_path / "parse"))
+    timed = capsys.readouterr()
+    assert timed.out == plain.out
+    summary, report_line = timed.err.splitlines()
+    assert summary.startswith("materialized ")
+    report = json.loads(report_line)
+    assert list(report["timings"]) == [
+        "total",
+        "resolve_source",
+        "commit_tree",
+        "schema_identifier_index",
+        "schema_closure",
+        "sha256",
+        "materialize",
+    ]
+    for entry in report["timings"].values():
+        assert entry["calls"] == 1
+        assert entry["wall_s"] >= 0 and entry["cpu_s"] >= 0
+    counters = report["counters"]
+    assert counters["schemas_bound"] == 2
+    assert counters["schemas_indexed"] == 3
+    assert counters["parse_cache_misses"] == 3
+    assert counters["files_written"] == 2
+    assert counters["blobs_read"] == 3
+    assert counters["blob_bytes"] == sum(
+        (repo / relative).stat().st_size
+        for relative in (ZONES_SCHEMA, DRIFT_SCHEMA, MANIFEST_SCHEMA_PATH)
+    )
+    assert counters["bound_bytes"] == sum(
+        (repo / relative).stat().st_size for relative in (ZONES_SCHEMA, DRIFT_SCHEMA)
+    )
+
+    _emit(repo, tmp_path / "timed", "--verify", "--timings")
+    verified = capsys.readouterr()
+    assert verified.out == plain.out
+    assert "verify" in json.loads(verified.err.splitlines()[-1])["timings"]
+
+
+def test_timings_are_reported_for_a_failing_run(tmp_path, capsys):
+    repo = _source_repo(tmp_path)
+    argv = ["--source", str(repo), "--out-dir", str(tmp_path / "out"), "--consumer", "missing"]
+    assert main([*argv, "--timings"]) == 2
+    report_line, error = capsys.readouterr().err.splitlines()
+    assert error.startswith("CONSUMER_UNKNOWN")
+    assert "commit_tree" in json.loads(report_line)["timings"]
+
+
+def test_reference_walk_keeps_depth_first_sorted_order_and_errors():
+    from emit_source_manifest import _inspect_schema
+
+    relative = "contracts/walk/order.schema.json"
+    schema = {
+        "properties": {
+            "b": {"$ref": "b.schema.json"},
+            "a": {"items": {"$ref": "a.schema.json"}, "$ref": "a-outer.schema.json"},
+        },
+        "allOf": [
+            {"$id": "https://metarepo.invalid/contracts/walk/nested/", "$ref": "n.schema.json"},
+            {"not": {"$ref": "#/$defs/x"}},
+        ],
+        "$ref": "root.schema.json",
+        "$defs": {"x": {"description": {"$ref": "ignored.schema.json"}}},
+    }
+    base = "https://metarepo.invalid/contracts/walk/"
+    facts = _inspect_schema(relative, json.dumps(schema).encode("utf-8"))
+    assert facts.error is None
+    assert facts.resources == (
+        ("reference", base + "root.schema.json"),
+        ("identifier", base + "nested/"),
+        ("reference", base + "nested/n.schema.json"),
+        ("reference", base + "order.schema.json#/$defs/x"),
+        ("reference", base + "a-outer.schema.json"),
+        ("reference", base + "a.schema.json"),
+        ("reference", base + "b.schema.json"),
+    )
+
+    failing = {"allOf": [{"$ref": "ok.schema.json"}, {"$ref": 3}, {"$ref": "late.schema.json"}]}
+    facts = _inspect_schema(relative, json.dumps(failing).encode("utf-8"))
+    assert facts.resources == (("reference", base + "ok.schema.json"),)
+    assert facts.error == ("SCHEMA_REF_INVALID", f"{relative} contains a non-string $ref")
+
+
+def test_reference_walk_handles_pathological_depth_and_shares_resolutions():
+    from emit_source_manifest import _inspect_schema, _join_uri
+
+    depth = 900
+    text = '{"$ref": "d.schema.json", "not": ' * depth + "{}" + "}" * depth
+    _join_uri.cache_clear()
+    facts = _inspect_schema("contracts/walk/deep.schema.json", text.encode("utf-8"))
+    assert facts.error is None
+    assert len(facts.resources) == depth
+    assert _join_uri.cache_info().misses == 1
+
+    too_deep = '{"not": ' * 5000 + "{}" + "}" * 5000
+    facts = _inspect_schema("contracts/walk/deeper.schema.json", too_deep.encode("utf-8"))
+    assert facts.error is not None and facts.error[0] == "SCHEMA_JSON_INVALID"
+
+    for relative in ("contracts/walk/one.schema.json", "contracts/walk/two.schema.json"):
+        facts = _inspect_schema(relative, b'{"$ref": "//no-scheme"}')
+        assert facts.error == (
+            "SCHEMA_REF_INVALID",
+            f"{relative} contains an invalid $ref: '//no-scheme'",
+        )
+
+
+def _dependents(repo: Path, index_dir: Path, *extra: str) -> dict:
+    from schema_dependents import run as dependents_run
+
+    return dependents_run(["--source", str(repo), "--index-dir", str(index_dir), *extra])
+
+
+def _reference_chain(repo: Path) -> None:
+    _write_schema(repo, BASE_EVENT_SCHEMA, {"type": "object"})
+    _write_schema(repo, CHRONIK_SCHEMA, {"items": {"$ref": "../events/base.event.schema.json"}})
+    _write_schema(
+        repo,
+        ZONES_SCHEMA,
+        {
+            "$ref": "https://metarepo.invalid/contracts/chronik/event.batch.v1.schema.json",
+            "$defs": {"self": {"$ref": "#/$defs/self"}},
+        },
+    )
+    _git(repo, "add", "-A")
+    _git(repo, "commit", "-m", "reference chain")
+
+
+def test_dependents_query_answers_transitively_from_the_persisted_index(
+    tmp_path, capsys, monkeypatch
+):
+    import schema_dependents
+
+    repo = _source_repo(tmp_path)
+    _reference_chain(repo)
+    index_dir = tmp_path / "dependents"
+    manifest = _emit(repo, tmp_path / "cache", "--source-kind", "offline_cache")
+    capsys.readouterr()
+    other = tmp_path / "other.json"
+    other.write_text(json.dumps({"schemas": {DRIFT_SCHEMA: "0" * 64}}), encoding="utf-8")
+
+    assert (
+        _dependents(
+            repo,
+            index_dir,
+            "--schema",
+            BASE_EVENT_SCHEMA,
+            "--manifest",
+            str(tmp_path / "cache" / MANIFEST_NAME),
+            "--manifest",
+            str(other),
+        )
+        == 0
+    )
+    answer = json.loads(capsys.readouterr().out)
+    tree = _git(repo, "rev-parse", "HEAD:contracts")
+    assert answer == {
+        "commit": manifest["commit"],
+        "contracts_tree": tree,
+        "schemas": [BASE_EVENT_SCHEMA],
+        "dependents": [CHRONIK_SCHEMA, ZONES_SCHEMA],
+        "consumers": ["chronik", "events", "heim-pc"],
+        "manifests": [str(tmp_path / "cache" / MANIFEST_NAME)],
+    }
+    assert sorted(path.name for path in index_dir.iterdir()) == [f"{tree}.json"]
+
+    # A commit that leaves contracts/ alone reuses the stored index unscanned.
+    (repo / "README.md").write_text("unrelated\n", encoding="utf-8")
+    _git(repo, "add", "-A")
+    _git(repo, "commit", "-m", "unrelated")
+
+    def no_scan(*_args, **_kwargs):
+        raise AssertionError("the persisted index must answer the query")
+
+    monkeypatch.setattr(schema_dependents, "_schema_identifier_index", no_scan)
+    assert _dependents(repo, index_dir, "--schema", CHRONIK_SCHEMA) == 0
+    answer = json.loads(capsys.readouterr().out)
+    assert answer["dependents"] == [ZONES_SCHEMA]
+    assert answer["manifests"] == []
+
+    # An unreferenced schema has no dependents; an untracked one is rejected.
+    assert _dependents(repo, index_dir, "--schema", DRIFT_SCHEMA) == 0
+    assert json.loads(capsys.readouterr().out)["dependents"] == []
+    with pytest.raises(ManifestError) as excinfo:
+        _dependents(repo, index_dir, "--schema", "contracts/heim-pc/absent.schema.json")
+    assert excinfo.value.code == "SCHEMA_NOT_TRACKED"
+
+
+def test_dependents_index_is_rebuilt_for_a_new_tree_or_a_damaged_file(tmp_path, capsys):
+    repo = _source_repo(tmp_path)
+    _reference_chain(repo)
+    index_dir = tmp_path / "dependents"
+    assert _dependents(repo, index_dir, "--schema", BASE_EVENT_SCHEMA) == 0
+    first = _git(repo, "rev-parse", "HEAD:contracts")
+    (index_dir / f"{first}.json").write_text("{", encoding="utf-8")
+    assert _dependents(repo, index_dir, "--schema", BASE_EVENT_SCHEMA) == 0
+    assert json.loads((index_dir / f"{first}.json").read_text("utf-8"))["contracts_tree"] == first
+
+    _write_schema(repo, DRIFT_SCHEMA, {"$ref": "../config/zones.schema.json"})
+    _git(repo, "add", "-A")
+    _git(repo, "commit", "-m", "drift refers to zones")
+    capsys.readouterr()
+    assert _dependents(repo, index_dir, "--schema", BASE_EVENT_SCHEMA) == 0
+    assert json.loads(capsys.readouterr().out)["dependents"] == [
+        CHRONIK_SCHEMA,
+        ZONES_SCHEMA,
+        DRIFT_SCHEMA,
+    ]
+    assert len(list(index_dir.glob("*.json"))) == 2
+
+
+def test_dependents_query_reads_a_warm_index_without_resolving_the_source(
+    tmp_path, capsys, monkeypatch
+):
+    import schema_dependents
+
+    repo = _source_repo(tmp_path)
+    _reference_chain(repo)
+    index_dir = tmp_path / "dependents"
+    (repo / "README.md").write_text("uncommitted\n", encoding="utf-8")
+
+    # A cold, read-only query builds the index from committed objects only.
+    assert _dependents(repo, index_dir, "--schema", BASE_EVENT_SCHEMA) == 0
+    cold = json.loads(capsys.readouterr().out)
+
+    def unexpected(*_args, **_kwargs):
+        raise AssertionError("a warm query must not resolve the source")
+
+    monkeypatch.setattr(schema_dependents, "resolve_source", unexpected)
+    monkeypatch.setattr(schema_dependents, "GitObjectReader", unexpected)
+    head = _git(repo, "rev-parse", "HEAD")
+    assert _dependents(repo, index_dir, "--schema", BASE_EVENT_SCHEMA) == 0
+    assert json.loads(capsys.readouterr().out) == cold
+    assert (
+        _dependents(repo, index_dir, "--schema", BASE_EVENT_SCHEMA, "--expected-commit", head)
+        == 0
+    )
+    assert json.loads(capsys.readouterr().out)["commit"] == head
+    monkeypatch.undo()
+
+    with pytest.raises(ManifestError) as excinfo:
+        _dependents(repo, index_dir, "--schema", BASE_EVENT_SCHEMA, "--require-clean")
+    assert excinfo.value.code == "SOURCE_DIRTY"
+    with pytest.raises(ManifestError) as excinfo:
+        _dependents(
+            repo, index_dir, "--schema", BASE_EVENT_SCHEMA, "--expected-commit", "0" * 40
+        )
+    assert excinfo.value.code == "SOURCE_COMMIT_MISMATCH"
+
+
+def test_store_shares_schema_bytes_across_caches_and_keeps_verify_link_free(tmp_path, capsys):
+    repo = _source_repo(tmp_path)
+    store = tmp_path / "store"
+    first = _emit(repo, tmp_path / "a", "--source-kind", "offline_cache", "--store", str(store))
+    _emit(repo, tmp_path / "b", "--source-kind", "offline_cache", "--store", str(store))
+
+    for relative, digest in first["schemas"].items():
+        stored = store / "sha256" / digest[:2] / digest
+        assert stored.read_bytes() == (repo / relative).read_bytes()
+        a = (tmp_path / "a/content" / relative).stat()
+        b = (tmp_path / "b/content" / relative).stat()
+        assert a.st_ino == b.st_ino == stored.stat().st_ino
+    assert sorted(path.name for path in store.rglob("*") if path.is_file()) == sorted(
+        first["schemas"].values()
+    )
+
+    # A re-run leaves linked files alone; a plain copy is bound to the store anew.
+    capsys.readouterr()
+    _emit(
+        repo, tmp_path / "a", "--source-kind", "offline_cache", "--store", str(store), "--overwrite"
+    )
+    assert "0 written, 0 removed, 2 unchanged" in capsys.readouterr().err
+    _emit(repo, tmp_path / "c", "--source-kind", "offline_cache")
+    _emit(
+        repo, tmp_path / "c", "--source-kind", "offline_cache", "--store", str(store), "--overwrite"
+    )
+    assert "2 written, 0 removed, 0 unchanged" in capsys.readouterr().err
+    zones = first["schemas"][ZONES_SCHEMA]
+    assert (tmp_path / "c/content" / ZONES_SCHEMA).stat().st_ino == (
+        store / "sha256" / zones[:2] / zones
+    ).stat().st_ino
+
+    verify = [
+        "--source",
+        str(repo),
+        "--out-dir",
+        str(tmp_path / "a"),
+        "--consumer",
+        "heim-pc",
+        "--source-kind",
+        "offline_cache",
+    ]
+    assert run([*verify, "--verify"]) == 0
+    assert run([*verify, "--verify=full"]) == 0
+
+    # A symlink into the store is still no cache file.
+    target = tmp_path / "a/content" / ZONES_SCHEMA
+    target.unlink()
+    target.symlink_to(store / "sha256" / zones[:2] / zones)
+    with pytest.raises(ManifestError) as excinfo:
+        run([*verify, "--verify=full"])
+    assert excinfo.value.code == "CONTENT_INVALID_TYPE"
+
+
+def test_store_gc_keeps_exactly_what_live_manifests_bind(tmp_path, capsys):
+    from gc_source_store import run as gc_run
+
+    repo = _source_repo(tmp_path)
+    store = tmp_path / "store"
+    old = _emit(repo, tmp_path / "old", "--source-kind", "offline_cache", "--store", str(store))
+    _advance(repo)
+    new = _emit(repo, tmp_path / "new", "--source-kind", "offline_cache", "--store", str(store))
+    stale = sorted(set(old["schemas"].values()) - set(new["schemas"].values()))
+    assert stale
+    capsys.readouterr()
+
+    assert gc_run(["--store", str(store), "--live", str(tmp_path / "new"), "--dry-run"]) == 0
+    assert json.loads(capsys.readouterr().out) == {"collected": stale, "kept": 3}
+    assert all((store / "sha256" / digest[:2] / digest).exists() for digest in stale)
+
+    # A malformed live manifest aborts before anything is collected.
+    broken = tmp_path / "broken.json"
+    broken.write_text("{}", encoding="utf-8")
+    with pytest.raises(ManifestError) as excinfo:
+        gc_run(["--store", str(store), "--live", str(tmp_path / "new"), "--live", str(broken)])
+    assert excinfo.value.code == "MANIFEST_UNREADABLE"
+    assert all((store / "sha256" / digest[:2] / digest).exists() for digest in stale)
+
+    assert gc_run(["--store", str(store), "--live", str(tmp_path / "new" / MANIFEST_NAME)]) == 0
+    assert not any((store / "sha256" / digest[:2] / digest).exists() for digest in stale)
+    # The old cache held hardlinks, so it still verifies without the store copy.
+    _git(repo, "checkout", "-q", "HEAD~1")
+    verify = [
+        "--source",
+        str(repo),
+        "--out-dir",
+        str(tmp_path / "old"),
+        "--consumer",
+        "heim-pc",
+        "--source-kind",
+        "offline_cache",
+        "--verify=full",
+    ]
+    assert run(verify) == 0
+
+
+def test_store_rejects_verify_archive_and_source_placement(tmp_path):
+    repo = _source_repo(tmp_path)
+    with pytest.raises(SystemExit):
+        _emit(repo, tmp_path / "a", "--verify", "--store", str(tmp_path / "store"))
+    with pytest.raises(ManifestError) as excinfo:
+        _emit(repo, tmp_path / "a", "--store", str(repo / "store"))
+    assert excinfo.value.code == "STORE_INVALID"
+    assert not (repo / "store").exists()
+
+
+def test_apply_delta_binds_changed_files_to_the_store(tmp_path):
+    repo = _source_repo(tmp_path)
+    base = _git(repo, "rev-parse", "HEAD")
+    store = tmp_path / "store"
+    cache = tmp_path / "cache"
+    _emit(repo, cache, "--source-kind", "offline_cache", "--store", str(store))
+    _advance(repo)
+    delta = _delta(repo, tmp_path / "delta", base)
+
+    assert _apply(tmp_path / "delta", cache, "--store", str(store)) == 0
+    for relative, digest in delta["changed"].items():
+        stored = store / "sha256" / digest[:2] / digest
+        assert (cache / "content" / relative).stat().st_ino == stored.stat().st_ino
+
+
+def _rpc(service, method: str, **params) -> dict:
+    return service.handle({"jsonrpc": "2.0", "id": 1, "method": method, "params": params})
+
+
+def test_service_answers_warm_and_rebuilds_only_when_head_moves(tmp_path, monkeypatch):
+    import source_service
+
+    repo = _source_repo(tmp_path)
+    builds: list[int] = []
+    real_index = source_service._schema_identifier_index
+
+    def counting_index(objects, tree, cache=None, *, known=None):
+        builds.append(len(known or {}))
+        return real_index(objects, tree, cache, known=known)
+
+    monkeypatch.setattr(source_service, "_schema_identifier_index", counting_index)
+    service = source_service.SourceService(str(repo))
+    try:
+        commit = _git(repo, "rev-parse", "HEAD")
+        closure = _rpc(service, "closure", consumers=["heim-pc"])
+        assert closure["result"] == {"commit": commit, "schemas": [ZONES_SCHEMA, DRIFT_SCHEMA]}
+
+        out_dir = tmp_path / "cache"
+        emitted = _rpc(service, "emit", consumers=["heim-pc"], out_dir=str(out_dir))
+        assert emitted["result"]["manifest"] == json.loads(
+            (out_dir / MANIFEST_NAME).read_text(encoding="utf-8")
+        )
+        assert _rpc(service, "verify", consumers=["heim-pc"], out_dir=str(out_dir), mode="full")[
+            "result"
+        ]["verified"]
+        assert builds == [0]
+
+        # A dirty worktree is refused without touching the index.
+        (repo / ZONES_SCHEMA).write_text("{}\n", encoding="utf-8")
+        refused = _rpc(service, "emit", consumers=["heim-pc"], out_dir=str(out_dir))
+        assert refused["error"]["data"]["code"] == "SOURCE_DIRTY"
+        assert _rpc(service, "closure", consumers=["heim-pc"])["result"]["commit"] == commit
+        assert builds == [0]
+
+        _git(repo, "checkout", "--", ZONES_SCHEMA)
+        _advance(repo)
+        advanced = _rpc(service, "closure", consumers=["heim-pc"])["result"]
+        assert advanced["commit"] == _git(repo, "rev-parse", "HEAD")
+        assert "contracts/heim-pc/shared/common.schema.json" in advanced["schemas"]
+        # The rebuild reused the facts of the three schemas both trees share.
+        assert builds == [0, 3]
+
+        drifted = _rpc(service, "verify", consumers=["heim-pc"], out_dir=str(out_dir))
+        assert drifted["error"]["code"] == source_service.MANIFEST_FAILURE
+        assert drifted["error"]["data"]["code"] == "MANIFEST_DRIFT"
+        assert _rpc(service, "status")["result"]["rebuilds"] == 2
+    finally:
+        service.close()
+
+
+def test_service_speaks_line_delimited_json_rpc(tmp_path):
+    import io
+
+    import source_service
+
+    repo = _source_repo(tmp_path)
+    requests = [
+        '{"jsonrpc":"2.0","id":1,"method":"closure","params":{"schemas":["' + ZONES_SCHEMA + '"]}}',
+        "not json",
+        '{"jsonrpc":"2.0","id":2,"method":"nope"}',
+        '{"jsonrpc":"2.0","id":3,"method":"closure","params":{"consumers":"heim-pc"}}',
+        '{"jsonrpc":"2.0","method":"status"}',
+        '{"jsonrpc":"2.0","id":4,"method":"shutdown"}',
+        '{"jsonrpc":"2.0","id":5,"method":"status"}',
+    ]
+    output = io.StringIO()
+    service = source_service.SourceService(str(repo))
+    try:
+        service.serve(io.StringIO("\n".join(requests) + "\n"), output)
+    finally:
+        service.close()
+    responses = [json.loads(line) for line in output.getvalue().splitlines()]
+    assert [response.get("id") for response in responses] == [1, None, 2, 3, 4]
+    assert responses[0]["result"]["schemas"] == [ZONES_SCHEMA]
+    assert [response.get("error", {}).get("code") for response in responses[1:4]] == [
+        source_service.PARSE_ERROR,
+        source_service.METHOD_NOT_FOUND,
+        source_service.INVALID_PARAMS,
+    ]
+    assert responses[4] == {"jsonrpc": "2.0", "id": 4, "result": None}
+
+
+def test_service_survives_a_bad_request_and_answers_the_next(tmp_path, monkeypatch):
+    import io
+
+    import source_service
+
+    repo = _source_repo(tmp_path)
+    status = '{"jsonrpc":"2.0","id":"ok","method":"status"}'
+    bad_requests = [
+        json.dumps(
+            {
+                "jsonrpc": "2.0",
+                "id": "bad",
+                "method": "emit",
+                "params": {"schemas": [ZONES_SCHEMA], "out_dir": str(tmp_path / "o\0x")},
+            }
+        ),
+        json.dumps(
+            {
+                "jsonrpc": "2.0",
+                "id": "bad",
+                "method": "emit",
+                "params": {
+                    "schemas": [ZONES_SCHEMA],
+                    "out_dir": str(tmp_path / "out"),
+                    "store": str(tmp_path / "s\0x"),
+                },
+            }
+        ),
+        "[" * 100_000,
+        '{"jsonrpc":"2.0","id":"bad","method":"closure","params":{"schemas":[]}}',
+    ]
+    service = source_service.SourceService(str(repo))
+
+    def broken_closure(params):
+        raise KeyError("boom")
+
+    monkeypatch.setitem(service.methods, "closure", broken_closure)
+    codes = []
+    try:
+        for bad in bad_requests:
+            output = io.StringIO()
+            service.serve(io.StringIO(bad + "\n" + status + "\n"), output)
+            first, second = [json.loads(line) for line in output.getvalue().splitlines()]
+            codes.append(first["error"]["code"])
+            assert second["id"] == "ok" and second["result"]["commit"]
+    finally:
+        service.close()
+    assert codes == [
+        source_service.INVALID_PARAMS,
+        source_service.INVALID_PARAMS,
+        source_service.PARSE_ERROR,
+        source_service.INTERNAL_ERROR,
+    ]
+
+
+def test_service_read_methods_ignore_the_worktree_and_writers_always_check_it(tmp_path):
+    import source_service
+
+    repo = _source_repo(tmp_path)
+    service = source_service.SourceService(str(repo))
+    try:
+        _advance(repo)
+        (repo / ZONES_SCHEMA).write_text("{}\n", encoding="utf-8")
+        head = _git(repo, "rev-parse", "HEAD")
+        assert _rpc(service, "status")["result"]["commit"] == head
+        assert _rpc(service, "closure", consumers=["heim-pc"])["result"]["commit"] == head
+        refused = _rpc(service, "emit", consumers=["heim-pc"], out_dir=str(tmp_path / "out"))
+        assert refused["error"]["data"]["code"] == "SOURCE_DIRTY"
+    finally:
+        service.close()
+
+
+def test_service_socket_serves_clients_concurrently_and_replaces_stale_sockets(tmp_path):
+    import socket
+    import tempfile
+    import threading
+    import time
+
+    import source_service
+
+    repo = _source_repo(tmp_path)
+    with tempfile.TemporaryDirectory() as directory:
+        socket_path = Path(directory) / "service.sock"
+        stale = socket.socket(socket.AF_UNIX, socket.SOCK_STREAM)
+        stale.bind(str(socket_path))
+        stale.close()
+
+        service = source_service.SourceService(str(repo))
+        server = threading.Thread(
+            target=source_service._serve_socket, args=(service, socket_path), daemon=True
+        )
+        server.start()
+
+        def connect():
+            for _attempt in range(200):
+                client = socket.socket(socket.AF_UNIX, socket.SOCK_STREAM)
+                try:
+                    client.connect(str(socket_path))
+                except OSError:
+                    client.close()
+                    time.sleep(0.01)
+                    continue
+                client.settimeout(10)
+                return client, client.makefile("rwb")
+            raise AssertionError("service did not start")
+
+        def call(stream, method):
+            request = {"jsonrpc": "2.0", "id": method, "method": method}
+            stream.write(json.dumps(request).encode("utf-8") + b"\n")
+            stream.flush()
+            return json.loads(stream.readline())
+
+        try:
+            first, first_stream = connect()
+            assert call(first_stream, "status")["result"]["commit"]
+            with pytest.raises(ManifestError) as excinfo:
+                source_service._remove_stale_socket(socket_path)
+            assert excinfo.value.code == "SERVICE_SOCKET_INVALID"
+
+            # The first client stays connected while the second is answered.
+            second, second_stream = connect()
+            assert call(second_stream, "status")["result"]["commit"]
+            assert call(second_stream, "shutdown")["result"] is None
+            server.join(timeout=10)
+            assert not server.is_alive()
+            assert not socket_path.exists()
+            for client, stream in ((first, first_stream), (second, second_stream)):
+                stream.close()
+                client.close()
+        finally:
+            service.close()
+
+
+def test_merkle_layer_is_a_bound_sidecar_and_leaves_the_manifest_alone(tmp_path):
+    from emit_source_manifest import MERKLE_NAME, merkle_directories
+
+    repo = _source_repo(tmp_path)
+    plain = _emit(repo, tmp_path / "plain", "--source-kind", "offline_cache")
+    _emit(repo, tmp_path / "cache", "--source-kind", "offline_cache", "--merkle")
+    manifest_bytes = (tmp_path / "cache" / MANIFEST_NAME).read_bytes()
+    assert manifest_bytes == (tmp_path / "plain" / MANIFEST_NAME).read_bytes()
+
+    layer = json.loads((tmp_path / "cache" / MERKLE_NAME).read_text(encoding="utf-8"))
+    schema = json.loads(
+        (ROOT / "contracts/contract.source.merkle.schema.json").read_text(encoding="utf-8")
+    )
+    Draft202012Validator.check_schema(schema)
+    Draft202012Validator(schema).validate(layer)
+    assert layer["manifest_sha256"] == hashlib.sha256(manifest_bytes).hexdigest()
+    assert sorted(layer["directories"]) == [
+        ".",
+        "contracts",
+        "contracts/heim-pc",
+        "contracts/heim-pc/config",
+        "contracts/heim-pc/state",
+    ]
+    config = layer["directories"]["contracts/heim-pc/config"]
+    assert config["files"] == {"zones.schema.json": plain["schemas"][ZONES_SCHEMA]}
+    assert config["digest"] == hashlib.sha256(
+        f"blob {plain['schemas'][ZONES_SCHEMA]} zones.schema.json\n".encode()
+    ).hexdigest()
+    assert layer["directories"]["contracts/heim-pc"]["directories"] == {
+        "config": config["digest"],
+        "state": layer["directories"]["contracts/heim-pc/state"]["digest"],
+    }
+    assert layer["root"] == merkle_directories(plain["schemas"])["."]["digest"]
+
+    verify = [
+        "--source",
+        str(repo),
+        "--out-dir",
+        str(tmp_path / "cache"),
+        "--consumer",
+        "heim-pc",
+        "--source-kind",
+        "offline_cache",
+        "--verify=full",
+    ]
+    assert run(verify) == 0
+    layer["directories"]["contracts"]["digest"] = "0" * 64
+    (tmp_path / "cache" / MERKLE_NAME).write_bytes(json.dumps(layer).encode())
+    with pytest.raises(ManifestError) as excinfo:
+        run(verify)
+    assert excinfo.value.code == "MERKLE_DRIFT"
+
+    # A plain rewrite drops the layer rather than leaving a stale one behind.
+    _emit(repo, tmp_path / "cache", "--source-kind", "offline_cache", "--overwrite")
+    assert not (tmp_path / "cache" / MERKLE_NAME).exists()
+
+
+def test_verify_subtree_ignores_drift_outside_the_subtree(tmp_path):
+    repo = _source_repo(tmp_path)
+    out_dir = tmp_path / "cache"
+    _emit(repo, out_dir, "--source-kind", "offline_cache")
+    verify = [
+        "--source",
+        str(repo),
+        "--out-dir",
+        str(out_dir),
+        "--consumer",
+        "heim-pc",
+        "--source-kind",
+        "offline_cache",
+        "--verify=full",
+    ]
+    (out_dir / "content" / DRIFT_SCHEMA).write_text("{}\n", encoding="utf-8")
+    (out_dir / "content/contracts/heim-pc/state/extra.json").write_text("{}", encoding="utf-8")
+    with pytest.raises(ManifestError):
+        run(verify)
+    assert run([*verify, "--verify-subtree", "contracts/heim-pc/config"]) == 0
+
+    (out_dir / "content/contracts/heim-pc/config/extra.json").write_text("{}", encoding="utf-8")
+    with pytest.raises(ManifestError) as excinfo:
+        run([*verify, "--verify-subtree", "contracts/heim-pc/config"])
+    assert excinfo.value.code == "CONTENT_UNBOUND"
+    with pytest.raises(ManifestError) as excinfo:
+        run([*verify, "--verify-subtree", "contracts/chronik"])
+    assert excinfo.value.code == "VERIFY_SUBTREE_INVALID"
+
+    # The manifest header still binds one commit: a new one refuses every subtree.
+    (out_dir / "content/contracts/heim-pc/config/extra.json").unlink()
+    _write_schema(repo, DRIFT_SCHEMA, {"title": "drift v2", "type": "object"})
+    _git(repo, "commit", "-qam", "change state only")
+    with pytest.raises(ManifestError) as excinfo:
+        run([*verify, "--verify-subtree", "contracts/heim-pc/config"])
+    assert excinfo.value.code == "MANIFEST_DRIFT"
+
+
+def test_compare_caches_descends_only_into_changed_directories(tmp_path, capsys):
+    from compare_source_caches import run as compare_run
+
+    repo = _source_repo(tmp_path)
+    old = _emit(repo, tmp_path / "old", "--source-kind", "offline_cache", "--merkle")
+    _emit(repo, tmp_path / "same", "--source-kind", "offline_cache", "--merkle")
+    _advance(repo)
+    new = _emit(repo, tmp_path / "new", "--source-kind", "offline_cache", "--merkle")
+    capsys.readouterr()
+
+    assert compare_run([str(tmp_path / "old"), str(tmp_path / "same")]) == 0
+    assert json.loads(capsys.readouterr().out)["identical"] is True
+
+    assert compare_run([str(tmp_path / "old"), str(tmp_path / "new")]) == 0
+    result = json.loads(capsys.readouterr().out)
+    assert result["changed"] == [ZONES_SCHEMA]
+    assert result["added"] == sorted(set(new["schemas"]) - set(old["schemas"]))
+    assert result["removed"] == [DRIFT_SCHEMA]
+    # ., contracts, heim-pc, config, shared and state: never an unchanged sibling.
+    assert result["directories_visited"] == 6
+
+    _emit(repo, tmp_path / "bare", "--source-kind", "offline_cache")
+    with pytest.raises(ManifestError) as excinfo:
+        compare_run([str(tmp_path / "old"), str(tmp_path / "bare")])
+    assert excinfo.value.code == "MERKLE_MISSING"
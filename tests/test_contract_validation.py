@@ -0,0 +1,261 @@
+"""Guard the in-process contract example and fixture validator."""
+from __future__ import annotations
+
+import json
+from pathlib import Path
+
+import pytest
+
+from metarepo_tools.contract_validation import (
+    ContractValidationError,
+    SchemaRegistry,
+    line_chunks,
+    main,
+    validate_tree,
+)
+
+ROOT = Path(__file__).resolve().parents[1]
+
+
+def _write(path: Path, payload: object) -> None:
+    path.parent.mkdir(parents=True, exist_ok=True)
+    path.write_text(json.dumps(payload) + "\n", encoding="utf-8")
+
+
+def _tree(tmp_path: Path) -> Path:
+    _write(
+        tmp_path / "contracts/events/base.event.schema.json",
+        {
+            "$id": "https://schemas.test/events/base.event.schema.json",
+            "type": "object",
+            "required": ["kind"],
+            "properties": {"kind": {"type": "string"}},
+        },
+    )
+    _write(
+        tmp_path / "contracts/events/widget.schema.json",
+        {
+            "$id": "https://schemas.test/events/widget.schema.json",
+            "allOf": [{"$ref": "base.event.schema.json"}],
+            "properties": {"size": {"type": "integer"}},
+        },
+    )
+    _write(
+        tmp_path / "contracts/local/gadget.schema.json",
+        {"properties": {"widget": {"$ref": "../events/widget.schema.json"}}},
+    )
+    _write(tmp_path / "contracts/examples/widget.example.json", {"kind": "w", "size": 1})
+    _write(tmp_path / "contracts/examples/gadget.example.json", {"widget": {"kind": "w"}})
+    return tmp_path
+
+
+def test_validate_tree_reports_examples_and_fixtures_like_the_shell_script(
+    tmp_path: Path, capsys: pytest.CaptureFixture[str]
+) -> None:
+    root = _tree(tmp_path)
+    fixture = root / "fixtures/widget.jsonl"
+    fixture.parent.mkdir()
+    fixture.write_text('{"kind": "a"}\n\n{"kind": "b", "size": 2}\n', encoding="utf-8")
+    (root / "fixtures/unknown.jsonl").write_text('{"kind": "a"}\n', encoding="utf-8")
+
+    assert validate_tree(root, jobs=1) == 0
+
+    out = capsys.readouterr().out.splitlines()
+    assert out == [
+        "::group::Validate Example contracts/examples/gadget.example.json",
+        "contracts/examples/gadget.example.json valid",
+        "::endgroup::",
+        "::group::Validate Example contracts/examples/widget.example.json",
+        "contracts/examples/widget.example.json valid",
+        "::endgroup::",
+        "::group::Validate fixtures/unknown.jsonl",
+        "::notice::No matching schema for fixtures/unknown.jsonl "
+        "(searched contracts/**/unknown.schema.json)",
+        "::endgroup::",
+        "::group::Validate fixtures/widget.jsonl",
+        "fixtures/widget.jsonl valid (2 JSONL records)",
+        "::endgroup::",
+    ]
+
+
+def test_validate_tree_reports_every_invalid_file(
+    tmp_path: Path, capsys: pytest.CaptureFixture[str]
+) -> None:
+    root = _tree(tmp_path)
+    _write(root / "contracts/examples/widget.example.json", {"size": "big"})
+    fixture = root / "fixtures/nested/widget.jsonl"
+    fixture.parent.mkdir(parents=True)
+    fixture.write_text('{"kind": "a"}\n{"kind": 3, "size": "x"}\n{"kind"\n', encoding="utf-8")
+
+    assert validate_tree(root, jobs=1) == 1
+
+    err = capsys.readouterr().err.splitlines()
+    assert err[0] == "contracts/examples/widget.example.json invalid"
+    assert err[2:6] == [
+        "fixtures/nested/widget.jsonl:2 invalid (byte 14)",
+        "fixtures/nested/widget.jsonl:2/kind 3 is not of type 'string'",
+        "fixtures/nested/widget.jsonl:2/size 'x' is not of type 'integer'",
+        "error: invalid JSON in data: fixtures/nested/widget.jsonl:3 (byte 39)",
+    ]
+
+
+def test_validate_tree_spreads_large_fixture_sets_over_workers(
+    tmp_path: Path, capsys: pytest.CaptureFixture[str]
+) -> None:
+    root = _tree(tmp_path)
+    for index in range(10):
+        fixture = root / f"fixtures/set{index}/widget.jsonl"
+        fixture.parent.mkdir(parents=True)
+        fixture.write_text(f'{{"kind": "{index}"}}\n', encoding="utf-8")
+
+    assert validate_tree(root, jobs=2) == 0
+
+    out = capsys.readouterr().out
+    assert out.count("valid (1 JSONL records)") == 10
+    assert out.index("fixtures/set0/") < out.index("fixtures/set9/")
+
+
+def test_large_fixture_is_split_at_line_boundaries(
+    tmp_path: Path, capsys: pytest.CaptureFixture[str]
+) -> None:
+    root = _tree(tmp_path)
+    fixture = root / "fixtures/widget.jsonl"
+    fixture.parent.mkdir()
+    lines = [
+        json.dumps({"kind": "x" * (index % 7)} if index % 31 else {"kind": index})
+        for index in range(1, 1001)
+    ]
+    lines[499] = ""
+    fixture.write_text("\r\n".join(lines), encoding="utf-8")
+    offsets = [0]
+    for line in lines:
+        offsets.append(offsets[-1] + len(line) + 2)
+
+    chunks = line_chunks(fixture, 4, split_bytes=1)
+    assert len(chunks) == 4
+    assert all(start in offsets for start, _end in chunks)
+
+    assert validate_tree(root, jobs=1, split_bytes=1) == 1
+    sequential = capsys.readouterr()
+    assert validate_tree(root, jobs=4, split_bytes=1) == 1
+    parallel = capsys.readouterr()
+
+    assert parallel.err == sequential.err
+    err = parallel.err.splitlines()
+    assert err[:2] == [
+        f"fixtures/widget.jsonl:31 invalid (byte {offsets[30]})",
+        "fixtures/widget.jsonl:31/kind 31 is not of type 'string'",
+    ]
+    assert err[-3:] == [
+        f"fixtures/widget.jsonl:620 invalid (byte {offsets[619]})",
+        "fixtures/widget.jsonl:620/kind 620 is not of type 'string'",
+        "fixtures/widget.jsonl: 12 further invalid records not shown",
+    ]
+
+
+def test_dangling_fixture_symlink_is_reported_not_raised(
+    tmp_path: Path, capsys: pytest.CaptureFixture[str]
+) -> None:
+    root = _tree(tmp_path)
+    fixture = root / "fixtures/widget.jsonl"
+    fixture.parent.mkdir()
+    fixture.symlink_to(root / "fixtures/missing.jsonl")
+
+    assert line_chunks(fixture, 4, split_bytes=1) == [(0, None)]
+    assert validate_tree(root, jobs=4, split_bytes=1) == 1
+
+    err = capsys.readouterr().err.splitlines()
+    assert err[0] == "error: unable to read data: fixtures/widget.jsonl"
+
+
+def test_deeply_nested_record_is_reported_as_invalid_json(
+    tmp_path: Path, capsys: pytest.CaptureFixture[str]
+) -> None:
+    root = _tree(tmp_path)
+    fixture = root / "fixtures/widget.jsonl"
+    fixture.parent.mkdir()
+    fixture.write_text('{"kind": "a"}\n' + "[" * 100_000 + "\n", encoding="utf-8")
+
+    assert validate_tree(root, jobs=1) == 1
+
+    err = capsys.readouterr().err.splitlines()
+    assert err[0] == "error: invalid JSON in data: fixtures/widget.jsonl:2 (byte 14)"
+
+
+@pytest.mark.parametrize("jobs", [1, 2])
+def test_unresolvable_ref_is_reported_inside_the_group(
+    tmp_path: Path, capsys: pytest.CaptureFixture[str], jobs: int
+) -> None:
+    root = _tree(tmp_path)
+    _write(root / "contracts/broken.schema.json", {"$ref": "missing.schema.json"})
+    _write(root / "contracts/examples/broken.example.json", {})
+    fixture = root / "fixtures/broken.jsonl"
+    fixture.parent.mkdir()
+    fixture.write_text("{}\n{}\n", encoding="utf-8")
+
+    assert validate_tree(root, jobs=jobs, split_bytes=1) == 1
+
+    captured = capsys.readouterr()
+    assert "::group::Validate Example contracts/examples/broken.example.json" in captured.out
+    assert "::group::Validate fixtures/broken.jsonl" in captured.out
+    err = captured.err.splitlines()
+    assert err[0] == (
+        "error: unable to apply schema to data: contracts/examples/broken.example.json"
+    )
+    assert err[1].startswith("contracts/broken.schema.json: ")
+    assert "missing.schema.json" in err[1]
+    assert err[2] == "error: unable to apply schema to data: fixtures/broken.jsonl"
+
+
+def test_deeply_nested_example_is_reported_as_invalid_json(
+    tmp_path: Path, capsys: pytest.CaptureFixture[str]
+) -> None:
+    root = _tree(tmp_path)
+    (root / "contracts/examples/widget.example.json").write_text(
+        "[" * 100_000, encoding="utf-8"
+    )
+
+    assert validate_tree(root, jobs=1) == 1
+
+    err = capsys.readouterr().err.splitlines()
+    assert err[0] == "error: invalid JSON in data: contracts/examples/widget.example.json"
+
+
+def test_registry_compiles_one_validator_per_identifier(tmp_path: Path) -> None:
+    root = _tree(tmp_path)
+    registry = SchemaRegistry(root, ["contracts/events/base.event.schema.json"])
+
+    first = registry.validator("contracts/events/base.event.schema.json")
+
+    assert registry.validator("contracts/events/base.event.schema.json") is first
+
+
+def test_registry_rejects_duplicate_identifiers(tmp_path: Path) -> None:
+    root = _tree(tmp_path)
+    _write(
+        root / "contracts/copy/base.event.schema.json",
+        {"$id": "https://schemas.test/events/base.event.schema.json"},
+    )
+
+    with pytest.raises(ContractValidationError, match="duplicate \\$id"):
+        SchemaRegistry(
+            root,
+            ["contracts/copy/base.event.schema.json", "contracts/events/base.event.schema.json"],
+        )
+
+
+def test_main_exits_2_on_ambiguous_match(
+    tmp_path: Path, capsys: pytest.CaptureFixture[str]
+) -> None:
+    root = _tree(tmp_path)
+    _write(root / "contracts/other/widget.schema.json", {"type": "object"})
+
+    assert main(["--root", str(root)]) == 2
+
+    out = capsys.readouterr().out
+    assert "::error::Ambiguous schema match for contracts/examples/widget.example.json." in out
+    assert "  - contracts/other/widget.schema.json" in out
+
+
+def test_repository_examples_validate_in_process(capsys: pytest.CaptureFixture[str]) -> None:
+    assert validate_tree(ROOT, jobs=1) == 0, capsys.readouterr().err
@@ -4,6 +4,7 @@ import json
 import os
 from pathlib import Path
 import subprocess
+import sys
 
 
 ROOT = Path(__file__).resolve().parents[1]
@@ -11,6 +12,7 @@ PACKAGE_JSON = ROOT / "contracts" / "package.json"
 PACKAGE_LOCK = ROOT / "contracts" / "package-lock.json"
 VALIDATE_SCRIPT = ROOT / "scripts" / "validate-contracts.sh"
 AJV_RUNNER = ROOT / "scripts" / "contracts" / "ajv_validate.cjs"
+TOOLING_MODULES = ("contract_validation.py", "schema_resolution.py", "validation_cache.py")
 
 EXPECTED_DEPENDENCIES = {
     "ajv": "8.20.0",
@@ -63,11 +65,17 @@ def _contract_validator_fixture(tmp_path: Path) -> tuple[Path, dict[str, str]]:
     (repo / "scripts/contracts/validate_consumers.py").write_text("# test stub\n", encoding="utf-8")
     (repo / "contracts/package.json").write_text("{}\n", encoding="utf-8")
     (repo / "contracts/package-lock.json").write_text("{}\n", encoding="utf-8")
+    (repo / "metarepo_tools").mkdir()
+    (repo / "metarepo_tools/__init__.py").write_text("", encoding="utf-8")
+    for module in TOOLING_MODULES:
+        (repo / "metarepo_tools" / module).write_text(
+            (ROOT / "metarepo_tools" / module).read_text(encoding="utf-8"), encoding="utf-8"
+        )
 
     fake_bin = repo / "fake-bin"
     _write_executable(fake_bin / "npm", "#!/usr/bin/env bash\nexit 0\n")
-    _write_executable(fake_bin / "python3", "#!/usr/bin/env bash\nexit 0\n")
-    _write_executable(fake_bin / "uv", "#!/usr/bin/env bash\nexit 0\n")
+    # uv run python ARGS runs this interpreter, which has jsonschema installed.
+    _write_executable(fake_bin / "uv", f'#!/usr/bin/env bash\nshift 2\nexec "{sys.executable}" "$@"\n')
     _write_executable(
         fake_bin / "node",
         """#!/usr/bin/env bash
@@ -76,13 +84,17 @@ if [[ "${1:-}" == "-p" ]]; then
     *ajv-formats/package.json) printf '%s\\n' '3.0.1' ;;
     *) printf '%s\\n' '8.20.0' ;;
   esac
+  exit 0
 fi
+printf '%s\\n' "${2:-}" >> "${NODE_LOG:-/dev/null}"
 exit 0
 """,
     )
 
     env = os.environ.copy()
     env["PATH"] = f"{fake_bin}:/usr/bin:/bin"
+    env["CONTRACT_VALIDATION_CACHE"] = str(tmp_path / "validation-cache")
+    env["NODE_LOG"] = str(tmp_path / "node.log")
     return repo, env
 
 
@@ -92,9 +104,11 @@ def _write_schema(repo: Path, relative_path: str, schema_id: str) -> None:
     schema.write_text(json.dumps({"$id": schema_id, "type": "object"}) + "\n", encoding="utf-8")
 
 
-def _run_contract_validator(repo: Path, env: dict[str, str]) -> subprocess.CompletedProcess[str]:
+def _run_contract_validator(
+    repo: Path, env: dict[str, str], *args: str
+) -> subprocess.CompletedProcess[str]:
     return subprocess.run(
-        ["bash", "scripts/validate-contracts.sh"],
+        ["bash", "scripts/validate-contracts.sh", *args],
         cwd=repo,
         env=env,
         check=False,
@@ -160,6 +174,107 @@ def test_contract_examples_keep_unique_directory_disambiguation(tmp_path: Path)
     assert "Ambiguous schema match" not in completed.stdout
 
 
+def test_contract_fixtures_resolve_from_one_scan_and_fail_closed_on_ambiguity(
+    tmp_path: Path,
+) -> None:
+    repo, env = _contract_validator_fixture(tmp_path)
+    (repo / "fixtures").mkdir()
+    (repo / "fixtures/gadget.jsonl").write_text("{}\n", encoding="utf-8")
+    (repo / "fixtures/widget.jsonl").write_text("{}\n", encoding="utf-8")
+    _write_schema(repo, "contracts/alpha/widget.schema.json", "urn:test:alpha:widget")
+    _write_schema(repo, "contracts/beta/widget.schema.json", "urn:test:beta:widget")
+
+    completed = _run_contract_validator(repo, env)
+
+    assert completed.returncode == 2
+    assert "::notice::No examples found under contracts/examples/" in completed.stdout
+    assert (
+        "::notice::No matching schema for fixtures/gadget.jsonl "
+        "(searched contracts/**/gadget.schema.json)"
+    ) in completed.stdout
+    assert "::group::Validate fixtures/widget.jsonl" in completed.stdout
+    assert "Ambiguous schema match for fixtures/widget.jsonl" in completed.stdout
+
+
+def test_contract_validation_skips_inputs_that_already_passed(tmp_path: Path) -> None:
+    repo, env = _contract_validator_fixture(tmp_path)
+    node_log = Path(env["NODE_LOG"])
+    example = repo / "contracts/examples/alpha/widget.example.json"
+    example.parent.mkdir(parents=True)
+    example.write_text("{}\n", encoding="utf-8")
+    (repo / "contracts/examples/gadget.example.json").write_text("{}\n", encoding="utf-8")
+    _write_schema(repo, "contracts/alpha/widget.schema.json", "urn:test:alpha:widget")
+    _write_schema(repo, "contracts/beta/gadget.schema.json", "urn:test:beta:gadget")
+
+    first = _run_contract_validator(repo, env)
+    assert first.returncode == 0, first.stdout + first.stderr
+    assert node_log.read_text(encoding="utf-8").splitlines() == ["compile-all", "validate", "validate"]
+
+    node_log.unlink()
+    second = _run_contract_validator(repo, env)
+    assert second.returncode == 0, second.stdout + second.stderr
+    assert not node_log.exists()
+    assert "schema contracts/alpha/widget.schema.json is valid (cached)" in second.stdout
+    assert "contracts/examples/alpha/widget.example.json valid (cached)" in second.stdout
+
+    example.write_text('{"changed": true}\n', encoding="utf-8")
+    _write_schema(repo, "contracts/beta/gadget.schema.json", "urn:test:beta:gadget:v2")
+    third = _run_contract_validator(repo, env)
+    assert third.returncode == 0, third.stdout + third.stderr
+    assert node_log.read_text(encoding="utf-8").splitlines() == ["compile-all", "validate", "validate"]
+    assert "schema contracts/alpha/widget.schema.json is valid (cached)" in third.stdout
+
+    node_log.unlink()
+    uncached = _run_contract_validator(repo, env, "--no-cache")
+    assert uncached.returncode == 0, uncached.stdout + uncached.stderr
+    assert node_log.read_text(encoding="utf-8").splitlines() == ["compile-all", "validate", "validate"]
+    assert "(cached)" not in uncached.stdout
+
+
+def test_contract_validation_cache_is_salted_with_the_orchestrator(tmp_path: Path) -> None:
+    repo, env = _contract_validator_fixture(tmp_path)
+    node_log = Path(env["NODE_LOG"])
+    (repo / "contracts/examples/widget.example.json").write_text("{}\n", encoding="utf-8")
+    _write_schema(repo, "contracts/alpha/widget.schema.json", "urn:test:alpha:widget")
+
+    first = _run_contract_validator(repo, env)
+    assert first.returncode == 0, first.stdout + first.stderr
+    node_log.unlink()
+
+    validator = repo / "scripts/validate-contracts.sh"
+    validator.write_text(
+        validator.read_text(encoding="utf-8").replace('"--strict" "false"', '"--strict" "log"'),
+        encoding="utf-8",
+    )
+    second = _run_contract_validator(repo, env)
+    assert second.returncode == 0, second.stdout + second.stderr
+    assert node_log.read_text(encoding="utf-8").splitlines() == ["compile-all", "validate"]
+    assert "(cached)" not in second.stdout
+
+
+def test_contract_fixtures_are_streamed_and_cached_per_file(tmp_path: Path) -> None:
+    repo, env = _contract_validator_fixture(tmp_path)
+    node_log = Path(env["NODE_LOG"])
+    _write_schema(repo, "contracts/alpha/widget.schema.json", "urn:test:alpha:widget")
+    (repo / "fixtures").mkdir()
+    (repo / "fixtures/widget.jsonl").write_text('{}\n{"a": 1}\n', encoding="utf-8")
+    gadget = repo / "fixtures/nested/widget.jsonl"
+    gadget.parent.mkdir()
+    gadget.write_text("{}\n[]\n", encoding="utf-8")
+
+    first = _run_contract_validator(repo, env)
+    assert first.returncode == 1, first.stdout + first.stderr
+    assert "fixtures/widget.jsonl valid (2 JSONL records)" in first.stdout
+    assert "fixtures/nested/widget.jsonl:2 invalid (byte 3)" in first.stderr
+    assert node_log.read_text(encoding="utf-8").splitlines() == ["compile-all"]
+
+    gadget.write_text("{}\n", encoding="utf-8")
+    second = _run_contract_validator(repo, env)
+    assert second.returncode == 0, second.stdout + second.stderr
+    assert "fixtures/widget.jsonl valid (cached)" in second.stdout
+    assert "fixtures/nested/widget.jsonl valid (1 JSONL records)" in second.stdout
+
+
 def test_direct_ajv_runner_is_valid_javascript() -> None:
     completed = subprocess.run(
         ["node", "--check", str(AJV_RUNNER)],
@@ -193,4 +308,76 @@ def test_direct_ajv_runner_fails_closed_without_pinned_modules(tmp_path: Path) -
     )
 
     assert completed.returncode == 2
-    assert "unable to load pinned AJV modules" in completed.stderr
\ No newline at end of file
+    assert "unable to load pinned AJV modules" in completed.stderr
+
+
+def _fake_ajv_modules(tmp_path: Path) -> Path:
+    """A minimal stand-in for the pinned modules that counts registrations."""
+
+    modules = tmp_path / "node_modules"
+    _write_executable(
+        modules / "ajv/dist/2020.js",
+        """"use strict";
+class Ajv2020 {
+  constructor(options) {
+    this.options = options;
+    this.schemas = new Map();
+  }
+  addSchema(schema, key) {
+    if (schema.$id && [...this.schemas.values()].some((known) => known.$id === schema.$id)) {
+      throw new Error(`schema with key or id "${schema.$id}" already exists`);
+    }
+    this.schemas.set(key, schema);
+    process.stderr.write("registered\\n");
+  }
+  getSchema(key) {
+    const schema = this.schemas.get(key);
+    if (schema.$ref && ![...this.schemas.values()].some((known) => known.$id === schema.$ref)) {
+      throw new Error(`can't resolve reference ${schema.$ref}`);
+    }
+    if (schema.strictWarning) {
+      this.options.logger.warn(`strict mode: ${schema.strictWarning}`);
+    }
+    return () => true;
+  }
+}
+module.exports = { default: Ajv2020 };
+""",
+    )
+    _write_executable(modules / "ajv-formats/index.js", "module.exports = () => {};\n")
+    return modules
+
+
+def test_direct_ajv_runner_compiles_all_schemas_in_one_registry(tmp_path: Path) -> None:
+    modules = _fake_ajv_modules(tmp_path)
+    schemas = {
+        "b.schema.json": {"$id": "urn:b", "$ref": "urn:a"},
+        "a.schema.json": {"$id": "urn:a", "strictWarning": "unknown keyword"},
+        "c.schema.json": {"$id": "urn:c", "$ref": "urn:missing"},
+        "d.schema.json": {"$id": "urn:a"},
+    }
+    for name, schema in schemas.items():
+        (tmp_path / name).write_text(json.dumps(schema), encoding="utf-8")
+    results = tmp_path / "results.jsonl"
+
+    args = ["node", str(AJV_RUNNER), "compile-all", "--modules", str(modules)]
+    args += ["--results", str(results)]
+    for name in schemas:
+        args += ["--schema", name]
+    completed = subprocess.run(args, cwd=tmp_path, check=False, capture_output=True, text=True)
+
+    assert completed.returncode == 1
+    assert completed.stderr.count("registered") == 3
+    records = [json.loads(line) for line in results.read_text(encoding="utf-8").splitlines()]
+    assert [(record["schema"], record["valid"]) for record in records] == [
+        ("a.schema.json", True),
+        ("b.schema.json", True),
+        ("c.schema.json", False),
+        ("d.schema.json", False),
+    ]
+    assert records[0]["warnings"] == ["strict mode: unknown keyword"]
+    assert "can't resolve reference urn:missing" in records[2]["errors"][0]
+    assert "already exists" in records[3]["errors"][0]
+    assert completed.stdout.count("::group::Schema ") == 4
+    assert completed.stdout.count("::endgroup::") == 4
+    assert "::error::Validation failed for schema: c.schema.json" in completed.stdout
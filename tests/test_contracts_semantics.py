@@ -164,3 +164,106 @@ def test_contract_json_guard_rejects_duplicate_keys(tmp_path):
     )
     assert completed.returncode == 1
     assert "duplicate JSON key 'required'" in completed.stdout
+
+
+def _lint(tmp_path, files):
+    for relative, document in files.items():
+        path = tmp_path / relative
+        path.parent.mkdir(parents=True, exist_ok=True)
+        path.write_text(json.dumps(document), encoding="utf-8")
+    return subprocess.run(
+        [sys.executable, str(Path.cwd() / "scripts/check-contract-json.py"), "--lint", "contracts"],
+        cwd=tmp_path,
+        check=False,
+        capture_output=True,
+        text=True,
+    )
+
+
+def test_contract_lint_reports_duplicate_nested_ids_and_unresolved_refs(tmp_path):
+    completed = _lint(
+        tmp_path,
+        {
+            "contracts/a.schema.json": {
+                "$id": "https://schemas.test/a.schema.json",
+                "$defs": {"inner": {"$id": "shared.schema.json", "$anchor": "inner"}},
+                "properties": {
+                    "ok": {"$ref": "b.schema.json#/$defs/value"},
+                    "anchor": {"$ref": "shared.schema.json#inner"},
+                    "external": {"$ref": "https://json-schema.org/draft/2020-12/schema"},
+                    "missing": {"$ref": "missing.schema.json"},
+                    "pointer": {"$ref": "b.schema.json#/$defs/absent"},
+                },
+                "examples": [{"$ref": "not-a-reference.schema.json"}],
+            },
+            "contracts/b.schema.json": {
+                "$id": "https://schemas.test/b.schema.json",
+                "$defs": {"value": {"type": "string"}},
+            },
+            "contracts/c.schema.json": {"$id": "https://schemas.test/shared.schema.json"},
+            "contracts/examples/a.schema.json": {"$id": "https://schemas.test/a.schema.json"},
+        },
+    )
+
+    assert completed.returncode == 1
+    errors = [line for line in completed.stdout.splitlines() if line.startswith("::error::")]
+    assert errors == [
+        "::error::duplicate $id https://schemas.test/shared.schema.json in "
+        "contracts/a.schema.json, contracts/c.schema.json",
+        "::error::contracts/a.schema.json: unresolved $ref 'b.schema.json#/$defs/absent' "
+        "(https://schemas.test/b.schema.json#/$defs/absent)",
+        "::error::contracts/a.schema.json: unresolved $ref 'missing.schema.json' "
+        "(https://schemas.test/missing.schema.json)",
+    ]
+
+
+def test_contract_lint_lists_orphans_without_failing(tmp_path):
+    completed = _lint(
+        tmp_path,
+        {
+            "contracts/used.schema.json": {"$ref": "nested/leaf.schema.json"},
+            "contracts/nested/leaf.schema.json": {"type": "string"},
+            "contracts/examples/used.example.json": {},
+            "contracts/lonely.schema.json": {"type": "object"},
+        },
+    )
+
+    assert completed.returncode == 0, completed.stdout
+    assert [line for line in completed.stdout.splitlines() if "orphan schema" in line] == [
+        "::notice::contracts/lonely.schema.json: orphan schema "
+        "(no other schema references it and no example uses it)"
+    ]
+    assert "contract lint: 3 schemas, 0 identifiers, 0 errors, 1 orphans" in completed.stdout
+
+
+def test_contract_json_guard_pool_and_cache_keep_the_serial_output(tmp_path):
+    tree = tmp_path / "tree"
+    for index in range(80):
+        path = tree / f"part{index % 3}" / f"item{index:02d}.json"
+        path.parent.mkdir(parents=True, exist_ok=True)
+        payload = '{"a": 1, "a": 2}' if index % 20 == 7 else json.dumps({"id": index})
+        path.write_text(payload, encoding="utf-8")
+    cache = tmp_path / "verified.json"
+
+    def run(*args):
+        return subprocess.run(
+            [sys.executable, "scripts/check-contract-json.py", *args, str(tree)],
+            check=False,
+            capture_output=True,
+            text=True,
+        )
+
+    serial = run()
+    pooled = run("--jobs", "3", "--cache", str(cache))
+    assert serial.returncode == pooled.returncode == 1
+    assert pooled.stdout == serial.stdout
+    assert serial.stdout.count("duplicate JSON key 'a'") == 4
+    assert len(json.loads(cache.read_text(encoding="utf-8"))["verified"]) == 76
+
+    for index in (7, 27, 47, 67):
+        path = tree / f"part{index % 3}" / f"item{index:02d}.json"
+        path.write_text('{"fixed": true}', encoding="utf-8")
+    warm = run("--cache", str(cache))
+    assert warm.returncode == 0, warm.stdout
+    assert warm.stdout == "contract JSON strict parse: valid (80 files)\n"
+    assert len(json.loads(cache.read_text(encoding="utf-8"))["verified"]) == 77
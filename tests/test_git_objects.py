@@ -0,0 +1,161 @@
+"""Guard the in-process Git object database reader."""
+from __future__ import annotations
+
+from pathlib import Path
+import subprocess
+import zlib
+
+import pytest
+
+from metarepo_tools.git_objects import (
+    CorruptObject,
+    ObjectNotFound,
+    UnsupportedRepository,
+    _apply_delta,
+    open_object_store,
+)
+
+
+def _git(repo: Path, *args: str) -> str:
+    result = subprocess.run(
+        ["git", "-C", str(repo), *args], check=True, text=True, capture_output=True
+    )
+    return result.stdout
+
+
+def _history(tmp_path: Path) -> Path:
+    repo = tmp_path / "repo"
+    repo.mkdir()
+    _git(repo, "init", "--initial-branch=main")
+    _git(repo, "config", "user.email", "test@example.invalid")
+    _git(repo, "config", "user.name", "Object Test")
+    for revision in range(1, 13):
+        (repo / "lines.txt").write_text(
+            "".join(f"{line}\n" for line in range(revision * 150)), encoding="utf-8"
+        )
+        nested = repo / "nested" / "deeper"
+        nested.mkdir(parents=True, exist_ok=True)
+        (nested / "log.txt").write_text(f"revision {revision}\n" * revision, encoding="utf-8")
+        _git(repo, "add", "-A")
+        _git(repo, "commit", "-m", f"revision {revision}")
+    _git(repo, "tag", "-a", "v1", "-m", "annotated")
+    return repo
+
+
+def _all_objects(repo: Path) -> list[tuple[str, str]]:
+    listing = _git(repo, "cat-file", "--batch-all-objects", "--batch-check=%(objectname) %(objecttype)")
+    return [tuple(line.split()) for line in listing.splitlines()]
+
+
+def _assert_matches_git(repo: Path) -> int:
+    objects = _all_objects(repo)
+    with open_object_store(repo) as store:
+        for object_id, kind in objects:
+            expected = subprocess.run(
+                ["git", "-C", str(repo), "cat-file", kind, object_id],
+                check=True,
+                capture_output=True,
+            ).stdout
+            assert store.read(object_id) == (kind, expected)
+    return len(objects)
+
+
+@pytest.mark.parametrize(
+    "repack",
+    [
+        None,
+        ("repack", "-adfq"),
+        ("-c", "repack.useDeltaBaseOffset=false", "repack", "-adfq"),
+    ],
+    ids=["loose", "ofs-delta", "ref-delta"],
+)
+def test_every_object_matches_cat_file(tmp_path, repack):
+    repo = _history(tmp_path)
+    if repack is not None:
+        _git(repo, *repack)
+        assert not any(path.is_file() for path in (repo / ".git/objects").glob("??/*"))
+    assert _assert_matches_git(repo) > 40
+
+
+def test_mixed_loose_and_packed_objects_and_late_packs(tmp_path):
+    repo = _history(tmp_path)
+    with open_object_store(repo) as store:
+        head = _git(repo, "rev-parse", "HEAD").strip()
+        assert store.read(head)[0] == "commit"
+        _git(repo, "repack", "-adq")
+        assert store.read(head)[0] == "commit"
+        (repo / "extra.txt").write_text("loose\n", encoding="utf-8")
+        _git(repo, "add", "extra.txt")
+        blob = _git(repo, "rev-parse", ":extra.txt").strip()
+        assert store.read(blob) == ("blob", b"loose\n")
+        with pytest.raises(ObjectNotFound):
+            store.read("0" * 40)
+
+
+def test_corrupt_loose_object_fails_closed(tmp_path):
+    repo = _history(tmp_path)
+    blob = _git(repo, "rev-parse", "HEAD:lines.txt").strip()
+    path = repo / ".git/objects" / blob[:2] / blob[2:]
+    path.chmod(0o644)
+    path.write_bytes(zlib.compress(b"blob 6\0forged"))
+    with open_object_store(repo) as store, pytest.raises(CorruptObject):
+        store.read(blob)
+
+
+@pytest.mark.parametrize(
+    "delta",
+    [b"\x03", b"\x03\x05\x90", b"\x03\x05\x93\x00", b"\x03\x05\x05ab"],
+    ids=["header", "copy-size", "copy-offset", "insert"],
+)
+def test_truncated_delta_is_corrupt(delta):
+    with pytest.raises(CorruptObject):
+        _apply_delta(b"abc", delta)
+
+
+def test_truncated_pack_entry_header_is_corrupt(tmp_path):
+    repo = _history(tmp_path)
+    _git(repo, "repack", "-adfq")
+    [pack] = (repo / ".git/objects/pack").glob("*.pack")
+    [index] = (repo / ".git/objects/pack").glob("*.idx")
+    entries = [
+        line.split()
+        for line in _git(repo, "verify-pack", "-v", str(index)).splitlines()
+        if len(line.split()) >= 5 and line.split()[1] in {"commit", "tree", "blob", "tag"}
+    ]
+    object_id, *_rest, offset = max(entries, key=lambda entry: int(entry[4]))[:5]
+    data = bytearray(pack.read_bytes())
+    # A blob header whose size varint never ends before the trailer.
+    data[int(offset) : len(data) - 20] = b"\xb0" * (len(data) - 20 - int(offset))
+    pack.chmod(0o644)
+    pack.write_bytes(bytes(data))
+    with open_object_store(repo) as store, pytest.raises(CorruptObject):
+        store.read(object_id)
+
+
+@pytest.mark.parametrize(
+    "mutate",
+    [
+        lambda repo: _git(repo, "config", "extensions.objectFormat", "sha256"),
+        lambda repo: _git(repo, "config", "extensions.partialClone", "origin"),
+        lambda repo: _git(repo, "config", "include.path", "other.config"),
+        lambda repo: (repo / ".git/objects/info/alternates").write_text(
+            "/elsewhere\n", encoding="utf-8"
+        ),
+    ],
+    ids=["sha256", "partial-clone", "include", "alternates"],
+)
+def test_unsupported_layouts_are_refused_at_open(tmp_path, mutate):
+    repo = _history(tmp_path)
+    (repo / ".git/objects/info").mkdir(exist_ok=True)
+    mutate(repo)
+    with pytest.raises(UnsupportedRepository):
+        open_object_store(repo)
+
+
+def test_linked_worktree_reads_the_common_object_database(tmp_path):
+    repo = _history(tmp_path)
+    worktree = tmp_path / "linked"
+    _git(repo, "worktree", "add", "-q", str(worktree))
+    head = _git(worktree, "rev-parse", "HEAD").strip()
+    with open_object_store(worktree) as store:
+        assert store.read(head)[0] == "commit"
@@ -0,0 +1,93 @@
+"""Guard the one-scan example and fixture to schema resolver."""
+from __future__ import annotations
+
+from pathlib import Path
+
+import pytest
+
+from metarepo_tools.schema_resolution import SchemaNameIndex, main, resolve_all
+
+
+def _touch(root: Path, *paths: str) -> None:
+    for relative in paths:
+        path = root / relative
+        path.parent.mkdir(parents=True, exist_ok=True)
+        path.write_text("{}\n", encoding="utf-8")
+
+
+def test_resolve_all_keeps_shell_ambiguity_semantics(tmp_path: Path) -> None:
+    _touch(
+        tmp_path,
+        "contracts/alpha/widget.schema.json",
+        "contracts/beta/widget.schema.json",
+        "contracts/heim-pc/state/drift.schema.json",
+        "contracts/examples/alpha/widget.example.json",
+        "contracts/examples/gamma/widget.example.json",
+        "contracts/examples/widget.example.json",
+        "contracts/examples/other/drift.example.json",
+        "contracts/examples/lonely.example.json",
+        "fixtures/widget.jsonl",
+        "fixtures/nested/drift.jsonl",
+        "fixtures/.hidden/drift.jsonl",
+    )
+
+    resolved = {
+        resolution.path: (resolution.kind, resolution.status, resolution.candidates)
+        for resolution in resolve_all(tmp_path)
+    }
+
+    both = ("contracts/alpha/widget.schema.json", "contracts/beta/widget.schema.json")
+    assert resolved == {
+        "contracts/examples/alpha/widget.example.json": (
+            "example",
+            "match",
+            ("contracts/alpha/widget.schema.json",),
+        ),
+        "contracts/examples/gamma/widget.example.json": ("example", "ambiguous", both),
+        "contracts/examples/widget.example.json": ("example", "ambiguous", both),
+        "contracts/examples/other/drift.example.json": (
+            "example",
+            "match",
+            ("contracts/heim-pc/state/drift.schema.json",),
+        ),
+        "contracts/examples/lonely.example.json": ("example", "none", ()),
+        "fixtures/nested/drift.jsonl": (
+            "fixture",
+            "match",
+            ("contracts/heim-pc/state/drift.schema.json",),
+        ),
+        "fixtures/widget.jsonl": ("fixture", "ambiguous", both),
+    }
+
+
+def test_directory_narrowing_is_a_string_suffix_match() -> None:
+    index = SchemaNameIndex(
+        ["contracts/foostate/drift.schema.json", "contracts/bar/drift.schema.json"]
+    )
+
+    resolution = index.resolve_example("contracts/examples/state/drift.example.json")
+
+    assert resolution.schema == "contracts/foostate/drift.schema.json"
+
+
+def test_main_prints_one_tab_separated_line_per_data_file(
+    tmp_path: Path, capsys: pytest.CaptureFixture[str]
+) -> None:
+    _touch(
+        tmp_path,
+        "contracts/alpha/widget.schema.json",
+        "contracts/beta/widget.schema.json",
+        "contracts/examples/alpha/widget.example.json",
+        "fixtures/widget.jsonl",
+        "fixtures/gadget.jsonl",
+    )
+
+    assert main(["--root", str(tmp_path)]) == 0
+
+    assert capsys.readouterr().out.splitlines() == [
+        "example\tcontracts/examples/alpha/widget.example.json\tmatch\twidget"
+        "\tcontracts/alpha/widget.schema.json",
+        "fixture\tfixtures/gadget.jsonl\tnone\tgadget",
+        "fixture\tfixtures/widget.jsonl\tambiguous\twidget"
+        "\tcontracts/alpha/widget.schema.json\tcontracts/beta/widget.schema.json",
+    ]
@@ -0,0 +1,123 @@
+"""Guard the contract validation result cache keys."""
+from __future__ import annotations
+
+import json
+from pathlib import Path
+
+import pytest
+
+from metarepo_tools.validation_cache import ClosureIndex, ResultCache, compile_key, main
+
+SCHEMAS = {
+    "contracts/events/base.event.schema.json": {
+        "$id": "https://schemas.test/events/base.event.schema.json",
+        "$defs": {"kind": {"$id": "kind.schema.json", "type": "string"}},
+    },
+    "contracts/events/widget.schema.json": {
+        "$id": "https://schemas.test/events/widget.schema.json",
+        "properties": {"kind": {"$ref": "kind.schema.json"}},
+    },
+    "contracts/local/gadget.schema.json": {
+        "properties": {"widget": {"$ref": "../events/widget.schema.json#/properties"}},
+    },
+    "contracts/local/lonely.schema.json": {"$ref": "#/$defs/x", "$defs": {"x": {}}},
+}
+
+
+def _write(root: Path, schemas: dict[str, object]) -> list[str]:
+    for relative, schema in schemas.items():
+        path = root / relative
+        path.parent.mkdir(parents=True, exist_ok=True)
+        path.write_text(json.dumps(schema), encoding="utf-8")
+    return sorted(schemas)
+
+
+def _digests(root: Path) -> dict[str, str]:
+    index = ClosureIndex(root, sorted(SCHEMAS))
+    return {path: index.closure_digest(path) for path in SCHEMAS}
+
+
+def test_closure_digest_follows_references_and_nested_identifiers(tmp_path: Path) -> None:
+    _write(tmp_path, SCHEMAS)
+    before = _digests(tmp_path)
+
+    changed = dict(SCHEMAS)
+    changed["contracts/events/base.event.schema.json"] = {
+        "$id": "https://schemas.test/events/base.event.schema.json",
+        "$defs": {"kind": {"$id": "kind.schema.json", "type": "integer"}},
+    }
+    _write(tmp_path, changed)
+    after = _digests(tmp_path)
+
+    assert {path for path in SCHEMAS if before[path] != after[path]} == {
+        "contracts/events/base.event.schema.json",
+        "contracts/events/widget.schema.json",
+        "contracts/local/gadget.schema.json",
+    }
+
+
+def test_closure_digest_is_independent_of_the_checkout_location(tmp_path: Path) -> None:
+    _write(tmp_path / "one", SCHEMAS)
+    _write(tmp_path / "two", SCHEMAS)
+
+    assert _digests(tmp_path / "one") == _digests(tmp_path / "two")
+
+
+def test_unresolved_references_enter_the_digest(tmp_path: Path) -> None:
+    paths = _write(tmp_path, {"contracts/a.schema.json": {"$ref": "missing.schema.json"}})
+    missing = ClosureIndex(tmp_path, paths).closure_digest("contracts/a.schema.json")
+    _write(tmp_path, {"contracts/a.schema.json": {"$ref": "other.schema.json"}})
+    other = ClosureIndex(tmp_path, paths).closure_digest("contracts/a.schema.json")
+
+    assert missing != other
+
+
+def test_cache_ignores_foreign_or_truncated_entries(tmp_path: Path) -> None:
+    cache = ResultCache(tmp_path / "cache")
+    key = compile_key("salt", "closure")
+    other = compile_key("salt", "other")
+
+    assert not cache.hit(key)
+    cache.record(key)
+    assert cache.hit(key)
+
+    entry = tmp_path / "cache" / "v1" / other[:2] / other
+    entry.parent.mkdir(parents=True, exist_ok=True)
+    entry.write_text(json.dumps({"key": key}), encoding="utf-8")
+    assert not cache.hit(other)
+    entry.write_text('{"key": ', encoding="utf-8")
+    assert not cache.hit(other)
+
+
+def test_plan_and_record_round_trip(tmp_path: Path, capsys: pytest.CaptureFixture[str]) -> None:
+    root = tmp_path / "repo"
+    _write(root, SCHEMAS)
+    example = root / "contracts/examples/widget.example.json"
+    example.parent.mkdir(parents=True)
+    example.write_text("{}\n", encoding="utf-8")
+    (root / "fixtures").mkdir()
+    (root / "fixtures/nothing.jsonl").write_text("{}\n", encoding="utf-8")
+    cache_dir = tmp_path / "cache"
+    plan = ["plan", "--root", str(root), "--cache-dir", str(cache_dir), "--salt", "ajv=8"]
+
+    assert main(plan) == 0
+    lines = [line.split("\t") for line in capsys.readouterr().out.splitlines()]
+    assert [line[1:4] for line in lines] == [
+        ["miss", "compile", "contracts/events/base.event.schema.json"],
+        ["miss", "compile", "contracts/events/widget.schema.json"],
+        ["miss", "compile", "contracts/local/gadget.schema.json"],
+        ["miss", "compile", "contracts/local/lonely.schema.json"],
+        ["miss", "example", "contracts/examples/widget.example.json"],
+        ["miss", "fixture", "fixtures/nothing.jsonl"],
+    ]
+    assert lines[4][4:] == ["match", "widget", "contracts/events/widget.schema.json"]
+    assert lines[5][0] == "-"
+
+    assert main(["record", "--cache-dir", str(cache_dir), lines[1][0], lines[4][0]]) == 0
+    assert main(plan) == 0
+    hits = [line.split("\t")[1] for line in capsys.readouterr().out.splitlines()]
+    assert hits == ["miss", "hit", "miss", "miss", "hit", "miss"]
+
+    assert main([*plan, "--no-cache"]) == 0
+    assert "\thit\t" not in capsys.readouterr().out
+    assert main(["record", "--cache-dir", str(cache_dir), "../escape"]) == 2
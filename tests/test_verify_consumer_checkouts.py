@@ -0,0 +1,114 @@
+"""Guard the evidence-to-checkout verification of consumer claims."""
+from __future__ import annotations
+
+import hashlib
+from pathlib import Path
+import subprocess
+import sys
+
+ROOT = Path(__file__).resolve().parents[1]
+VALIDATOR_DIR = ROOT / "scripts" / "contracts"
+if str(VALIDATOR_DIR) not in sys.path:
+    sys.path.insert(0, str(VALIDATOR_DIR))
+
+from verify_consumer_checkouts import verify_checkouts  # noqa: E402
+
+MIRROR = b'{"type": "object"}\n'
+
+
+def _git(repo: Path, *args: str) -> str:
+    result = subprocess.run(
+        ["git", "-C", str(repo), *args], check=True, text=True, capture_output=True
+    )
+    return result.stdout.strip()
+
+
+def _checkout(checkouts: Path, name: str) -> str:
+    """Commit a workflow and a schema mirror, then dirty the working tree."""
+
+    repo = checkouts / name
+    (repo / ".github/workflows").mkdir(parents=True)
+    (repo / "contracts").mkdir()
+    _git(repo, "init", "--initial-branch=main")
+    _git(repo, "config", "user.email", "test@example.invalid")
+    _git(repo, "config", "user.name", "Contract Test")
+    (repo / ".github/workflows/validate.yml").write_text("on: push\njobs: {}\n", encoding="utf-8")
+    (repo / "contracts/event.schema.json").write_bytes(MIRROR)
+    _git(repo, "add", "-A")
+    _git(repo, "commit", "-m", "seed")
+    # Only the pinned commit counts, never the working tree.
+    (repo / ".github/workflows/validate.yml").write_text("x\n" * 50, encoding="utf-8")
+    return _git(repo, "rev-parse", "HEAD")
+
+
+def _claim(name: str, line: int, digest: str) -> dict[str, object]:
+    return {
+        "id": f"events/event::consumer::{name}",
+        "repository": f"heimgewebe/{name}",
+        "evidence": [
+            {"path": ".github/workflows/validate.yml", "line": line, "kind": "ci_reference"},
+            {"path": "contracts/event.schema.json", "line": 1, "kind": "mirror"},
+        ],
+        "mirrorChecks": [{"path": "contracts/event.schema.json", "sha256": digest}],
+    }
+
+
+def test_verify_checkouts_reads_each_repository_at_its_pinned_commit(tmp_path: Path) -> None:
+    heads = {
+        "heimgewebe/alpha": _checkout(tmp_path, "alpha"),
+        "heimgewebe/beta": _checkout(tmp_path, "beta"),
+        "heimgewebe/absent": "0" * 40,
+    }
+    digest = hashlib.sha256(MIRROR).hexdigest()
+    claims = [_claim("alpha", 2, digest), _claim("beta", 3, "0" * 64)]
+
+    reports = verify_checkouts(claims, heads, tmp_path, jobs=3)
+
+    assert [report.repository for report in reports] == list(heads)
+    alpha, beta, absent = reports
+    assert (alpha.errors, alpha.blobs, alpha.skipped) == ([], 2, False)
+    assert beta.errors == [
+        "events/event::consumer::beta.evidence[0].line 3 exceeds 2 lines of "
+        f".github/workflows/validate.yml at {heads['heimgewebe/beta']}",
+        "events/event::consumer::beta.mirrorChecks[0].sha256 differs from "
+        f"contracts/event.schema.json at {heads['heimgewebe/beta']}",
+    ]
+    assert absent.skipped and not absent.errors
+
+
+def test_verify_checkouts_reports_missing_paths_and_commits(tmp_path: Path) -> None:
+    commit = _checkout(tmp_path, "alpha")
+    claim = _claim("alpha", 1, hashlib.sha256(MIRROR).hexdigest())
+    claim["evidence"].append({"path": "docs/missing.md", "line": 1, "kind": "doc"})
+
+    [report] = verify_checkouts([claim], {"heimgewebe/alpha": commit}, tmp_path, jobs=1)
+    assert report.errors == [
+        f"events/event::consumer::alpha.evidence[2].path docs/missing.md is not a file at {commit}"
+    ]
+
+    [report] = verify_checkouts([claim], {"heimgewebe/alpha": "1" * 40}, tmp_path, jobs=1)
+    assert len(report.errors) == 1
+    assert report.errors[0].startswith(f"heimgewebe/alpha checkout {tmp_path / 'alpha'}: ")
+
+
+def test_malformed_entries_are_reported_per_claim(tmp_path: Path) -> None:
+    commit = _checkout(tmp_path, "alpha")
+    claim = _claim("alpha", 1, hashlib.sha256(MIRROR).hexdigest())
+    claim["evidence"].extend([{"line": 1}, {"path": ["x"], "line": 1}, {"path": "a", "line": "1"}])
+    claim["mirrorChecks"].append("contracts/event.schema.json")
+    broken = {
+        "id": "events/other::consumer::alpha",
+        "repository": "heimgewebe/alpha",
+        "evidence": "README.md",
+    }
+
+    [report] = verify_checkouts([claim, broken], {"heimgewebe/alpha": commit}, tmp_path, jobs=1)
+
+    assert report.errors == [
+        "events/event::consumer::alpha.evidence[2] needs a path and a line",
+        "events/event::consumer::alpha.evidence[3] needs a path and a line",
+        "events/event::consumer::alpha.evidence[4] needs a path and a line",
+        "events/event::consumer::alpha.mirrorChecks[1] needs a path and a sha256",
+        "events/other::consumer::alpha.evidence must be a list",
+    ]
+    assert report.blobs == 2